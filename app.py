@@ -1,70 +1,77 @@
 # Author: Ammar Aryan Nuha
 # Deklarasi library yang digunakan
-from flask import Flask, render_template, redirect, url_for, request, flash, session
+from flask import Flask, Response, render_template, redirect, url_for, request, flash, session, jsonify, has_request_context
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 import dash
-import pytz
 import dash_bootstrap_components as dbc
 import secrets
-import paho.mqtt.client as mqtt
-import plotly.graph_objects as go
+import json
+import importlib
 import threading
-import ssl
+import atexit
+import time
 import random
-import pandas as pd
 import numpy as np
-from scipy import interpolate
-from datetime import datetime
 from dash import dcc, html
-from dash.dependencies import Input, Output
-from pages.mcs_dashboard_all import main_dashboard_layout, main_dashboard_path
-from pages.co2 import co2_layout
-from pages.th_in import th_in_layout
-from pages.th_out import th_out_layout  
-from pages.par import par_layout    
-from pages.windspeed import windspeed_layout    
-from pages.rainfall import rainfall_layout  
-from pages.alarm import alarm_layout  
-from pages.gps import gps_layout  
-from engineer_pages.mcs_dashboard_eng import engineer_dashboard_layout
-from engineer_pages.co2_eng import engineer_co2_layout
-from engineer_pages.th_in_eng import engineer_th_in_layout
-from engineer_pages.th_out_eng import engineer_th_out_layout  
-from engineer_pages.par_eng import engineer_par_layout    
-from engineer_pages.windspeed_eng import engineer_windspeed_layout    
-from engineer_pages.rainfall_eng import engineer_rainfall_layout  
-from engineer_pages.alarm_eng import engineer_alarm_layout  
-from engineer_pages.gps_eng import engineer_gps_layout  
+from dash.dependencies import Input, Output, State, ALL, ClientsideFunction
+from core.config import METRICS, HISTORY_DIR, SHARED_STORE, INGEST_SOCKET
+from core.devices import DeviceRegistry, DEFAULT_DEVICE
+from core.history import HistoryStore
+from core.downsample import downsample_indices
+from core.figures import map_figure, trend_patch, empty_patch, insufficient_patch, ticks_patch, extend_data
+from core.feed import FeedClient
+from core.ingest_service import IngestService, create_device, create_shared_device
+from core.push import PushHub
+from core.render_cache import RenderCache
+from core.serialize import install_json, typed_array
+from core.http_cache import HttpCache
+from core.shared_store import SharedDeviceRegistry
+from core.timefmt import NS_PER_SECOND, format_time, format_times, to_seconds, time_format
 
 # Initialize Flask app
 server = Flask(__name__)
 server.secret_key = secrets.token_hex(32)  # Generates a 64-character hexadecimal key
 
-# Menyimpan daftar halaman multipage
+# Kompresi gzip/brotli, ETag dan Cache-Control untuk callback JSON, /static dan bundle Dash
+http_cache = HttpCache(server.static_folder).init_app(server)
+
+# Menyimpan daftar halaman multipage: path -> (modul, nama layout)
+# Modul layout di-import saat halaman pertama kali dibuka (load_layout), tidak saat start
 pages = {
-    main_dashboard_path: main_dashboard_layout,
-    "/dash/co2": co2_layout,
-    "/dash/th-in": th_in_layout,
-    "/dash/th-out": th_out_layout,
-    "/dash/par": par_layout,
-    "/dash/windspeed": windspeed_layout,
-    "/dash/rainfall": rainfall_layout,
-    "/dash/alarm": alarm_layout,
-    "/dash/gps": gps_layout,
+    "/dash/": ('pages.mcs_dashboard_all', 'main_dashboard_layout'),
+    "/dash/co2": ('pages.co2', 'co2_layout'),
+    "/dash/th-in": ('pages.th_in', 'th_in_layout'),
+    "/dash/th-out": ('pages.th_out', 'th_out_layout'),
+    "/dash/par": ('pages.par', 'par_layout'),
+    "/dash/windspeed": ('pages.windspeed', 'windspeed_layout'),
+    "/dash/rainfall": ('pages.rainfall', 'rainfall_layout'),
+    "/dash/alarm": ('pages.alarm', 'alarm_layout'),
+    "/dash/gps": ('pages.gps', 'gps_layout'),
 }
 
 engineer_pages = {
-    "/dash/engineer/": engineer_dashboard_layout,
-    "/dash/engineer/co2": engineer_co2_layout,
-    "/dash/engineer/th-in": engineer_th_in_layout,
-    "/dash/engineer/th-out": engineer_th_out_layout,
-    "/dash/engineer/par": engineer_par_layout,
-    "/dash/engineer/windspeed": engineer_windspeed_layout,
-    "/dash/engineer/rainfall": engineer_rainfall_layout,
-    "/dash/engineer/alarm": engineer_alarm_layout,
-    "/dash/engineer/gps": engineer_gps_layout,
+    "/dash/engineer/": ('engineer_pages.mcs_dashboard_eng', 'engineer_dashboard_layout'),
+    "/dash/engineer/co2": ('engineer_pages.co2_eng', 'engineer_co2_layout'),
+    "/dash/engineer/th-in": ('engineer_pages.th_in_eng', 'engineer_th_in_layout'),
+    "/dash/engineer/th-out": ('engineer_pages.th_out_eng', 'engineer_th_out_layout'),
+    "/dash/engineer/par": ('engineer_pages.par_eng', 'engineer_par_layout'),
+    "/dash/engineer/windspeed": ('engineer_pages.windspeed_eng', 'engineer_windspeed_layout'),
+    "/dash/engineer/rainfall": ('engineer_pages.rainfall_eng', 'engineer_rainfall_layout'),
+    "/dash/engineer/alarm": ('engineer_pages.alarm_eng', 'engineer_alarm_layout'),
+    "/dash/engineer/gps": ('engineer_pages.gps_eng', 'engineer_gps_layout'),
 }
 
+# Layout yang sudah dibuat, path -> komponen
+layouts = {}
+
+def load_layout(path):
+    """Layout of a page in `pages` or `engineer_pages`, importing its module on first use"""
+    layout = layouts.get(path)
+    if layout is None:
+        module, name = pages[path] if path in pages else engineer_pages[path]
+        layout = layouts[path] = getattr(importlib.import_module(module), name)
+    return layout
+
 # Configure Flask-Login
 login_manager = LoginManager()
 login_manager.init_app(server)
@@ -116,28 +123,170 @@ def logout():
 # end of flask route
 
 # Integrate Dash app
-app_dash = dash.Dash(__name__, server=server, url_base_pathname='/dash/', external_stylesheets=[dbc.themes.BOOTSTRAP], title='MCS Dashboard', suppress_callback_exceptions=True)
+# Response callback dan layout diserialisasi dengan orjson, array NumPy tanpa konversi ke list
+install_json()
+
+app_dash = dash.Dash(__name__, server=server, url_base_pathname='/dash/', external_stylesheets=[dbc.themes.BOOTSTRAP], external_scripts=[http_cache.static_url('push.js'), http_cache.static_url('sensors.js')], title='MCS Dashboard', suppress_callback_exceptions=True)
  
 @app_dash.server.before_request
 def restrict_dash_pages():
     if request.path.startswith('/dash/engineer') and not session.get('_user_id'):
         return redirect(url_for('login'))
 
-# data storage
-data = {
-    'waktu': [],      # Time values
-    'kodeDataSuhuIn': [],       # Temperature values 
-    'kodeDataKelembabanIn': [], # Humidity values
-    'kodeDataSuhuOut': [],   # Outdoor temperature values
-    'kodeDataKelembabanOut': [], # Outdoor humidity values
-    'kodeDataCo2': [],        # CO2 values
-    'kodeDataWindspeed': [],  # Wind speed values
-    'kodeDataRainfall': [],    # Rainfall values
-    'kodeDataPar': [],    # PAR values
-    'kodeDataLat': [],   # Latitude values
-    'kodeDataLon': []    # Longitude values
+# data storage: METRICS, kapasitas buffer dan agregasi ada di core/config.py, bersama proses ingest
+
+# Jumlah sampel terakhir yang dibaca read_series (tabel historis)
+TREND_POINTS = 20
+
+# Setiap device punya ring buffer dan agregasi sendiri (core.ingest_service.create_device)
+devices = DeviceRegistry(create_device)
+
+# Histori disimpan di disk (history/<device>/<metric>) supaya dashboard tidak kosong setelah restart
+# Thread writer dan pemuatan ulang histori baru dijalankan di create_app()
+history = HistoryStore(HISTORY_DIR)
+
+def get_device(device_id=None):
+    """Device chosen on the page, falls back to the first known (or default) device"""
+    device = devices.get(device_id) if device_id else None
+    if device is None:
+        ids = devices.ids()
+        device = devices.get_or_create(ids[0] if ids else DEFAULT_DEVICE)
+    return device
+
+# Pilihan rentang waktu grafik trend (detik), 'live' dibaca dari ring buffer
+LIVE_WINDOW_SECONDS = 15 * 60
+TREND_RANGES = {
+    'live': LIVE_WINDOW_SECONDS,
+    '1h': 3600,
+    '24h': 86400,
+    '7d': 7 * 86400,
+    '30d': 30 * 86400,
 }
 
+# Jumlah titik yang cukup untuk lebar grafik, dipakai memilih tier agregasi
+TREND_WIDTH_POINTS = 720
+
+def read_trend(device, metric, range_key='live', series=None):
+    """(timestamps, values) for a trend graph: latest samples (or the given snapshot), or a time range from history"""
+    seconds = TREND_RANGES.get(range_key, LIVE_WINDOW_SECONDS)
+    end_ns = time.time_ns()
+    start_ns = end_ns - seconds * 1_000_000_000
+    if range_key == 'live':
+        if series is None:
+            # Copy di bawah lock device, view ring buffer bisa berubah saat ingest menulis
+            return device.snapshot([metric], since=start_ns)[metric]
+        timestamps, values = series
+        lo = np.searchsorted(timestamps, start_ns, side='left')
+        return timestamps[lo:], values[lo:]
+    if metric in device.rollups:
+        # Tier agregasi paling kasar yang masih cukup titiknya, misal 30 hari -> 720 bucket per jam
+        tier, buckets = device.rollups[metric].query(start_ns, end_ns, TREND_WIDTH_POINTS)
+        if buckets is not None:
+            return buckets['start'], buckets['sum'] / buckets['count']
+    return read_range(device, metric, start_ns)
+
+# Lebar grafik trend: kolom width=6 di dalam container bootstrap (maks 1320px)
+GRAPH_PX_PER_POINT = 2
+DEFAULT_VIEWPORT_WIDTH = 1280
+
+def trend_points(viewport_width=None):
+    """Target number of points for a half-width trend graph"""
+    graph_width = min(viewport_width or DEFAULT_VIEWPORT_WIDTH, 1320) / 2
+    return max(int(graph_width / GRAPH_PX_PER_POINT), 10)
+
+def trend_xy(timestamps, values, viewport_width=None, num_ticks=3):
+    """Downsampled x (epoch seconds) and y plus tick values/labels for a trend graph"""
+    indices = downsample_indices(timestamps, values, trend_points(viewport_width))
+    timestamps, values = timestamps[indices], values[indices]
+    x_plot = to_seconds(timestamps)
+    ticks = np.linspace(0, len(x_plot) - 1, num_ticks, dtype=int)
+    ticktext = format_times(timestamps[ticks], time_format(timestamps[-1] - timestamps[0]))
+    return x_plot, values, x_plot[ticks], ticktext
+
+# Grafik live hanya ditambah sampel baru (extendData); dikirim ulang penuh (downsampled)
+# bila titiknya melebihi batas ini atau rentangnya melebihi 2x jendela live
+STREAM_MAX_POINTS = 1000
+
+def stream_trend(graph_id, device, metric, cursor=None, viewport_width=None, range_key='live', series=None):
+    """(figure patch, extendData, cursor) for one trend graph, `series` is the tick's snapshot of the metric"""
+    # Cursor = yang sudah tampil di browser {'device', 'first', 'last', 'points'} (ns sebagai string);
+    # selama masih valid hanya sampel setelah cursor['last'] yang dikirim
+    if range_key == 'live' and cursor and cursor.get('device') == device.id:
+        first, last = int(cursor['first']), int(cursor['last'])
+        timestamps, values = series if series is not None else device.snapshot([metric], since=last + 1)[metric]
+        lo = np.searchsorted(timestamps, last, side='right')
+        if lo == len(timestamps):
+            return dash.no_update, dash.no_update, cursor
+        newest = int(timestamps[-1])
+        points = cursor['points'] + int(len(timestamps) - lo)
+        if points <= STREAM_MAX_POINTS and newest - first <= 2 * LIVE_WINDOW_SECONDS * NS_PER_SECOND:
+            tick_ns = np.linspace(first, newest, 3).astype(np.int64)
+            ticks = ticks_patch(to_seconds(tick_ns), format_times(tick_ns, time_format(newest - first)))
+            extend = extend_data(to_seconds(timestamps[lo:]), values[lo:], STREAM_MAX_POINTS)
+            return ticks, extend, dict(cursor, last=str(newest), points=points)
+
+    # Kirim penuh: halaman baru, ganti device/rentang, atau jendela sudah terlalu panjang
+    full = full_trend(device, metric, viewport_width, range_key, series)
+    if full is None:
+        return insufficient_patch(graph_id), dash.no_update, None
+    x_plot, selected_values, tickvals, ticktext, first, last = full
+    if range_key != 'live':
+        # Rentang histori tidak pernah di-extend, dikirim sebagai typed array biner (base64)
+        patch = trend_patch(graph_id, typed_array(x_plot), typed_array(selected_values), tickvals, ticktext)
+        return patch, dash.no_update, None
+    cursor = {'device': device.id, 'first': str(first), 'last': str(last), 'points': len(x_plot)}
+    return trend_patch(graph_id, x_plot, selected_values, tickvals, ticktext), dash.no_update, cursor
+
+def full_trend(device, metric, viewport_width=None, range_key='live', series=None):
+    """Downsampled full window (x, y, tickvals, ticktext, first ns, last ns), or None if too few samples"""
+    # Lewat render cache: semua client dengan device, rentang dan lebar grafik yang sama memakai satu hasil
+    def compute():
+        timestamps, values = read_trend(device, metric, range_key, series)
+        if len(values) <= 3:
+            return None
+        # Downsample (MinMax + LTTB) ke jumlah titik sesuai lebar grafik
+        return trend_xy(timestamps, values, viewport_width) + (int(timestamps[0]), int(timestamps[-1]))
+
+    version = dict(device=device.id, metric=metric, version=device.store.version(metric),
+                   range=range_key, points=trend_points(viewport_width))
+    return cached('trend', version, compute)
+
+def data_version(device, metrics, **extra):
+    """Key of what a callback renders: device, version of each metric and extra inputs"""
+    # run = generasi registry (sama di semua worker satu daemon ingest), key lama di browser tidak cocok setelah restart
+    return dict(extra, run=devices.generation, device=device.id, versions=device.versions(metrics))
+
+# Hasil render dipakai bersama semua client yang melihat data (dan role) yang sama
+render_cache = RenderCache()
+
+def user_role():
+    """Role part of render cache keys: 'engineer' when logged in, otherwise 'guest'"""
+    return 'engineer' if has_request_context() and current_user.is_authenticated else 'guest'
+
+def cached(callback, version, compute):
+    """Result of compute() for (callback, data version, role), computed once for all clients"""
+    key = (callback, json.dumps(version, sort_keys=True), user_role())
+    return render_cache.get_or_compute(key, compute)
+
+def read_range(device, metric, start_ns, end_ns=None):
+    """Samples of a metric in [start_ns, end_ns): older part from disk, recent part from the ring buffer"""
+    key = device.history_key(metric)
+    timestamps, values = device.snapshot([metric])[metric]
+    if not len(timestamps) or (end_ns is not None and end_ns <= timestamps[0]):
+        return history.query(key, start_ns, end_ns)
+
+    lo = np.searchsorted(timestamps, start_ns, side='left')
+    hi = len(timestamps) if end_ns is None else np.searchsorted(timestamps, end_ns, side='left')
+    if timestamps[0] <= start_ns:
+        return timestamps[lo:hi], values[lo:hi]
+
+    old_ts, old_values = history.query(key, start_ns, int(timestamps[0]))
+    return np.concatenate([old_ts, timestamps[:hi]]), np.concatenate([old_values, values[:hi]])
+
+def read_series(device, n=TREND_POINTS):
+    """Zero-copy (timestamps, values) views of the latest n samples per metric"""
+    return {metric: device.store.view(metric, n) for metric in METRICS}
+
 # Define some locations in Bandung, Indonesia for demonstration
 LOCATIONS = [
     {"name": "Bandung City Square", "lat": -6.921151, "lon": 107.607301},
@@ -169,87 +318,144 @@ def generate_path_points(center_lat, center_lon, points=10, radius=0.005):
 # Generate a sample path
 PATH_POINTS = generate_path_points(-6.914744, 107.609810, points=20)
 
-# MQTT Configuration
-BROKER = "9a59e12602b646a292e7e66a5296e0ed.s1.eu.hivemq.cloud"
-PORT = 8883
-USERNAME = "testing"
-PASSWORD = "Testing123"
-
-# Create SSL/TLS context
-ssl_context = ssl.create_default_context()
-ssl_context.check_hostname = False
-ssl_context.verify_mode = ssl.CERT_NONE
-
-# TOPIC = "esp32/+/+"  # Subscribe to all topics under esp32
-TOPIC_SUHU = "mcs/kodeDataSuhuIn"
-TOPIC_KELEMBABAN = "mcs/kodeDataKelembabanIn"
-TOPIC_SUHU_OUT = "mcs/kodeDataSuhuOut"
-TOPIC_KELEMBABAN_OUT = "mcs/kodeDataKelembabanOut"
-TOPIC_CO2 = "mcs/kodeDataCo2"
-TOPIC_WINDSPEED = "mcs/kodeDataWindspeed"
-TOPIC_RAINFALL = "mcs/kodeDataRainfall"
-TOPIC_PAR = "mcs/kodeDataPar"
-TOPIC_LAT = "mcs/kodeDataLat"
-TOPIC_LON = "mcs/kodeDataLon"
-
-# MQTT Callback
-def on_connect(client, userdata, flags, rc):
-    if rc == 0:
-        print("Connected to HiveMQ Broker")
-        client.subscribe([(TOPIC_SUHU, 0), (TOPIC_KELEMBABAN, 0),
-                          (TOPIC_SUHU_OUT, 0), (TOPIC_KELEMBABAN_OUT, 0),
-                          (TOPIC_CO2, 0), (TOPIC_WINDSPEED, 0), 
-                          (TOPIC_RAINFALL, 0), (TOPIC_PAR, 0),
-                         (TOPIC_LAT, 0), (TOPIC_LON, 0)])  # Subscribe ke topik suhu & kelembaban
-    else:
-        print(f"Failed to connect, return code {rc}")
+# Periode polling cadangan (ms); event push per client juga tidak lebih sering dari ini
+SENSOR_POLL_MS = 1200
 
-def on_message(client, userdata, msg):
-    global data
-    try:
-        topic = msg.topic.split('/')[-1]  # Get the last part of the topic (e.g., 'suhu' from 'esp32/suhu')
-        payload = float(msg.payload.decode())
-        
-        current_time = datetime.now(tz=pytz.timezone('Asia/Jakarta')).strftime('%H:%M:%S')
-        
-        # Initialize lists if they don't exist
-        if topic in ['kodeDataSuhuIn', 'kodeDataKelembabanIn', 'kodeDataSuhuOut', 'kodeDataKelembabanOut',
-                      'kodeDataCo2', 'kodeDataWindspeed', 'kodeDataRainfall', 'kodeDataPar',
-                    'kodeDataLat', 'kodeDataLon']:
-            if len(data[topic]) >= 20:  # Keep only last 20 points
-                data[topic] = data[topic][1:]
-            data[topic].append(payload)
-            
-            # Keep waktu list in sync with the latest data addition
-            # This ensures all lists have the same length
-            if topic == 'kodeDataSuhuIn':  # Only update waktu when temperature data comes in
-                if len(data['waktu']) >= 20:
-                    data['waktu'] = data['waktu'][1:]
-                data['waktu'].append(current_time)
+# Event "device punya data baru" ke browser (SSE), dikirim setelah tiap batch ingest
+push = PushHub(min_interval=SENSOR_POLL_MS / 1000)
 
-    except Exception as e:
-        print(f"Error processing MQTT message: {e}")
+# MQTT, parsing dan penyimpanan (core/ingest_service.py), dijalankan di proses ini kecuali dengan MCS_SHARED_STORE
+ingest_service = IngestService(devices, history, notify=push.publish)
 
-# MQTT Client
-client = mqtt.Client()
-client.username_pw_set(USERNAME, PASSWORD)
-client.tls_set_context(ssl_context)
-client.on_connect = on_connect
-client.on_message = on_message
-client.connect(BROKER, PORT, 60)
+# Dengan MCS_SHARED_STORE: langganan event data baru dari proses ingest, dibuat di create_app()
+ingest_feed = None
+
+# Statistik antrian ingest (kedalaman antrian, pesan yang dibuang, ukuran batch) dan koneksi MQTT
+@server.route('/ingest/stats')
+def ingest_stats():
+    if ingest_feed is not None:
+        # Statistik dari proses ingest lewat socket, kosong bila proses ingest tidak berjalan
+        stats = dict(ingest_feed.request_stats() or {}, feed_client=ingest_feed.snapshot())
+    else:
+        stats = ingest_service.snapshot()
+    return jsonify(dict(stats, push=push.snapshot(), render_cache=render_cache.snapshot()))
+
+# Stream SSE: satu event tiap ada data baru, menggantikan polling dcc.Interval
+@server.route('/push/stream')
+def push_stream():
+    return Response(push.stream(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+# Daftar device yang pernah mengirim data
+@server.route('/devices')
+def device_list():
+    return jsonify(devices.info())
+
+# Tabel sensor: metric, id tampilan nilai (sensor-value), satuan, rentang normal (di luarnya nilai
+# ditampilkan merah) dan id grafik trend (trend-graph).
+# Menambah sensor cukup menambah baris di sini dan komponennya di halaman, tanpa callback baru
+SENSORS = [
+    dict(metric='kodeDataSuhuIn', display='suhu-display-indoor', unit='°C', normal=(15, 35), graph='temp-graph'),
+    dict(metric='kodeDataKelembabanIn', display='kelembaban-display-indoor', unit='%', normal=(40, 90), graph='humidity-graph'),
+    dict(metric='kodeDataSuhuOut', display='suhu-display-outdoor', unit='°C', normal=(15, 35), graph='temp-graph-out'),
+    dict(metric='kodeDataKelembabanOut', display='kelembaban-display-outdoor', unit='%', normal=(40, 90), graph='humidity-graph-out'),
+    dict(metric='kodeDataCo2', display='co2-display', unit='PPM', normal=(300, 1000), graph='co2-graph'),
+    dict(metric='kodeDataWindspeed', display='windspeed-display', unit='m/s', normal=(0, 15), graph='windspeed-graph'),
+    dict(metric='kodeDataRainfall', display='rainfall-display', unit='mm', normal=(0, 50), graph='rainfall-graph'),
+    dict(metric='kodeDataPar', display='par-display', unit='μmol/m²/s', normal=(0, 400), graph='par-graph'),
+]
+SENSOR_BY_DISPLAY = {sensor['display']: sensor for sensor in SENSORS}
+SENSOR_BY_GRAPH = {sensor['graph']: sensor for sensor in SENSORS}
 
-# Jalankan MQTT dalam thread
-threading.Thread(target=client.loop_forever, daemon=True).start()
+# Satuan dan rentang normal per tampilan, dikirim sekali bersama layout untuk static/sensors.js
+SENSOR_FORMATS = {sensor['display']: {'unit': sensor['unit'], 'low': sensor['normal'][0], 'high': sensor['normal'][1]}
+                  for sensor in SENSORS}
+
+def latest_value(series):
+    """Latest sample as a JSON number, None when there is none (shown as N/A)"""
+    if not len(series) or not np.isfinite(series[-1]):
+        return None
+    return float(series[-1])
 
 # main layout dash
 app_dash.layout = html.Div([
     # CSS styles for the app
-    html.Link(rel='stylesheet', href='/static/style.css'),
+    html.Link(rel='stylesheet', href=http_cache.static_url('style.css')),
 
     dcc.Location(id='url', refresh=False),
+    dcc.Store(id='viewport-width'),
+
+    # Pilihan device (greenhouse node), diingat selama sesi browser
+    html.Div(dcc.Dropdown(id='device-select', clearable=False, persistence=True,
+                          persistence_type='session'), className='device-select'),
     html.Div(id='page-content', children=[]),    
+
+    # Event dari /push/stream (static/push.js) dan tick untuk device yang sedang dipilih
+    dcc.Store(id='push-event'),
+    dcc.Store(id='sensor-tick', data=0),
+    dcc.Store(id='device-new'),
+
+    # Nilai terakhir {id tampilan: angka} dari server, diformat di browser (static/sensors.js)
+    dcc.Store(id='sensor-latest'),
+    dcc.Store(id='sensor-format', data=SENSOR_FORMATS),
+
+    # Cadangan bila SSE tidak tersambung, dimatikan oleh push.js selama stream aktif
+    dcc.Interval(id='interval_sensors', interval=SENSOR_POLL_MS, n_intervals=0),
 ])
 
+# Event push hanya memicu render bila device yang sedang dilihat punya data baru
+app_dash.clientside_callback(
+    """
+    function(event, device, tick) {
+        if (!event || (device && !(device in event))) {
+            return window.dash_clientside.no_update;
+        }
+        return (tick || 0) + 1;
+    }
+    """,
+    Output('sensor-tick', 'data'),
+    Input('push-event', 'data'),
+    State('device-select', 'value'),
+    State('sensor-tick', 'data')
+)
+
+# Event berisi device yang belum ada di pilihan: daftar device diambil ulang
+app_dash.clientside_callback(
+    """
+    function(event, options) {
+        var known = (options || []).map(function (option) { return option.value; });
+        var ids = Object.keys(event || {});
+        if (ids.every(function (id) { return known.indexOf(id) >= 0; })) {
+            return window.dash_clientside.no_update;
+        }
+        return ids.sort();
+    }
+    """,
+    Output('device-new', 'data'),
+    Input('push-event', 'data'),
+    State('device-select', 'options')
+)
+
+# Lebar layar browser, dipakai menentukan jumlah titik grafik trend
+app_dash.clientside_callback(
+    "function(pathname) { return window.innerWidth; }",
+    Output('viewport-width', 'data'),
+    Input('url', 'pathname')
+)
+
+# Daftar device dari registry, tanpa membaca data sensor
+@app_dash.callback(
+    [Output('device-select', 'options'),
+     Output('device-select', 'value')],
+    [Input('url', 'pathname'),
+     Input('device-new', 'data')],
+    [State('device-select', 'value')]
+)
+def update_device_options(pathname, new_ids, device_id):
+    ids = devices.ids() or [DEFAULT_DEVICE]
+    options = [{'label': device, 'value': device} for device in ids]
+    return options, device_id if device_id in ids else ids[0]
+
 # Callback Routing berdasarkan URL
 @app_dash.callback(
     Output('page-content', 'children'),
@@ -267,7 +473,7 @@ def display_page(pathname):
             ])
         # Show engineer page if authenticated
         if pathname in engineer_pages:
-            return engineer_pages[pathname]
+            return load_layout(pathname)
         # 404 for invalid engineer paths
         return html.Div([
             html.H3('404: Page not found'),
@@ -276,977 +482,136 @@ def display_page(pathname):
     
     # For guest paths (no authentication needed)
     if pathname in pages:
-        return pages[pathname]
+        return load_layout(pathname)
     
     # Default to guest homepage for unknown paths
-    return pages['/dash/']
+    return load_layout('/dash/')
 
-# Callback for main dashboard
+# Satu callback untuk semua halaman sensor: nilai dan grafik yang ada di halaman saat ini,
+# dari satu snapshot konsisten per tick. Nilai dikirim sebagai angka, teksnya dibuat di browser
 @app_dash.callback(
-    [Output({'type': 'sensor-value', 'id': 'suhu-display-indoor'}, 'children'),
-     Output({'type': 'sensor-value', 'id': 'kelembaban-display-indoor'}, 'children'),
-     Output({'type': 'sensor-value', 'id': 'suhu-display-outdoor'}, 'children'),
-     Output({'type': 'sensor-value', 'id': 'kelembaban-display-outdoor'}, 'children'),
-     Output({'type': 'sensor-value', 'id': 'co2-display'}, 'children'),
-     Output({'type': 'sensor-value', 'id': 'windspeed-display'}, 'children'),
-     Output({'type': 'sensor-value', 'id': 'rainfall-display'}, 'children'),
-     Output({'type': 'sensor-value', 'id': 'par-display'}, 'children')],
-    [Input('interval_mcs', 'n_intervals')]
+    [Output('sensor-latest', 'data'),
+     Output({'type': 'trend-graph', 'id': ALL}, 'figure'),
+     Output({'type': 'trend-graph', 'id': ALL}, 'extendData'),
+     Output({'type': 'trend-cursor', 'id': ALL}, 'data'),
+     Output({'type': 'data-version', 'id': ALL}, 'data')],
+    [Input('interval_sensors', 'n_intervals'),
+     Input('sensor-tick', 'data'),
+     Input({'type': 'trend-range', 'id': ALL}, 'value'),
+     Input('device-select', 'value')],
+    [State({'type': 'trend-range', 'id': ALL}, 'id'),
+     State({'type': 'sensor-value', 'id': ALL}, 'id'),
+     State({'type': 'trend-cursor', 'id': ALL}, 'data'),
+     State({'type': 'data-version', 'id': ALL}, 'data'),
+     State('viewport-width', 'data')]
 )
-def update_main_dashboard(n):
+def render_sensors(n, tick, range_values, device_id, range_ids, value_ids, cursors, seen_versions,
+                   viewport_width=None):
+    outputs = dash.callback_context.outputs_list
+    display_ids = [value_id['id'] for value_id in value_ids]
+    graph_ids = [output['id']['id'] for output in outputs[1]]
+    unchanged = (dash.no_update, [dash.no_update] * len(graph_ids),
+                 [dash.no_update] * len(graph_ids), [dash.no_update] * len(cursors),
+                 [dash.no_update] * len(seen_versions))
+    if not display_ids and not graph_ids:
+        return unchanged
+
+    # Pilihan rentang per grafik (LIVE/1H/24H/...), default live
+    ranges = {range_id['id']: value for range_id, value in zip(range_ids, range_values)}
+    # Data grafik yang sudah ada di browser (lihat stream_trend)
+    cursor = dict(cursors[0] or {}) if cursors else {}
     try:
-        suhu = data['kodeDataSuhuIn'][-1] if data['kodeDataSuhuIn'] else 0
-        kelembaban = data['kodeDataKelembabanIn'][-1] if data['kodeDataKelembabanIn'] else 0
-        suhu_out = data['kodeDataSuhuOut'][-1] if data['kodeDataSuhuOut'] else 0
-        kelembaban_out = data['kodeDataKelembabanOut'][-1] if data['kodeDataKelembabanOut'] else 0
-        co2 = data['kodeDataCo2'][-1] if data['kodeDataCo2'] else 0
-        windspeed = data['kodeDataWindspeed'][-1] if data['kodeDataWindspeed'] else 0
-        rainfall = data['kodeDataRainfall'][-1] if data['kodeDataRainfall'] else 0
-        par = data['kodeDataPar'][-1] if data['kodeDataPar'] else 0
-
-        return (
-            f" {suhu}°C",
-            f" {kelembaban}%",
-            f" {suhu_out}°C",
-            f" {kelembaban_out}%",
-            f" {co2}PPM",
-            f" {windspeed}m/s",
-            f" {rainfall}mm",
-            f" {par}μmol/m²/s"
-        )
-    except Exception as e:
-        print(f"Error in update_main_dashboard: {e}")
-        return "N/A", "N/A", "N/A", "N/A", "N/A", "N/A", "N/A", "N/A"
+        device = get_device(device_id)
+        metrics = {SENSOR_BY_DISPLAY[display_id]['metric'] for display_id in display_ids}
+        metrics |= {SENSOR_BY_GRAPH[graph_id]['metric'] for graph_id in graph_ids}
+        # Tidak ada sampel baru sejak render terakhir halaman ini: tidak ada yang dihitung atau dikirim
+        version = data_version(device, sorted(metrics), ranges=ranges)
+        if seen_versions and seen_versions[0] == version:
+            return unchanged
+        # Dibaca sekali di bawah lock device, semua nilai dan grafik berasal dari tick yang sama
+        snapshot = device.snapshot(metrics, since=time.time_ns() - 2 * LIVE_WINDOW_SECONDS * NS_PER_SECOND)
+
+        def latest_values():
+            return {display_id: latest_value(snapshot[SENSOR_BY_DISPLAY[display_id]['metric']][1])
+                    for display_id in display_ids}
+
+        # Nilai yang sama untuk semua client pada versi data ini
+        values = cached('render_sensors', dict(version, displays=display_ids), latest_values)
+
+        figures, extends = [], []
+        for graph_id in graph_ids:
+            metric = SENSOR_BY_GRAPH[graph_id]['metric']
+            if not len(device.store[metric]):
+                figures.append(empty_patch(graph_id))
+                extends.append(dash.no_update)
+                cursor[graph_id] = None
+                continue
+            try:
+                fig, extend, cursor[graph_id] = stream_trend(
+                    graph_id, device, metric, cursor.get(graph_id), viewport_width,
+                    ranges.get(graph_id, 'live'), snapshot[metric])
+            except Exception as e:
+                print(f"Error creating {graph_id} graph: {e}")
+                fig, extend, cursor[graph_id] = dash.no_update, dash.no_update, None
+            figures.append(fig)
+            extends.append(extend)
+
+        return values, figures, extends, [cursor for _ in cursors], [version for _ in seen_versions]
 
-# Separate callback for th_in layout - Completely revised version
-@app_dash.callback(
-    [Output({'type': 'sensor-value', 'id': 'suhu-display-indoor'}, 'children', allow_duplicate=True),
-     Output({'type': 'sensor-value', 'id': 'kelembaban-display-indoor'}, 'children', allow_duplicate=True),
-     Output('temp-graph', 'figure'),
-     Output('humidity-graph', 'figure')],
-    [Input('interval_thin', 'n_intervals')],
-    prevent_initial_call=True
-)
-def update_th_in_dashboard(n):
-    try:        
-        # Default values
-        suhu_value = "N/A"
-        kelembaban_value = "N/A"
-        
-        # Empty figures with proper layout
-        empty_temp_fig = go.Figure(layout=dict(
-            title="Temperature Trend",
-            xaxis=dict(title="Time"),
-            yaxis=dict(title="Temperature (°C)", range=[0, 40]),
-            margin=dict(l=40, r=20, t=40, b=30),
-            height=150,
-            plot_bgcolor='rgba(240, 240, 240, 0.9)'
-        ))
-        
-        empty_humid_fig = go.Figure(layout=dict(
-            title="Humidity Trend",
-            xaxis=dict(title="Time"),
-            yaxis=dict(title="Humidity (%)", range=[40, 100]),
-            margin=dict(l=40, r=20, t=40, b=30),
-            height=150,
-            plot_bgcolor='rgba(240, 240, 240, 0.9)'
-        ))
-        
-        # Check if we have data
-        if not data['kodeDataSuhuIn'] or not data['kodeDataKelembabanIn'] or not data['waktu']:
-            return suhu_value, kelembaban_value, empty_temp_fig, empty_humid_fig
-        
-        # Get the latest values
-        suhu = data['kodeDataSuhuIn'][-1] if data['kodeDataSuhuIn'] else 0
-        kelembaban = data['kodeDataKelembabanIn'][-1] if data['kodeDataKelembabanIn'] else 0
-        suhu_value = f"{suhu}°C"
-        kelembaban_value = f"{kelembaban}%"
-        
-        # Create temperature graph with properly aligned x and y values
-        temp_fig = go.Figure()
-
-        try:
-            # Ensure we have data to work with
-            if len(data['waktu']) > 3 and len(data['kodeDataSuhuIn']) > 3:
-                # We'll use only 3 data points for simplicity
-                num_points = 3
-                
-                # Select evenly spaced indices from the data
-                indices = np.linspace(0, min(len(data['waktu']), len(data['kodeDataSuhuIn']))-1, num_points, dtype=int)
-                
-                # Get the selected timestamps and temperature values
-                selected_timestamps = [data['waktu'][i] for i in indices]
-                selected_values = [data['kodeDataSuhuIn'][i] for i in indices]
-                
-                # Create x values (0, 1, 2) for plotting
-                x_plot = list(range(num_points))
-                
-                # Add the simplified line
-                temp_fig.add_trace(go.Scatter(
-                    x=x_plot,  # Just use 0, 1, 2 for x values
-                    y=selected_values,
-                    mode='lines',
-                    line=dict(color='#FF4B4B', width=3, shape='spline', smoothing=1.3),
-                    fill='tozeroy',
-                    fillcolor='rgba(75, 134, 255, 0.2)',
-                    showlegend=False
-                ))
-                
-                # Set up the axis with only 3 ticks
-                temp_fig.update_layout(
-                    title="Temperature Trend",
-                    xaxis=dict(
-                        title="Time",
-                        tickmode='array',
-                        tickvals=x_plot,  # [0, 1, 2]
-                        ticktext=selected_timestamps,
-                        tickangle=0
-                    ),
-                    yaxis=dict(title="Temperature (°C)", range=[0, 40]),
-                    margin=dict(l=40, r=20, t=40, b=30),
-                    height=150,
-                    plot_bgcolor='rgba(250, 250, 250, 0.9)',
-                    showlegend=False
-                )
-                
-            else:
-                # Fallback for insufficient data
-                temp_fig.add_trace(go.Scatter(
-                    x=[0, 1],
-                    y=[0, 0],
-                    mode='lines',
-                    line=dict(color='#FF4B4B', width=3),
-                    showlegend=False
-                ))
-                temp_fig.update_layout(
-                    title="Temperature Trend - Insufficient Data",
-                    xaxis=dict(title="Time"),
-                    yaxis=dict(title="Temperature (°C)", range=[0, 40]),
-                    height=150,
-                    showlegend=False
-                )
-                
-        except Exception as e:
-            print(f"Error creating temp graph: {e}")
-            # Create a basic empty chart if there's an error
-            temp_fig = go.Figure()
-            temp_fig.add_annotation(
-                text=f"Error creating chart: {str(e)}",
-                xref="paper", yref="paper",
-                x=0.5, y=0.5, showarrow=False
-            )
-
-        # Create humidity graph with properly aligned x and y values
-        humid_fig = go.Figure()
-
-        try:
-            # Ensure we have data to work with
-            if len(data['waktu']) > 3 and len(data['kodeDataKelembabanIn']) > 3:
-                # We'll use only 3 data points for simplicity
-                num_points = 3
-                
-                # Select evenly spaced indices from the data
-                indices = np.linspace(0, min(len(data['waktu']), len(data['kodeDataKelembabanIn']))-1, num_points, dtype=int)
-                
-                # Get the selected timestamps and temperature values
-                selected_timestamps = [data['waktu'][i] for i in indices]
-                selected_values = [data['kodeDataKelembabanIn'][i] for i in indices]
-                
-                # Create x values (0, 1, 2) for plotting
-                x_plot = list(range(num_points))
-                
-                # Add the simplified line
-                humid_fig.add_trace(go.Scatter(
-                    x=x_plot,  # Just use 0, 1, 2 for x values
-                    y=selected_values,
-                    mode='lines',
-                    line=dict(color='#4B86FF', width=3, shape='spline', smoothing=1.3),
-                    fill='tozeroy',
-                    fillcolor='rgba(75, 134, 255, 0.2)',
-                    showlegend=False
-                ))
-                
-                # Set up the axis with only 3 ticks
-                humid_fig.update_layout(
-                    title="Humidity Trend",
-                    xaxis=dict(
-                        title="Time",
-                        tickmode='array',
-                        tickvals=x_plot,  # [0, 1, 2]
-                        ticktext=selected_timestamps,
-                        tickangle=0
-                    ),
-                    yaxis=dict(title="Humidity (%)", range=[40, 100]),
-                    margin=dict(l=40, r=20, t=40, b=30),
-                    height=150,
-                    plot_bgcolor='rgba(250, 250, 250, 0.9)',
-                    showlegend=False
-                )
-                
-            else:
-                # Fallback for insufficient data
-                humid_fig.add_trace(go.Scatter(
-                    x=[0, 1],
-                    y=[0, 0],
-                    mode='lines',
-                    line=dict(color='#4B86FF', width=3),
-                    showlegend=False
-                ))
-                humid_fig.update_layout(
-                    title="Humidity Trend - Insufficient Data",
-                    xaxis=dict(title="Time"),
-                    yaxis=dict(title="Humidity (%)", range=[40, 100]),
-                    height=150,
-                    showlegend=False
-                )
-                
-        except Exception as e:
-            print(f"Error creating humid graph: {e}")
-            # Create a basic empty chart if there's an error
-            humid_fig = go.Figure()
-            humid_fig.add_annotation(
-                text=f"Error creating chart: {str(e)}",
-                xref="paper", yref="paper",
-                x=0.5, y=0.5, showarrow=False
-            )
-        
-        return suhu_value, kelembaban_value, temp_fig, humid_fig
-    
-    except Exception as e:
-        print(f"Error in update_th_in_dashboard: {e}")
-        # Return default values if there's an error
-        default_fig = go.Figure(layout=dict(
-            title="Data Unavailable",
-            annotations=[dict(
-                text="Error loading data",
-                xref="paper",
-                yref="paper",
-                x=0.5,
-                y=0.5,
-                showarrow=False
-            )]
-        ))
-        return "N/A", "N/A", default_fig, default_fig
-    
-# Separate callback for th_out layout - Completely revised version
-@app_dash.callback(
-    [Output({'type': 'sensor-value', 'id': 'suhu-display-outdoor'}, 'children', allow_duplicate=True),
-     Output({'type': 'sensor-value', 'id': 'kelembaban-display-outdoor'}, 'children', allow_duplicate=True),
-     Output('temp-graph-out', 'figure'),
-     Output('humidity-graph-out', 'figure')],
-    [Input('interval_thout', 'n_intervals')],
-    prevent_initial_call=True
-)
-def update_th_out_dashboard(n):
-    try:        
-        # Default values
-        suhu_value = "N/A"
-        kelembaban_value = "N/A"
-        
-        # Empty figures with proper layout
-        empty_temp_fig = go.Figure(layout=dict(
-            title="Temperature Trend",
-            xaxis=dict(title="Time"),
-            yaxis=dict(title="Temperature (°C)", range=[0, 40]),
-            margin=dict(l=40, r=20, t=40, b=30),
-            height=150,
-            plot_bgcolor='rgba(240, 240, 240, 0.9)'
-        ))
-        
-        empty_humid_fig = go.Figure(layout=dict(
-            title="Humidity Trend",
-            xaxis=dict(title="Time"),
-            yaxis=dict(title="Humidity (%)", range=[40, 100]),
-            margin=dict(l=40, r=20, t=40, b=30),
-            height=150,
-            plot_bgcolor='rgba(240, 240, 240, 0.9)'
-        ))
-        
-        # Check if we have data
-        if not data['kodeDataSuhuOut'] or not data['kodeDataKelembabanOut'] or not data['waktu']:
-            return suhu_value, kelembaban_value, empty_temp_fig, empty_humid_fig
-        
-        # Get the latest values
-        suhu = data['kodeDataSuhuOut'][-1] if data['kodeDataSuhuOut'] else 0
-        kelembaban = data['kodeDataKelembabanOut'][-1] if data['kodeDataKelembabanOut'] else 0
-        suhu_value = f"{suhu}°C"
-        kelembaban_value = f"{kelembaban}%"
-
-        # Create temperature graph with properly aligned x and y values
-        temp_fig = go.Figure()
-
-        try:
-            # Ensure we have data to work with
-            if len(data['waktu']) > 3 and len(data['kodeDataSuhuOut']) > 3:
-                # We'll use only 3 data points for simplicity
-                num_points = 3
-                
-                # Select evenly spaced indices from the data
-                indices = np.linspace(0, min(len(data['waktu']), len(data['kodeDataSuhuOut']))-1, num_points, dtype=int)
-                
-                # Get the selected timestamps and temperature values
-                selected_timestamps = [data['waktu'][i] for i in indices]
-                selected_values = [data['kodeDataSuhuOut'][i] for i in indices]
-                
-                # Create x values (0, 1, 2) for plotting
-                x_plot = list(range(num_points))
-                
-                # Add the simplified line
-                temp_fig.add_trace(go.Scatter(
-                    x=x_plot,  # Just use 0, 1, 2 for x values
-                    y=selected_values,
-                    mode='lines',
-                    line=dict(color='#FF4B4B', width=3, shape='spline', smoothing=1.3),
-                    fill='tozeroy',
-                    fillcolor='rgba(75, 134, 255, 0.2)',
-                    showlegend=False
-                ))
-                
-                # Set up the axis with only 3 ticks
-                temp_fig.update_layout(
-                    title="Temperature Trend",
-                    xaxis=dict(
-                        title="Time",
-                        tickmode='array',
-                        tickvals=x_plot,  # [0, 1, 2]
-                        ticktext=selected_timestamps,
-                        tickangle=0
-                    ),
-                    yaxis=dict(title="Temperature (°C)", range=[0, 40]),
-                    margin=dict(l=40, r=20, t=40, b=30),
-                    height=150,
-                    plot_bgcolor='rgba(250, 250, 250, 0.9)',
-                    showlegend=False
-                )
-                
-            else:
-                # Fallback for insufficient data
-                temp_fig.add_trace(go.Scatter(
-                    x=[0, 1],
-                    y=[0, 0],
-                    mode='lines',
-                    line=dict(color='#FF4B4B', width=3),
-                    showlegend=False
-                ))
-                temp_fig.update_layout(
-                    title="Temperature Trend - Insufficient Data",
-                    xaxis=dict(title="Time"),
-                    yaxis=dict(title="Temperature (°C)", range=[0, 40]),
-                    height=150,
-                    showlegend=False
-                )
-                
-        except Exception as e:
-            print(f"Error creating temp graph: {e}")
-            # Create a basic empty chart if there's an error
-            temp_fig = go.Figure()
-            temp_fig.add_annotation(
-                text=f"Error creating chart: {str(e)}",
-                xref="paper", yref="paper",
-                x=0.5, y=0.5, showarrow=False
-            )
-
-        # Create humidity graph with properly aligned x and y values
-        humid_fig = go.Figure()
-
-        try:
-            # Ensure we have data to work with
-            if len(data['waktu']) > 3 and len(data['kodeDataKelembabanOut']) > 3:
-                # We'll use only 3 data points for simplicity
-                num_points = 3
-                
-                # Select evenly spaced indices from the data
-                indices = np.linspace(0, min(len(data['waktu']), len(data['kodeDataKelembabanOut']))-1, num_points, dtype=int)
-                
-                # Get the selected timestamps and temperature values
-                selected_timestamps = [data['waktu'][i] for i in indices]
-                selected_values = [data['kodeDataKelembabanOut'][i] for i in indices]
-                
-                # Create x values (0, 1, 2) for plotting
-                x_plot = list(range(num_points))
-                
-                # Add the simplified line
-                humid_fig.add_trace(go.Scatter(
-                    x=x_plot,  # Just use 0, 1, 2 for x values
-                    y=selected_values,
-                    mode='lines',
-                    line=dict(color='#4B86FF', width=3, shape='spline', smoothing=1.3),
-                    fill='tozeroy',
-                    fillcolor='rgba(75, 134, 255, 0.2)',
-                    showlegend=False
-                ))
-                
-                # Set up the axis with only 3 ticks
-                humid_fig.update_layout(
-                    title="Humidity Trend",
-                    xaxis=dict(
-                        title="Time",
-                        tickmode='array',
-                        tickvals=x_plot,  # [0, 1, 2]
-                        ticktext=selected_timestamps,
-                        tickangle=0
-                    ),
-                    yaxis=dict(title="Humidity (%)", range=[40, 100]),
-                    margin=dict(l=40, r=20, t=40, b=30),
-                    height=150,
-                    plot_bgcolor='rgba(250, 250, 250, 0.9)',
-                    showlegend=False
-                )
-                
-            else:
-                # Fallback for insufficient data
-                humid_fig.add_trace(go.Scatter(
-                    x=[0, 1],
-                    y=[0, 0],
-                    mode='lines',
-                    line=dict(color='#4B86FF', width=3),
-                    showlegend=False
-                ))
-                humid_fig.update_layout(
-                    title="Humidity Trend - Insufficient Data",
-                    xaxis=dict(title="Time"),
-                    yaxis=dict(title="Humidity (%)", range=[40, 100]),
-                    height=150,
-                    showlegend=False
-                )
-                
-        except Exception as e:
-            print(f"Error creating humid graph: {e}")
-            # Create a basic empty chart if there's an error
-            humid_fig = go.Figure()
-            humid_fig.add_annotation(
-                text=f"Error creating chart: {str(e)}",
-                xref="paper", yref="paper",
-                x=0.5, y=0.5, showarrow=False
-            )
-        return suhu_value, kelembaban_value, temp_fig, humid_fig
-    
     except Exception as e:
-        print(f"Error in update_th_in_dashboard: {e}")
-        # Return default values if there's an error
-        default_fig = go.Figure(layout=dict(
-            title="Data Unavailable",
-            annotations=[dict(
-                text="Error loading data",
-                xref="paper",
-                yref="paper",
-                x=0.5,
-                y=0.5,
-                showarrow=False
-            )]
-        ))
-        return "N/A", "N/A", default_fig, default_fig
-    
-# Separate callback for windspeed layout - Completely revised version
-@app_dash.callback(
-    [Output({'type': 'sensor-value', 'id': 'windspeed-display'}, 'children', allow_duplicate=True),
-     Output('windspeed-graph', 'figure')],
-    [Input('interval_windspeed', 'n_intervals')],
-    prevent_initial_call=True
+        print(f"Error in render_sensors: {e}")
+        return ({display_id: None for display_id in display_ids}, [dash.no_update] * len(graph_ids),
+                [dash.no_update] * len(graph_ids), [{} for _ in cursors], [{} for _ in seen_versions])
+
+# Teks nilai (satuan, N/A) dan warna peringatan dibuat di browser dari sensor-latest
+app_dash.clientside_callback(
+    ClientsideFunction(namespace='sensors', function_name='format'),
+    [Output({'type': 'sensor-value', 'id': ALL}, 'children'),
+     Output({'type': 'sensor-value', 'id': ALL}, 'style')],
+    Input('sensor-latest', 'data'),
+    State('sensor-format', 'data')
 )
-def update_windspeed_dashboard(n):
-    try:        
-        # Default values
-        windspeed_value = "N/A"
-        
-        # Empty figures with proper layout
-        empty_windspeed_fig = go.Figure(layout=dict(
-            title="Windspeed Trend",
-            xaxis=dict(title="Time"),
-            yaxis=dict(title="Windspeed (m/s)", range=[0, 70]),
-            margin=dict(l=40, r=20, t=40, b=30),
-            height=300,
-            plot_bgcolor='rgba(240, 240, 240, 0.9)'
-        ))
-        
-        # Check if we have data
-        if not data['kodeDataWindspeed'] or not data['waktu']:
-            return windspeed_value, empty_windspeed_fig
-        
-        # Get the latest values
-        windspeed = data['kodeDataWindspeed'][-1] if data['kodeDataWindspeed'] else 0
-        windspeed_value = f"{windspeed}m/s"
-        
-        # Create windspeed graph with properly aligned x and y values
-        windspeed_fig = go.Figure()
-
-        try:
-            # Ensure we have data to work with
-            if len(data['waktu']) > 3 and len(data['kodeDataWindspeed']) > 3:
-                # We'll use only 3 data points for simplicity
-                num_points = 3
-                
-                # Select evenly spaced indices from the data
-                indices = np.linspace(0, min(len(data['waktu']), len(data['kodeDataWindspeed']))-1, num_points, dtype=int)
-                
-                # Get the selected timestamps and temperature values
-                selected_timestamps = [data['waktu'][i] for i in indices]
-                selected_values = [data['kodeDataWindspeed'][i] for i in indices]
-                
-                # Create x values (0, 1, 2) for plotting
-                x_plot = list(range(num_points))
-                
-                # Add the simplified line
-                windspeed_fig.add_trace(go.Scatter(
-                    x=x_plot,  # Just use 0, 1, 2 for x values
-                    y=selected_values,
-                    mode='lines',
-                    line=dict(color='#4B86FF', width=3, shape='spline', smoothing=1.3),
-                    fill='tozeroy',
-                    fillcolor='rgba(75, 134, 255, 0.2)',
-                    showlegend=False
-                ))
-                
-                # Set up the axis with only 3 ticks
-                windspeed_fig.update_layout(
-                    title="Windspeed Trend",
-                    xaxis=dict(
-                        title="Time",
-                        tickmode='array',
-                        tickvals=x_plot,  # [0, 1, 2]
-                        ticktext=selected_timestamps,
-                        tickangle=0
-                    ),
-                    yaxis=dict(title="Windspeed (m/s)", range=[0, 70]),
-                    margin=dict(l=40, r=20, t=40, b=30),
-                    height=300,
-                    plot_bgcolor='rgba(250, 250, 250, 0.9)',
-                    showlegend=False
-                )
-                
-            else:
-                # Fallback for insufficient data
-                windspeed_fig.add_trace(go.Scatter(
-                    x=[0, 1],
-                    y=[0, 0],
-                    mode='lines',
-                    line=dict(color='#4B86FF', width=3),
-                    showlegend=False
-                ))
-                windspeed_fig.update_layout(
-                    title="Windspeed Trend - Insufficient Data",
-                    xaxis=dict(title="Time"),
-                    yaxis=dict(title="Windspeed (m/s)", range=[0, 70]),
-                    height=300,
-                    showlegend=False
-                )
-                
-        except Exception as e:
-            print(f"Error creating windspeed graph: {e}")
-            # Create a basic empty chart if there's an error
-            windspeed_fig = go.Figure()
-            windspeed_fig.add_annotation(
-                text=f"Error creating chart: {str(e)}",
-                xref="paper", yref="paper",
-                x=0.5, y=0.5, showarrow=False
-            )
-        return windspeed_value, windspeed_fig
-    
-    except Exception as e:
-        print(f"Error in update_th_in_dashboard: {e}")
-        # Return default values if there's an error
-        default_fig = go.Figure(layout=dict(
-            title="Data Unavailable",
-            annotations=[dict(
-                text="Error loading data",
-                xref="paper",
-                yref="paper",
-                x=0.5,
-                y=0.5,
-                showarrow=False
-            )]
-        ))
-        return "N/A", default_fig
-    
-# Separate callback for rainfall layout - Completely revised version
-@app_dash.callback(
-    [Output({'type': 'sensor-value', 'id': 'rainfall-display'}, 'children', allow_duplicate=True),
-     Output('rainfall-graph', 'figure')],
-    [Input('interval_rainfall', 'n_intervals')],
-    prevent_initial_call=True
-)
-def update_rainfall_dashboard(n):
-    try:
-        # Default values
-        rainfall_value = "N/A"
-        
-        # Empty figures with proper layout
-        empty_rainfall_fig = go.Figure(layout=dict(
-            title="Rainfall Trend",
-            xaxis=dict(title="Time"),
-            yaxis=dict(title="Rainfall (mm)", range=[0, 100]),
-            margin=dict(l=40, r=20, t=40, b=30),
-            height=300,
-            plot_bgcolor='rgba(240, 240, 240, 0.9)'
-        ))
-        
-        # Check if we have data
-        if not data['kodeDataRainfall'] or not data['waktu']:
-            return rainfall_value, empty_rainfall_fig
-        
-        # Get the latest values
-        rainfall = data['kodeDataRainfall'][-1] if data['kodeDataRainfall'] else 0
-        rainfall_value = f"{rainfall}mm"
-        
-        # Create rainfall graph with properly aligned x and y values
-        rainfall_fig = go.Figure()
-
-        try:
-            # Ensure we have data to work with
-            if len(data['waktu']) > 3 and len(data['kodeDataRainfall']) > 3:
-                # We'll use only 3 data points for simplicity
-                num_points = 3
-                
-                # Select evenly spaced indices from the data
-                indices = np.linspace(0, min(len(data['waktu']), len(data['kodeDataRainfall']))-1, num_points, dtype=int)
-                
-                # Get the selected timestamps and temperature values
-                selected_timestamps = [data['waktu'][i] for i in indices]
-                selected_values = [data['kodeDataRainfall'][i] for i in indices]
-                
-                # Create x values (0, 1, 2) for plotting
-                x_plot = list(range(num_points))
-                
-                # Add the simplified line
-                rainfall_fig.add_trace(go.Scatter(
-                    x=x_plot,  # Just use 0, 1, 2 for x values
-                    y=selected_values,
-                    mode='lines',
-                    line=dict(color='#4B86FF', width=3, shape='spline', smoothing=1.3),
-                    fill='tozeroy',
-                    fillcolor='rgba(75, 134, 255, 0.2)',
-                    showlegend=False
-                ))
-                
-                # Set up the axis with only 3 ticks
-                rainfall_fig.update_layout(
-                    title="Rainfall Trend",
-                    xaxis=dict(
-                        title="Time",
-                        tickmode='array',
-                        tickvals=x_plot,  # [0, 1, 2]
-                        ticktext=selected_timestamps,
-                        tickangle=0
-                    ),
-                    yaxis=dict(title="Rainfall (mm)", range=[0, 100]),
-                    margin=dict(l=40, r=20, t=40, b=30),
-                    height=300,
-                    plot_bgcolor='rgba(250, 250, 250, 0.9)',
-                    showlegend=False
-                )
-                
-            else:
-                # Fallback for insufficient data
-                rainfall_fig.add_trace(go.Scatter(
-                    x=[0, 1],
-                    y=[0, 0],
-                    mode='lines',
-                    line=dict(color='#4B86FF', width=3),
-                    showlegend=False
-                ))
-                rainfall_fig.update_layout(
-                    title="Rainfall Trend - Insufficient Data",
-                    xaxis=dict(title="Time"),
-                    yaxis=dict(title="Rainfall (mm)", range=[0, 100]),
-                    height=300,
-                    showlegend=False
-                )
-                
-        except Exception as e:
-            print(f"Error creating rainfall graph: {e}")
-            # Create a basic empty chart if there's an error
-            rainfall_fig = go.Figure()
-            rainfall_fig.add_annotation(
-                text=f"Error creating chart: {str(e)}",
-                xref="paper", yref="paper",
-                x=0.5, y=0.5, showarrow=False
-            )
-        return rainfall_value, rainfall_fig
-    
-    except Exception as e:
-        print(f"Error in update_th_in_dashboard: {e}")
-        # Return default values if there's an error
-        default_fig = go.Figure(layout=dict(
-            title="Data Unavailable",
-            annotations=[dict(
-                text="Error loading data",
-                xref="paper",
-                yref="paper",
-                x=0.5,
-                y=0.5,
-                showarrow=False
-            )]
-        ))
-        return "N/A", default_fig
-    
-# Separate callback for co2 layout - Completely revised version
-@app_dash.callback(
-    [Output({'type': 'sensor-value', 'id': 'co2-display'}, 'children', allow_duplicate=True),
-     Output('co2-graph', 'figure')],
-    [Input('interval_co2', 'n_intervals')],
-    prevent_initial_call=True
-)
-def update_co2_dashboard(n):
-    try:
-        # Default values
-        co2_value = "N/A"
-        
-        # Empty figures with proper layout
-        co2_fig = go.Figure(layout=dict(
-            title="CO2 Trend",
-            xaxis=dict(title="Time"),
-            yaxis=dict(title="CO2 (PPM)", range=[400, 1000]),
-            margin=dict(l=40, r=20, t=40, b=30),
-            height=300,
-            plot_bgcolor='rgba(240, 240, 240, 0.9)'
-        ))
-        
-        # Check if we have data
-        if not data['kodeDataCo2'] or not data['waktu']:
-            return co2_value, co2_fig
-        
-        # Get the latest values
-        co2 = data['kodeDataCo2'][-1] if data['kodeDataCo2'] else 0
-        co2_value = f"{co2}PPM"
-        
-
-        # Create co2 graph with properly aligned x and y values
-        co2_fig = go.Figure()
-
-        try:
-            # Ensure we have data to work with
-            if len(data['waktu']) > 3 and len(data['kodeDataCo2']) > 3:
-                # We'll use only 3 data points for simplicity
-                num_points = 3
-                
-                # Select evenly spaced indices from the data
-                indices = np.linspace(0, min(len(data['waktu']), len(data['kodeDataCo2']))-1, num_points, dtype=int)
-                
-                # Get the selected timestamps and temperature values
-                selected_timestamps = [data['waktu'][i] for i in indices]
-                selected_values = [data['kodeDataCo2'][i] for i in indices]
-                
-                # Create x values (0, 1, 2) for plotting
-                x_plot = list(range(num_points))
-                
-                # Add the simplified line
-                co2_fig.add_trace(go.Scatter(
-                    x=x_plot,  # Just use 0, 1, 2 for x values
-                    y=selected_values,
-                    mode='lines',
-                    line=dict(color='#4B86FF', width=3, shape='spline', smoothing=1.3),
-                    fill='tozeroy',
-                    fillcolor='rgba(75, 134, 255, 0.2)',
-                    showlegend=False
-                ))
-                
-                # Set up the axis with only 3 ticks
-                co2_fig.update_layout(
-                    title="CO2 Trend",
-                    xaxis=dict(
-                        title="Time",
-                        tickmode='array',
-                        tickvals=x_plot,  # [0, 1, 2]
-                        ticktext=selected_timestamps,
-                        tickangle=0
-                    ),
-                    yaxis=dict(title="CO2 (PPM)", range=[0, 1000]),
-                    margin=dict(l=40, r=20, t=40, b=30),
-                    height=300,
-                    plot_bgcolor='rgba(250, 250, 250, 0.9)',
-                    showlegend=False
-                )
-                
-            else:
-                # Fallback for insufficient data
-                co2_fig.add_trace(go.Scatter(
-                    x=[0, 1],
-                    y=[0, 0],
-                    mode='lines',
-                    line=dict(color='#4B86FF', width=3),
-                    showlegend=False
-                ))
-                co2_fig.update_layout(
-                    title="CO2 Trend - Insufficient Data",
-                    xaxis=dict(title="Time"),
-                    yaxis=dict(title="CO2 (PPM)", range=[0, 1000]),
-                    height=300,
-                    showlegend=False
-                )
-                
-        except Exception as e:
-            print(f"Error creating co2 graph: {e}")
-            # Create a basic empty chart if there's an error
-            co2_fig = go.Figure()
-            co2_fig.add_annotation(
-                text=f"Error creating chart: {str(e)}",
-                xref="paper", yref="paper",
-                x=0.5, y=0.5, showarrow=False
-            )
-        return co2_value, co2_fig
-    
-    except Exception as e:
-        print(f"Error in update_th_in_dashboard: {e}")
-        # Return default values if there's an error
-        default_fig = go.Figure(layout=dict(
-            title="Data Unavailable",
-            annotations=[dict(
-                text="Error loading data",
-                xref="paper",
-                yref="paper",
-                x=0.5,
-                y=0.5,
-                showarrow=False
-            )]
-        ))
-        return "N/A", default_fig
-    
-# Separate callback for PAR layout - Completely revised version
-@app_dash.callback(
-    [Output({'type': 'sensor-value', 'id': 'par-display'}, 'children', allow_duplicate=True),
-     Output('par-graph', 'figure')],
-    [Input('interval_par', 'n_intervals')],
-    prevent_initial_call=True
-)
-def update_par_dashboard(n):
-    try:
-        # Default values
-        par_value = "N/A"
-        
-        # Empty figures with proper layout
-        par_fig = go.Figure(layout=dict(
-            title="PAR Trend",
-            xaxis=dict(title="Time"),
-            yaxis=dict(title="PAR (μmol/m²/s)", range=[0, 400]),
-            margin=dict(l=40, r=20, t=40, b=30),
-            height=300,
-            plot_bgcolor='rgba(240, 240, 240, 0.9)'
-        ))
-        
-        # Check if we have data
-        if not data['kodeDataPar'] or not data['waktu']:
-            return par_value, par_fig
-        
-        # Get the latest values
-        par = data['kodeDataPar'][-1] if data['kodeDataPar'] else 0
-        par_value = f"{par}μmol/m²/s"
-        
-        # Create par graph with properly aligned x and y values
-        par_fig = go.Figure()
-
-        try:
-            # Ensure we have data to work with
-            if len(data['waktu']) > 3 and len(data['kodeDataPar']) > 3:
-                # We'll use only 3 data points for simplicity
-                num_points = 3
-                
-                # Select evenly spaced indices from the data
-                indices = np.linspace(0, min(len(data['waktu']), len(data['kodeDataPar']))-1, num_points, dtype=int)
-                
-                # Get the selected timestamps and temperature values
-                selected_timestamps = [data['waktu'][i] for i in indices]
-                selected_values = [data['kodeDataPar'][i] for i in indices]
-                
-                # Create x values (0, 1, 2) for plotting
-                x_plot = list(range(num_points))
-                
-                # Add the simplified line
-                par_fig.add_trace(go.Scatter(
-                    x=x_plot,  # Just use 0, 1, 2 for x values
-                    y=selected_values,
-                    mode='lines',
-                    line=dict(color='#4B86FF', width=3, shape='spline', smoothing=1.3),
-                    fill='tozeroy',
-                    fillcolor='rgba(75, 134, 255, 0.2)',
-                    showlegend=False
-                ))
-                
-                # Set up the axis with only 3 ticks
-                par_fig.update_layout(
-                    title="PAR Trend",
-                    xaxis=dict(
-                        title="Time",
-                        tickmode='array',
-                        tickvals=x_plot,  # [0, 1, 2]
-                        ticktext=selected_timestamps,
-                        tickangle=0
-                    ),
-                    yaxis=dict(title="PAR (μmol/m²/s)", range=[0, 400]),
-                    margin=dict(l=40, r=20, t=40, b=30),
-                    height=300,
-                    plot_bgcolor='rgba(250, 250, 250, 0.9)',
-                    showlegend=False
-                )
-                
-            else:
-                # Fallback for insufficient data
-                par_fig.add_trace(go.Scatter(
-                    x=[0, 1],
-                    y=[0, 0],
-                    mode='lines',
-                    line=dict(color='#4B86FF', width=3),
-                    showlegend=False
-                ))
-                par_fig.update_layout(
-                    title="PAR Trend - Insufficient Data",
-                    xaxis=dict(title="Time"),
-                    yaxis=dict(title="PAR (μmol/m²/s)", range=[0, 400]),
-                    height=300,
-                    showlegend=False
-                )
-                
-        except Exception as e:
-            print(f"Error creating par graph: {e}")
-            # Create a basic empty chart if there's an error
-            par_fig = go.Figure()
-            par_fig.add_annotation(
-                text=f"Error creating chart: {str(e)}",
-                xref="paper", yref="paper",
-                x=0.5, y=0.5, showarrow=False
-            )
-        return par_value, par_fig
-    
-    except Exception as e:
-        print(f"Error in update_th_in_dashboard: {e}")
-        # Return default values if there's an error
-        default_fig = go.Figure(layout=dict(
-            title="Data Unavailable",
-            annotations=[dict(
-                text="Error loading data",
-                xref="paper",
-                yref="paper",
-                x=0.5,
-                y=0.5,
-                showarrow=False
-            )]
-        ))
-        return "N/A", default_fig
 
 # Add this function to help debug what's happening with your data
 # and the table th_in
 @app_dash.callback(
-    Output('historical-table-th-in', 'data'),
-    [Input('interval_thin', 'n_intervals')]
+    [Output('historical-table-th-in', 'data'),
+     Output('table-version', 'data')],
+    [Input('interval_sensors', 'n_intervals'),
+     Input('sensor-tick', 'data'),
+     Input('device-select', 'value')],
+    [State('table-version', 'data')]
 )
-def update_historical_table(n):
-    try:            
-        # Create table data from the last 4 entries
-        sample_size = min(2, len(data['waktu']))
-        table_data = []
-        
-        for i in range(sample_size):
-            idx = -(i+1)  # Index from the end of the list
-            table_data.append({
-                "time": data['waktu'][idx] if idx < len(data['waktu']) else "",
-                "temperature_in_historical": f"{data['kodeDataSuhuIn'][idx]:.1f}%" if idx < len(data['kodeDataSuhuIn']) else "",
-                "humidity_in_historical": f"{data['kodeDataKelembabanIn'][idx]:.1f}%" if idx < len(data['kodeDataKelembabanIn']) else ""
-            })
-            
-        return table_data
+def update_historical_table(n, tick=None, device_id=None, seen_version=None):
+    try:
+        device = get_device(device_id)
+        version = data_version(device, ['kodeDataSuhuIn', 'kodeDataKelembabanIn'])
+        if version == seen_version:
+            return dash.no_update, dash.no_update
+        return cached('update_historical_table', version, lambda: historical_rows(device)), version
     except Exception as e:
         print(f"Error in update_historical_table: {e}")
-        return [{}]
+        return [{}], None
     
+def historical_rows(device):
+    """Rows of the th_in historical table from the last 2 temperature samples"""
+    series = read_series(device)
+    suhu_ts, suhu_values = series['kodeDataSuhuIn']
+    kelembaban_ts, kelembaban_values = series['kodeDataKelembabanIn']
+    sample_size = min(2, len(suhu_values))
+    table_data = []
+    
+    for i in range(sample_size):
+        idx = -(i+1)  # Index from the end of the list
+        # Humidity sample terakhir pada atau sebelum waktu sampel suhu
+        k = np.searchsorted(kelembaban_ts, suhu_ts[idx], side='right') - 1
+        table_data.append({
+            "time": format_time(suhu_ts[idx]),
+            "temperature_in_historical": f"{suhu_values[idx]:.1f}%",
+            "humidity_in_historical": f"{kelembaban_values[k]:.1f}%" if k >= 0 else ""
+        })
+    return table_data
+
 # Callbacks to logout
 @app_dash.callback(
     Output("logout-redirect", "href"),
@@ -1271,11 +636,26 @@ def login_redirect(n_clicks):
 @app_dash.callback(
     [Output('gps-map', 'figure'),
      Output('current-location-text', 'children'),
-     Output('current-coordinates', 'children')],
-    [Input('interval_gps', 'n_intervals')]
+     Output('current-coordinates', 'children'),
+     Output('gps-version', 'data')],
+    [Input('interval_sensors', 'n_intervals'),
+     Input('sensor-tick', 'data'),
+     Input('device-select', 'value')],
+    [State('gps-version', 'data')]
 )
-def update_gps_data(n_intervals):
+def update_gps_data(n_intervals, tick=None, device_id=None, seen_version=None):
     """Update GPS map and location information using MQTT data"""
+    device = get_device(device_id)
+    # Posisi belum berubah sejak peta terakhir dikirim
+    version = data_version(device, ['kodeDataLat', 'kodeDataLon'])
+    if version == seen_version:
+        return dash.no_update, dash.no_update, dash.no_update, dash.no_update
+    # Peta dibangun sekali per posisi baru, dipakai semua client
+    fig, location_name, coordinates_text = cached('update_gps_data', version, lambda: gps_map(device))
+    return fig, location_name, coordinates_text, version
+
+def gps_map(device):
+    """(map figure dict, location name, coordinates text) for the device's latest position"""
     # Add eFarming Corpora Community to LOCATIONS
     efarming_location = {"name": "eFarming Corpora Community", "lat": -6.880044, "lon": 107.6772643}
     
@@ -1283,10 +663,10 @@ def update_gps_data(n_intervals):
     locations = LOCATIONS + [efarming_location]
     
     # Check if we have GPS data from MQTT
-    if data["kodeDataLat"] and data["kodeDataLon"]:
+    if len(device.store['kodeDataLat']) and len(device.store['kodeDataLon']):
         # Use the latest GPS coordinates from the MQTT data
-        current_lat = data["kodeDataLat"][-1]
-        current_lon = data["kodeDataLon"][-1]
+        current_lat = device.store.latest('kodeDataLat')
+        current_lon = device.store.latest('kodeDataLon')
         
         # Find closest known location
         min_distance = float('inf')
@@ -1302,70 +682,8 @@ def update_gps_data(n_intervals):
         current_lon = efarming_location["lon"]
         location_name = "eFarming Corpora Community"
     
-    # Create the map figure
-    fig = go.Figure()
-    
-    # Add main device marker
-    fig.add_trace(go.Scattermapbox(
-        lat=[current_lat],
-        lon=[current_lon],
-        mode='markers',
-        marker=dict(
-            size=15,
-            color='red',
-        ),
-        text=["Current Device Location"],
-        name="Device"
-    ))
-    
-    # Add known locations as reference points
-    fig.add_trace(go.Scattermapbox(
-        lat=[loc["lat"] for loc in locations],
-        lon=[loc["lon"] for loc in locations],
-        mode='markers',
-        marker=dict(
-            size=10,
-            color='blue',
-        ),
-        text=[loc["name"] for loc in locations],
-        name="Reference Points"
-    ))
-    
-    # Add path history (last few points)
-    # history_length = min(10, len(data["kodeDataLat"]))
-    # if history_length > 1:
-    #     # Get the last few GPS points from the MQTT data
-    #     path_lats = data["kodeDataLat"][-history_length:]
-    #     path_lons = data["kodeDataLon"][-history_length:]
-        
-    #     fig.add_trace(go.Scattermapbox(
-    #         lat=path_lats,
-    #         lon=path_lons,
-    #         mode='lines',
-    #         line=dict(width=2, color='orange'),
-    #         name="Device Path"
-    #     ))
-    
-    # Configure the map layout
-    fig.update_layout(
-        mapbox=dict(
-            style="open-street-map",
-            center=dict(lat=current_lat, lon=current_lon),  # Center on current coordinates
-            zoom=15,  # Default zoom level (slightly zoomed in)
-            uirevision=f"{current_lat}_{current_lon}"  # Preserve zoom level while centered on current point
-        ),
-        margin=dict(l=0, r=0, t=0, b=0),
-        height=500,
-        legend=dict(
-            yanchor="top",
-            y=0.99,
-            xanchor="left",
-            x=0.01,
-            bgcolor="rgba(255,255,255,0.8)"
-        ),
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-    )
+    # Spec peta sebagai dict biasa, tanpa validasi go.Figure per render
+    fig = map_figure(current_lat, current_lon, locations)
     
     # Format coordinates as a string with 6 decimal places
     coordinates_text = f"{current_lat:.6f}, {current_lon:.6f}"
@@ -1373,5 +691,33 @@ def update_gps_data(n_intervals):
     return fig, location_name, coordinates_text
 
 # Run server
+_started = False
+_start_lock = threading.Lock()
+
+def create_app(start_mqtt=True):
+    """Start the background services once per process and return the Flask server.
+
+    Every open tab keeps one /push/stream request open, so run gunicorn with
+    threaded workers. With MCS_SHARED_STORE set the workers only read the
+    shared store filled by a separate ingest daemon:
+
+        MCS_SHARED_STORE=mcs python -m core.ingest_service
+        MCS_SHARED_STORE=mcs gunicorn -w 4 -k gthread --threads 32 'app:create_app()'
+    """
+    global _started, devices, ingest_feed
+    with _start_lock:
+        if _started:
+            return server
+        atexit.register(push.close)
+        if SHARED_STORE:
+            devices = SharedDeviceRegistry(SHARED_STORE, lambda device_id: create_shared_device(device_id, history),
+                                           placeholder=create_device)
+            ingest_feed = FeedClient(INGEST_SOCKET, push.publish).start()
+            atexit.register(ingest_feed.stop)
+        else:
+            ingest_service.start(start_mqtt)
+        _started = True
+    return server
+
 if __name__ == '__main__':
-    server.run(host='0.0.0.0', port=5000)
+    create_app().run(host='0.0.0.0', port=5000)
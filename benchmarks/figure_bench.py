@@ -0,0 +1,179 @@
+# Benchmark pembuatan figure: go.Figure (dengan validasi) vs spec dict di core/figures.py
+"""Figure construction benchmark.
+
+Compares the dict builders in core/figures.py (trend_figure, map_figure)
+with the go.Figure / add_trace / update_layout code they replace: the area
+trend of the old update_th_in_dashboard callback and the map of
+update_gps_data. Before timing, each pair is checked to produce the same
+figure JSON.
+
+Run from the repository root:
+
+    python -m benchmarks.figure_bench
+    python -m benchmarks.figure_bench --points 2000 --repeat 500
+"""
+import argparse
+import base64
+import json
+import sys
+import time
+import warnings
+import numpy as np
+import plotly.graph_objects as go
+from plotly.utils import PlotlyJSONEncoder
+from core.figures import TREND_GRAPHS, trend_figure, map_figure
+
+# Sama dengan LOCATIONS + eFarming di app.py
+LOCATIONS = [
+    {"name": "Bandung City Square", "lat": -6.921151, "lon": 107.607301},
+    {"name": "Gedung Sate", "lat": -6.902454, "lon": 107.618881},
+    {"name": "Dago Street", "lat": -6.893702, "lon": 107.613251},
+    {"name": "Bandung Station", "lat": -6.914744, "lon": 107.602458},
+    {"name": "Paris Van Java Mall", "lat": -6.888771, "lon": 107.595337},
+    {"name": "eFarming Corpora Community", "lat": -6.880044, "lon": 107.6772643},
+]
+
+
+def go_trend_figure(graph_id, x, y, tickvals, ticktext):
+    """Reference: area trend built with go.Figure like update_th_in_dashboard did"""
+    spec = TREND_GRAPHS[graph_id]
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=x,
+        y=y,
+        mode='lines',
+        line=dict(color=spec['color'], width=3, shape='spline', smoothing=1.3),
+        fill='tozeroy',
+        fillcolor='rgba(75, 134, 255, 0.2)',
+        showlegend=False
+    ))
+    fig.update_layout(
+        title=spec['title'],
+        xaxis=dict(
+            title="Time",
+            tickmode='array',
+            tickvals=tickvals,
+            ticktext=ticktext,
+            tickangle=0
+        ),
+        yaxis=dict(title=spec['y_title'], range=spec['y_range']),
+        margin=dict(l=40, r=20, t=40, b=30),
+        height=spec['height'],
+        plot_bgcolor='rgba(250, 250, 250, 0.9)',
+        showlegend=False
+    )
+    return fig
+
+
+def go_map_figure(lat, lon, locations):
+    """Reference: GPS map built with go.Figure like update_gps_data did"""
+    fig = go.Figure()
+    fig.add_trace(go.Scattermapbox(
+        lat=[lat],
+        lon=[lon],
+        mode='markers',
+        marker=dict(size=15, color='red'),
+        text=["Current Device Location"],
+        name="Device"
+    ))
+    fig.add_trace(go.Scattermapbox(
+        lat=[loc["lat"] for loc in locations],
+        lon=[loc["lon"] for loc in locations],
+        mode='markers',
+        marker=dict(size=10, color='blue'),
+        text=[loc["name"] for loc in locations],
+        name="Reference Points"
+    ))
+    fig.update_layout(
+        mapbox=dict(
+            style="open-street-map",
+            center=dict(lat=lat, lon=lon),
+            zoom=15,
+            uirevision=f"{lat}_{lon}"
+        ),
+        margin=dict(l=0, r=0, t=0, b=0),
+        height=500,
+        legend=dict(yanchor="top", y=0.99, xanchor="left", x=0.01, bgcolor="rgba(255,255,255,0.8)"),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+    )
+    return fig
+
+
+def to_json(fig):
+    """Figure as Dash sends it (same encoder for go.Figure and dict)"""
+    return json.dumps(fig, cls=PlotlyJSONEncoder)
+
+
+def normalize(obj):
+    """Decoded JSON figure with Plotly typed arrays ({'dtype', 'bdata'}) turned back into lists"""
+    if isinstance(obj, dict):
+        if set(obj) == {'dtype', 'bdata'}:
+            return np.frombuffer(base64.b64decode(obj['bdata']), dtype=obj['dtype']).tolist()
+        return {key: normalize(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [normalize(item) for item in obj]
+    return obj
+
+
+def trend_inputs(points):
+    """x (epoch seconds), y and 3 ticks like trend_xy in app.py"""
+    x = time.time() - np.arange(points)[::-1] * 1.2
+    y = np.round(25 + 5 * np.sin(np.arange(points) / 50), 2)
+    ticks = np.linspace(0, points - 1, 3, dtype=int)
+    return x, y, x[ticks], ["10:00", "10:10", "10:20"]
+
+
+def timed(build, repeat):
+    """(mean build ms, mean build + JSON ms)"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        build()
+    build_ms = (time.perf_counter() - start) * 1000 / repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        to_json(build())
+    return build_ms, (time.perf_counter() - start) * 1000 / repeat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--points', type=int, default=640, help='points per trend trace')
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args(argv)
+    # go.Scattermapbox memberi DeprecationWarning tiap pemanggilan
+    warnings.simplefilter('ignore', DeprecationWarning)
+
+    x, y, tickvals, ticktext = trend_inputs(args.points)
+    lat, lon = -6.914744, 107.609810
+    cases = {
+        'trend (update_th_in_dashboard)': (
+            lambda: go_trend_figure('temp-graph', x, y, tickvals, ticktext),
+            lambda: trend_figure('temp-graph', x, y, tickvals, ticktext)),
+        'map (update_gps_data)': (
+            lambda: go_map_figure(lat, lon, LOCATIONS),
+            lambda: map_figure(lat, lon, LOCATIONS)),
+    }
+
+    # Output harus sama persis sebelum kecepatannya dibandingkan
+    failed = []
+    for name, (reference, fast) in cases.items():
+        if normalize(json.loads(to_json(reference()))) != normalize(json.loads(to_json(fast()))):
+            failed.append(name)
+
+    print(f"{'figure':<32} {'path':<10} {'build ms':>9} {'+json ms':>9} {'speedup':>8}")
+    for name, (reference, fast) in cases.items():
+        ref_build, ref_total = timed(reference, args.repeat)
+        fast_build, fast_total = timed(fast, args.repeat)
+        print(f"{name:<32} {'go.Figure':<10} {ref_build:>9.3f} {ref_total:>9.3f}")
+        print(f"{'':<32} {'dict':<10} {fast_build:>9.3f} {fast_total:>9.3f} {ref_total / fast_total:>7.1f}x")
+
+    if failed:
+        print("\nOutput differs from go.Figure: " + ", ".join(failed))
+        return 1
+    print("\nOutput identical to go.Figure for all figures")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+# Laporan waktu import saat start: per modul, per package, dan waktu membuat layout tiap halaman
+"""Startup import-time report.
+
+Imports app.py in a fresh interpreter with `python -X importtime` and breaks
+the time down:
+
+  direct imports   modules app.py imports itself, with everything they pull in
+  packages         self time summed per top-level package (dash, numpy, ...)
+  slowest modules  modules with the largest self time
+
+Page layouts are imported on first navigation (load_layout in app.py), their
+cost is measured separately per page in another fresh interpreter.
+
+Fails (exit code 1) when importing app takes longer than --budget seconds.
+
+Run from the repository root:
+
+    python -m benchmarks.import_report
+    python -m benchmarks.import_report --top 30 --budget 1.5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+# Mengukur load_layout tiap halaman setelah import app, hasil dicetak sebagai JSON
+PAGE_TIMER = """
+import json, time, app
+result = {}
+for path in list(app.pages) + list(app.engineer_pages):
+    start = time.perf_counter()
+    app.load_layout(path)
+    result[path] = time.perf_counter() - start
+print(json.dumps(result))
+"""
+
+
+def run_python(args):
+    # Folder histori sementara, import app tidak menyentuh folder histori asli
+    with tempfile.TemporaryDirectory() as history_dir:
+        env = dict(os.environ, MCS_HISTORY_DIR=history_dir)
+        return subprocess.run([sys.executable] + args, env=env, capture_output=True, text=True, check=True)
+
+
+def parse_importtime(stderr):
+    """[(depth, module, self us, cumulative us)] in the order -X importtime prints them"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' '))) // 2
+        rows.append((depth, name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def direct_imports(rows, root):
+    """(module, cumulative us) of the modules imported directly by root, largest first"""
+    # Baris dicetak setelah semua import di dalamnya, jadi anak root berada tepat sebelum root
+    end = max(i for i, row in enumerate(rows) if row[1] == root and row[0] == 0)
+    start = end
+    while start > 0 and rows[start - 1][0] > 0:
+        start -= 1
+    children = [(name, cumulative) for depth, name, _, cumulative in rows[start:end] if depth == 1]
+    return sorted(children, key=lambda item: -item[1]), rows[end][3]
+
+
+def by_package(rows):
+    totals = {}
+    for _, name, self_us, _ in rows:
+        package = name.split('.')[0]
+        totals[package] = totals.get(package, 0) + self_us
+    return sorted(totals.items(), key=lambda item: -item[1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--budget', type=float, default=None, help='max seconds to import app')
+    args = parser.parse_args(argv)
+
+    rows = parse_importtime(run_python(['-X', 'importtime', '-c', 'import app']).stderr)
+    children, total_us = direct_imports(rows, 'app')
+
+    print(f"import app: {total_us / 1e6:.3f} s, {len(rows)} modules\n")
+    print(f"{'direct import':<40} {'ms':>9} {'share':>7}")
+    for name, cumulative in children[:args.top]:
+        print(f"{name:<40} {cumulative / 1000:>9.1f} {cumulative / total_us:>6.0%}")
+
+    print(f"\n{'package (self time)':<40} {'ms':>9}")
+    for package, self_us in by_package(rows)[:args.top]:
+        print(f"{package:<40} {self_us / 1000:>9.1f}")
+
+    print(f"\n{'slowest module (self time)':<40} {'ms':>9}")
+    for _, name, self_us, _ in sorted(rows, key=lambda row: -row[2])[:args.top]:
+        print(f"{name:<40} {self_us / 1000:>9.1f}")
+
+    pages = json.loads(run_python(['-c', PAGE_TIMER]).stdout.strip().splitlines()[-1])
+    print(f"\n{'page layout (first navigation)':<40} {'ms':>9}")
+    for path, seconds in pages.items():
+        print(f"{path:<40} {seconds * 1000:>9.1f}")
+
+    if args.budget is not None and total_us / 1e6 > args.budget:
+        print(f"\nimport app takes {total_us / 1e6:.3f} s, over the {args.budget:.3f} s budget")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,315 @@
+# Benchmark throughput dan latency jalur ingest MQTT
+"""Ingest throughput / latency benchmark.
+
+Drives the same path as `IngestService.on_message` (IngestPipeline + BatchWriter
+into the device registry and on-disk history) with fake paho messages,
+either directly or through a local broker stand-in (a socket pair read by a
+network-loop thread, like paho's `loop_forever`).
+
+Run from the repository root:
+
+    python -m benchmarks.ingest_bench
+    python -m benchmarks.ingest_bench --mode broker --rate 500 --devices 24 --mix frame-binary
+    python -m benchmarks.ingest_bench --save-baseline   # write benchmarks/baseline.json
+    python -m benchmarks.ingest_bench --compare         # fail on regressions vs the baseline
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import struct
+import sys
+import tempfile
+import threading
+import time
+import numpy as np
+from core.config import METRICS, ROLLUP_METRICS
+from core.devices import Device, DeviceRegistry
+from core.frames import encode_frame
+from core.history import HistoryStore
+from core.ingest import IngestPipeline, BatchWriter
+
+MIXES = ('single', 'frame-json', 'frame-binary', 'mixed')
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+class FakeMessage:
+    """Minimal stand-in for paho.mqtt.client.MQTTMessage"""
+
+    __slots__ = ('topic', 'payload', 'qos', 'retain')
+
+    def __init__(self, topic, payload):
+        self.topic = topic
+        self.payload = payload
+        self.qos = 0
+        self.retain = False
+
+
+def make_messages(n_devices, mix, seed=1):
+    """Pre-built message cycle for the given device count and topic mix"""
+    rng = random.Random(seed)
+    messages = []
+    for d in range(n_devices):
+        device = f"gh-{d:02d}"
+        values = {metric: round(rng.uniform(0, 100), 2) for metric in METRICS}
+        if mix in ('single', 'mixed'):
+            messages += [FakeMessage(f"mcs/{device}/{metric}", str(value).encode())
+                         for metric, value in values.items()]
+        if mix in ('frame-json', 'mixed'):
+            # Tanpa ts: pesan dikirim berulang, timestamp tetap akan ditolak sebagai out of order
+            messages.append(FakeMessage(f"mcs/{device}/frame", json.dumps(values).encode()))
+        if mix in ('frame-binary', 'mixed'):
+            messages.append(FakeMessage(f"mcs/{device}/frame", encode_frame(values, METRICS)))
+    rng.shuffle(messages)
+    return messages
+
+
+def samples_per_message(messages):
+    """Average number of sensor samples carried per message"""
+    total = sum(len(METRICS) if msg.topic.endswith('/frame') else 1 for msg in messages)
+    return total / len(messages)
+
+
+class LocalBroker:
+    """Broker stand-in: publishes go through a socket pair, a network-loop
+    thread reads them and calls on_message like paho's loop_forever"""
+
+    HEADER = struct.Struct('<HI')
+
+    def __init__(self, on_message):
+        self.on_message = on_message
+        self._tx, self._rx = socket.socketpair()
+        self._thread = threading.Thread(target=self._loop, name='broker-loop', daemon=True)
+        self._lock = threading.Lock()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def publish(self, topic, payload):
+        topic = topic.encode()
+        with self._lock:
+            self._tx.sendall(self.HEADER.pack(len(topic), len(payload)) + topic + payload)
+
+    def close(self):
+        self._tx.close()
+        self._thread.join()
+        self._rx.close()
+
+    def _recv_exact(self, buffer, n):
+        while len(buffer) < n:
+            chunk = self._rx.recv(65536)
+            if not chunk:
+                return None
+            buffer += chunk
+        return buffer
+
+    def _loop(self):
+        buffer = b''
+        header = self.HEADER
+        while True:
+            buffer = self._recv_exact(buffer, header.size)
+            if buffer is None:
+                return
+            topic_len, payload_len = header.unpack_from(buffer)
+            end = header.size + topic_len + payload_len
+            buffer = self._recv_exact(buffer, end)
+            if buffer is None:
+                return
+            topic = buffer[header.size:header.size + topic_len].decode()
+            payload = buffer[header.size + topic_len:end]
+            buffer = buffer[end:]
+            self.on_message(None, None, FakeMessage(topic, payload))
+
+
+def rss_mb():
+    """Current resident set size in MB"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(mode='direct', rate=0, duration=5.0, n_devices=1, mix='single',
+        queue_size=10000, batch_size=500, overflow='drop_oldest'):
+    """Run one scenario and return its measurements"""
+    with tempfile.TemporaryDirectory() as root:
+        history = HistoryStore(root).start()
+        devices = DeviceRegistry(lambda device_id: Device(device_id, METRICS, ROLLUP_METRICS))
+        writer = BatchWriter(devices, history, METRICS)
+
+        latencies = []
+        finished = [time.perf_counter()]
+
+        def handler(batch):
+            errors = writer(batch)
+            now = time.time_ns()
+            latencies.extend(now - ts for _, _, ts in batch)
+            finished[0] = time.perf_counter()
+            return errors
+
+        pipeline = IngestPipeline(handler, maxsize=queue_size, batch_size=batch_size, overflow=overflow).start()
+
+        # Sama dengan IngestService.on_message
+        def on_message(client, userdata, msg):
+            pipeline.submit(msg.topic, msg.payload, time.time_ns())
+
+        broker = LocalBroker(on_message).start() if mode == 'broker' else None
+        publish = (lambda msg: broker.publish(msg.topic, msg.payload)) if broker else (lambda msg: on_message(None, None, msg))
+
+        messages = make_messages(n_devices, mix)
+        depths = []
+        stop = threading.Event()
+
+        def sample_depth():
+            while not stop.is_set():
+                depths.append(pipeline.queue.qsize())
+                time.sleep(0.05)
+
+        sampler = threading.Thread(target=sample_depth, daemon=True)
+        sampler.start()
+        rss_before = rss_mb()
+
+        sent = 0
+        start = time.perf_counter()
+        deadline = start + duration
+        n = len(messages)
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            # Kirim sesuai rate target (0 = secepat mungkin), dicek setiap 1 ms
+            target = sent + 1000 if rate <= 0 else int((now - start) * rate)
+            while sent < target:
+                publish(messages[sent % n])
+                sent += 1
+            if rate > 0:
+                time.sleep(0.001)
+        publish_elapsed = time.perf_counter() - start
+
+        if broker:
+            broker.close()
+        pipeline.stop(timeout=60)
+        # Sampai batch terakhir selesai ditulis, tanpa jeda idle writer saat stop
+        elapsed = max(finished[0], start + publish_elapsed) - start
+        stop.set()
+        sampler.join()
+        history.close()
+        rss_after = rss_mb()
+
+        stats = pipeline.snapshot()
+        # Pesan yang diproses tapi tidak disimpan (frame out of order) tidak dihitung sebagai throughput
+        stored = stats['processed'] - writer.stats['out_of_order']
+        lat_ms = np.asarray(latencies, dtype=np.float64) / 1e6
+        return {
+            'mode': mode,
+            'mix': mix,
+            'rate': rate,
+            'devices': n_devices,
+            'duration_s': round(elapsed, 3),
+            'published': sent,
+            'publish_msgs_per_sec': round(sent / publish_elapsed, 1),
+            'msgs_per_sec': round(stored / elapsed, 1),
+            'samples_per_sec': round(stored * samples_per_message(messages) / elapsed, 1),
+            'dropped': stats['dropped'],
+            'out_of_order': writer.stats['out_of_order'],
+            'errors': stats['errors'],
+            'batches': stats['batches'],
+            'max_batch_size': stats['max_batch_size'],
+            'latency_p50_ms': round(float(np.percentile(lat_ms, 50)), 3) if len(lat_ms) else None,
+            'latency_p99_ms': round(float(np.percentile(lat_ms, 99)), 3) if len(lat_ms) else None,
+            'queue_depth_mean': round(float(np.mean(depths)), 1) if depths else 0,
+            'queue_depth_max': stats['max_queue_depth'],
+            'rss_mb': round(rss_after, 1),
+            'rss_delta_mb': round(rss_after - rss_before, 1),
+        }
+
+
+def scenario_key(result):
+    return f"{result['mode']}/{result['mix']}/rate={result['rate']}/devices={result['devices']}"
+
+
+def compare(result, baseline, tolerance):
+    """List of regression messages of result vs its baseline entry"""
+    problems = []
+    base = baseline.get(scenario_key(result))
+    if base is None:
+        return [f"no baseline for {scenario_key(result)}"]
+    if result['msgs_per_sec'] < base['msgs_per_sec'] * (1 - tolerance):
+        problems.append(f"msgs/sec {result['msgs_per_sec']} < baseline {base['msgs_per_sec']}")
+    for key in ('latency_p50_ms', 'latency_p99_ms'):
+        if result[key] is not None and base.get(key) and result[key] > base[key] * (1 + tolerance):
+            problems.append(f"{key} {result[key]} > baseline {base[key]}")
+    # Skenario saturasi (rate=0) selalu drop, hanya dicek bila baseline tidak drop
+    if base['dropped'] == 0 and result['dropped'] > 0:
+        problems.append(f"dropped {result['dropped']} > baseline {base['dropped']}")
+    if result['out_of_order'] > base.get('out_of_order', 0):
+        problems.append(f"out_of_order {result['out_of_order']} > baseline {base.get('out_of_order', 0)}")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mode', choices=('direct', 'broker', 'both'), default='both')
+    parser.add_argument('--rate', type=int, nargs='+', default=[0, 1000],
+                        help='target msgs/sec, 0 = as fast as possible')
+    parser.add_argument('--devices', type=int, nargs='+', default=[1, 24])
+    parser.add_argument('--mix', choices=MIXES + ('all',), default='all')
+    parser.add_argument('--duration', type=float, default=3.0)
+    parser.add_argument('--queue-size', type=int, default=10000)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--overflow', default='drop_oldest')
+    parser.add_argument('--save-baseline', action='store_true', help=f'write results to {BASELINE_PATH}')
+    parser.add_argument('--compare', action='store_true', help='compare with the saved baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative regression')
+    args = parser.parse_args(argv)
+
+    modes = ('direct', 'broker') if args.mode == 'both' else (args.mode,)
+    mixes = MIXES if args.mix == 'all' else (args.mix,)
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)
+
+    results, regressions = {}, []
+    print(f"{'scenario':<45} {'msgs/s':>10} {'samples/s':>10} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'q mean':>7} {'q max':>6} {'drop':>6} {'ooo':>6} {'rss MB':>7}")
+    for mode in modes:
+        for mix in mixes:
+            for n_devices in args.devices:
+                for rate in args.rate:
+                    result = run(mode, rate, args.duration, n_devices, mix,
+                                 args.queue_size, args.batch_size, args.overflow)
+                    key = scenario_key(result)
+                    results[key] = result
+                    print(f"{key:<45} {result['msgs_per_sec']:>10} {result['samples_per_sec']:>10} "
+                          f"{result['latency_p50_ms']:>8} {result['latency_p99_ms']:>8} "
+                          f"{result['queue_depth_mean']:>7} {result['queue_depth_max']:>6} "
+                          f"{result['dropped']:>6} {result['out_of_order']:>6} {result['rss_mb']:>7}")
+                    if args.compare:
+                        regressions += [f"{key}: {problem}" for problem in compare(result, baseline, args.tolerance)]
+
+    if args.save_baseline:
+        baseline.update(results)
+        with open(BASELINE_PATH, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Baseline saved to {BASELINE_PATH}")
+
+    if regressions:
+        print("\nRegressions:")
+        for problem in regressions:
+            print(f"  {problem}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,129 @@
+# Benchmark serialisasi response callback halaman sensor: encoder Plotly vs core/serialize.py
+"""Callback response JSON benchmark.
+
+Builds the responses render_sensors sends for the sensor pages (main
+dashboard values, th_in and co2 live trends, a co2 24h history trend) and
+encodes them with:
+
+  plotly-json     plotly.io.json with the standard json engine (Dash default without orjson)
+  plotly-orjson   plotly.io.json with the orjson engine
+  serialize       core.serialize.dumps (what app.py installs into Dash)
+
+History trends are also encoded with typed arrays (as stream_trend sends
+them). Decoded output of serialize is checked against plotly-json first.
+
+Run from the repository root:
+
+    python -m benchmarks.json_bench
+    python -m benchmarks.json_bench --repeat 2000
+"""
+import argparse
+import json
+import sys
+import time
+import numpy as np
+from plotly.io.json import to_json_plotly
+from core.figures import trend_patch
+from core.serialize import dumps, orjson, typed_array
+
+# Titik grafik setengah lebar pada layar 1280px (trend_points di app.py) dan untuk rentang histori
+LIVE_POINTS = 320
+HISTORY_POINTS = 720
+
+
+def trend_data(points, span_s, decimals=None, seed=0):
+    """x (epoch seconds as stream_trend sends them), y and 3 tick values/labels"""
+    rng = np.random.default_rng(seed)
+    end_ns = time.time_ns()
+    timestamps = np.sort(rng.integers(end_ns - span_s * 1_000_000_000, end_ns, points))
+    x = timestamps / 1_000_000_000
+    y = 25 + np.cumsum(rng.normal(0, 0.2, points))
+    if decimals is not None:
+        y = np.round(y, decimals)
+    ticks = np.linspace(0, points - 1, 3, dtype=int)
+    return x, y, x[ticks], ["10:00", "10:05", "10:10"]
+
+
+def response(values=None, graphs=None, version=None):
+    """Response dict as Dash builds it for render_sensors (multi-output)"""
+    body = {}
+    if values is not None:
+        body['sensor-latest'] = {'data': values}
+    for graph_id, patch in (graphs or {}).items():
+        body[json.dumps({'id': graph_id, 'type': 'trend-graph'}, separators=(',', ':'))] = {'figure': patch}
+    body['{"id":"sensors","type":"data-version"}'] = {'data': version or {'run': 'abcd1234', 'versions': {}}}
+    return {'multi': True, 'response': body}
+
+
+def live_patch(graph_id, seed):
+    # Nilai sensor live 1-2 desimal
+    return trend_patch(graph_id, *trend_data(LIVE_POINTS, 900, decimals=2, seed=seed))
+
+
+def history_patch(graph_id, typed):
+    # Rata-rata bucket agregasi, desimal panjang
+    x, y, tickvals, ticktext = trend_data(HISTORY_POINTS, 86400, seed=7)
+    if typed:
+        x, y = typed_array(x), typed_array(y)
+    return trend_patch(graph_id, x, y, tickvals, ticktext)
+
+
+def scenarios():
+    main_values = {'suhu-display-indoor': 27.4, 'kelembaban-display-indoor': 81.2, 'par-display': 312.5,
+                   'co2-display': 455.0, 'suhu-display-outdoor': 29.1, 'kelembaban-display-outdoor': 74.6,
+                   'windspeed-display': 3.2, 'rainfall-display': 0.0}
+    return {
+        'main dashboard (8 values)': (response(main_values), None),
+        'th_in (2 values, 2 live trends)': (response(
+            {'suhu-display-indoor': 27.4, 'kelembaban-display-indoor': 81.2},
+            {'temp-graph': live_patch('temp-graph', 1), 'humidity-graph': live_patch('humidity-graph', 2)}), None),
+        'co2 live trend': (response({'co2-display': 455.0}, {'co2-graph': live_patch('co2-graph', 3)}), None),
+        'co2 24h history trend': (response({'co2-display': 455.0}, {'co2-graph': history_patch('co2-graph', False)}),
+                                  response({'co2-display': 455.0}, {'co2-graph': history_patch('co2-graph', True)})),
+    }
+
+
+def timed(encode, obj, repeat):
+    """(mean encode ms, payload bytes)"""
+    encode(obj)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        text = encode(obj)
+    return (time.perf_counter() - start) * 1000 / repeat, len(text.encode('utf8'))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=500)
+    args = parser.parse_args(argv)
+
+    encoders = {'plotly-json': lambda obj: to_json_plotly(obj, engine='json')}
+    if orjson is not None:
+        encoders['plotly-orjson'] = lambda obj: to_json_plotly(obj, engine='orjson')
+    encoders['serialize'] = dumps
+
+    failed = []
+    print(f"{'page':<34} {'encoder':<18} {'ms':>8} {'bytes':>8} {'speedup':>8}")
+    for name, (obj, typed_obj) in scenarios().items():
+        # Isi JSON harus sama dengan encoder Plotly
+        if json.loads(dumps(obj)) != json.loads(encoders['plotly-json'](obj)):
+            failed.append(name)
+        base_ms = None
+        for encoder, encode in encoders.items():
+            ms, size = timed(encode, obj, args.repeat)
+            base_ms = base_ms or ms
+            print(f"{name:<34} {encoder:<18} {ms:>8.3f} {size:>8} {base_ms / ms:>7.1f}x")
+        if typed_obj is not None:
+            ms, size = timed(dumps, typed_obj, args.repeat)
+            print(f"{name:<34} {'serialize+typed':<18} {ms:>8.3f} {size:>8} {base_ms / ms:>7.1f}x")
+
+    if orjson is None:
+        print("\norjson is not installed: serialize falls back to the plotly-json encoder")
+    if failed:
+        print("\nOutput differs from plotly-json: " + ", ".join(failed))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+# Benchmark cold start: waktu dari start proses sampai response HTTP pertama, dengan broker yang tidak bisa dihubungi
+"""Cold start benchmark.
+
+Starts the app in a child process (`create_app()` plus the Flask dev
+server) against a broker that is unreachable (packets dropped, TCP connect
+hangs) or refusing connections, and measures the time from spawning the
+process to the first 200 response of /dash/. The child reports how long
+importing app.py and create_app() took. Each run uses an empty temporary
+history folder.
+
+Fails (exit code 1) when any cold start exceeds the budget, so a blocking
+broker connect at startup shows up here.
+
+Run from the repository root:
+
+    python -m benchmarks.startup_bench
+    python -m benchmarks.startup_bench --runs 5 --budget 10
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+# Alamat yang tidak menjawab (paket dibuang) dan port yang menolak koneksi
+BROKERS = {
+    'unreachable': ('10.255.255.1', 8883),
+    'refused': ('127.0.0.1', 1),
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def serve(port):
+    """Child process: import the app, start it and serve on port"""
+    start = time.perf_counter()
+    import app
+    imported = time.perf_counter()
+    server = app.create_app()
+    created = time.perf_counter()
+    print(f"import={imported - start:.3f} create_app={created - imported:.3f}", flush=True)
+    server.run(host='127.0.0.1', port=port)
+
+
+def wait_ready(url, process, timeout):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            return False
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return True
+        except (urllib.error.URLError, ConnectionError, socket.timeout):
+            pass
+        time.sleep(0.02)
+    return False
+
+
+def cold_start(broker, port, timeout):
+    """(seconds to first 200 or None, child timing line)"""
+    with tempfile.TemporaryDirectory() as history_dir:
+        env = dict(os.environ, MCS_HISTORY_DIR=history_dir, MCS_MQTT_BROKER=broker, MCS_MQTT_PORT=str(port))
+        http_port = free_port()
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable, '-m', 'benchmarks.startup_bench', '--serve', str(http_port)],
+                                   env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        try:
+            ready = wait_ready(f"http://127.0.0.1:{http_port}/dash/", process, timeout)
+            elapsed = time.perf_counter() - start if ready else None
+        finally:
+            process.terminate()
+            output, _ = process.communicate(timeout=10)
+        return elapsed, output.strip().splitlines()[0] if output.strip() else ''
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--budget', type=float, default=10.0, help='max seconds to the first response')
+    parser.add_argument('--serve', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.serve:
+        serve(args.serve)
+        return 0
+
+    failed = []
+    print(f"{'broker':<12} {'run':>3} {'first 200 (s)':>14}  child")
+    for name, (host, port) in BROKERS.items():
+        times = []
+        for run in range(args.runs):
+            elapsed, child = cold_start(host, port, timeout=args.budget * 3)
+            times.append(elapsed)
+            shown = f"{elapsed:.3f}" if elapsed is not None else 'no response'
+            print(f"{name:<12} {run + 1:>3} {shown:>14}  {child}")
+        if any(t is None or t > args.budget for t in times):
+            failed.append(name)
+        elif len(times) > 1:
+            print(f"{name:<12} {'med':>3} {statistics.median(times):>14.3f}")
+
+    if failed:
+        print(f"\nCold start over the {args.budget:.1f}s budget: " + ", ".join(failed))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,69 @@
+# Konfigurasi bersama proses web (app.py) dan proses ingest (core/ingest_service.py)
+import os
+import tempfile
+
+# data storage
+METRICS = [
+    'kodeDataSuhuIn',         # Temperature values
+    'kodeDataKelembabanIn',   # Humidity values
+    'kodeDataSuhuOut',        # Outdoor temperature values
+    'kodeDataKelembabanOut',  # Outdoor humidity values
+    'kodeDataCo2',            # CO2 values
+    'kodeDataWindspeed',      # Wind speed values
+    'kodeDataRainfall',       # Rainfall values
+    'kodeDataPar',            # PAR values
+    'kodeDataLat',            # Latitude values
+    'kodeDataLon',            # Longitude values
+]
+
+# Kapasitas ring buffer per metric (jumlah sampel), metric lain memakai DEFAULT_CAPACITY
+BUFFER_CAPACITY = {
+    'kodeDataLat': 600,
+    'kodeDataLon': 600,
+}
+
+# Agregasi 1s/1m/1h/1d per metric sensor (GPS tidak perlu)
+ROLLUP_METRICS = [metric for metric in METRICS if metric not in ('kodeDataLat', 'kodeDataLon')]
+
+# Urutan metric di frame biner (JSON frame memakai nama metric sebagai key)
+FRAME_METRICS = METRICS
+
+# Histori disimpan di disk (history/<device>/<metric>) supaya dashboard tidak kosong setelah restart
+HISTORY_DIR = os.environ.get('MCS_HISTORY_DIR') or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "history")
+
+# Interval (detik) snapshot agregasi ke folder histori; saat start hanya histori setelah snapshot yang diagregasi
+ROLLUP_SAVE_INTERVAL = 600
+
+# Nama shared memory store (misal "mcs"). Bila diisi, proses ingest terpisah menulis dan worker web hanya membaca
+# (lihat app.create_app)
+SHARED_STORE = os.environ.get('MCS_SHARED_STORE')
+
+# Unix domain socket proses ingest: event data baru dan statistik untuk worker web
+INGEST_SOCKET = os.environ.get('MCS_INGEST_SOCKET') or os.path.join(
+    tempfile.gettempdir(), f"{SHARED_STORE or 'mcs'}-ingest.sock")
+
+# Antrian ingest antara thread MQTT dan thread writer
+INGEST_QUEUE_SIZE = 10000
+INGEST_BATCH_SIZE = 500
+INGEST_OVERFLOW = 'drop_oldest'  # 'drop_newest', 'drop_oldest' atau 'block'
+
+# MQTT Configuration (broker bisa diganti lewat environment, misal untuk pengujian)
+BROKER = os.environ.get('MCS_MQTT_BROKER', "9a59e12602b646a292e7e66a5296e0ed.s1.eu.hivemq.cloud")
+PORT = int(os.environ.get('MCS_MQTT_PORT', 8883))
+USERNAME = "testing"
+PASSWORD = "Testing123"
+
+# TOPIC = "esp32/+/+"  # Subscribe to all topics under esp32
+TOPIC_SUHU = "mcs/kodeDataSuhuIn"
+TOPIC_KELEMBABAN = "mcs/kodeDataKelembabanIn"
+TOPIC_SUHU_OUT = "mcs/kodeDataSuhuOut"
+TOPIC_KELEMBABAN_OUT = "mcs/kodeDataKelembabanOut"
+TOPIC_CO2 = "mcs/kodeDataCo2"
+TOPIC_WINDSPEED = "mcs/kodeDataWindspeed"
+TOPIC_RAINFALL = "mcs/kodeDataRainfall"
+TOPIC_PAR = "mcs/kodeDataPar"
+TOPIC_LAT = "mcs/kodeDataLat"
+TOPIC_LON = "mcs/kodeDataLon"
+TOPIC_DEVICES = "mcs/+/+"  # mcs/<device id>/<metric> atau mcs/<device id>/frame, satu subscription untuk semua node
+TOPIC_FRAME = "mcs/frame"  # frame node lama tanpa device id
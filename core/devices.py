@@ -0,0 +1,178 @@
+# Registry perangkat (greenhouse node): buffer dan agregasi terpisah per device
+import os
+import re
+import threading
+import time
+import numpy as np
+from core.ring_buffer import SensorStore, DEFAULT_CAPACITY
+from core.rollup import MetricRollup
+
+# Snapshot agregasi per metric, disimpan di folder histori metric
+ROLLUP_FILE = 'rollup.npz'
+
+# Device untuk topik lama tanpa device id (mcs/<metric>)
+DEFAULT_DEVICE = 'default'
+
+# Device id dipakai sebagai nama folder histori, jadi dibatasi
+DEVICE_ID_RE = re.compile(r'^[A-Za-z0-9][A-Za-z0-9_-]{0,63}$')
+
+
+def valid_device_id(device_id):
+    return bool(DEVICE_ID_RE.match(device_id))
+
+
+class Device:
+    """Ring buffers and rollups of one greenhouse node"""
+
+    def __init__(self, device_id, metrics, rollup_metrics, capacity=DEFAULT_CAPACITY, capacities=None):
+        self.id = device_id
+        self.store = SensorStore(metrics, capacity=capacity, capacities=capacities)
+        self.rollups = {metric: MetricRollup() for metric in rollup_metrics}
+        self.first_seen = None
+        self.last_seen = None
+        # Dipegang saat menulis satu frame supaya semua metric tampil bersamaan
+        self.lock = threading.Lock()
+
+    def history_key(self, metric):
+        """Metric key in the HistoryStore: <device>/<metric>"""
+        return f"{self.id}/{metric}"
+
+    def _append(self, metric, timestamp, value):
+        self.store.append(metric, timestamp, value)
+        rollup = self.rollups.get(metric)
+        if rollup is not None:
+            rollup.update(timestamp, value)
+
+    def _seen(self, timestamp):
+        if self.first_seen is None:
+            self.first_seen = timestamp
+        self.last_seen = timestamp
+
+    def append(self, metric, timestamp, value):
+        with self.lock:
+            self._append(metric, timestamp, value)
+            self._seen(timestamp)
+
+    def append_frame(self, timestamp, items):
+        """Append all (metric, value) pairs of one frame with the same timestamp, atomically"""
+        with self.lock:
+            for metric, value in items:
+                self._append(metric, timestamp, value)
+            self._seen(timestamp)
+
+    def latest(self, metrics, default=0):
+        """Consistent snapshot of the latest value of several metrics"""
+        with self.lock:
+            return [self.store.latest(metric, default) for metric in metrics]
+
+    def versions(self, metrics):
+        """{metric: version} of several metrics, changes whenever any of them gets a sample"""
+        with self.lock:
+            return {metric: self.store.version(metric) for metric in metrics}
+
+    def snapshot(self, metrics, since=None):
+        """Copies of (timestamps, values) of several metrics taken together under the lock,
+        optionally only samples at or after `since` (ns)"""
+        snapshot = {}
+        with self.lock:
+            for metric in metrics:
+                timestamps, values = self.store.view(metric)
+                lo = np.searchsorted(timestamps, since, side='left') if since is not None else 0
+                snapshot[metric] = (timestamps[lo:].copy(), values[lo:].copy())
+        return snapshot
+
+    def load(self, history):
+        """Refill ring buffers from the on-disk history, rollups from their snapshot plus the history after it"""
+        now = time.time_ns()
+        for metric, buffer in self.store.buffers.items():
+            timestamps, values = history.tail(self.history_key(metric), buffer.capacity)
+            buffer.extend(timestamps, values)
+            if len(timestamps):
+                self.last_seen = max(self.last_seen or 0, int(timestamps[-1]))
+            rollup = self.rollups.get(metric)
+            if rollup is not None:
+                path = history.state_path(self.history_key(metric), ROLLUP_FILE)
+                if rollup.restore(path):
+                    # Hanya sampel setelah snapshot yang diagregasi ulang
+                    start = rollup.synced + 1
+                else:
+                    start = now - max(tier.retention for tier in rollup.tiers)
+                for timestamps, values in history.query_views(self.history_key(metric), start, now + 1):
+                    rollup.extend(timestamps, values, now)
+                rollup.save(path)
+
+    def save_rollups(self, history):
+        """Write a snapshot of every rollup next to its history, loaded again by `load`"""
+        for metric, rollup in self.rollups.items():
+            try:
+                rollup.save(history.state_path(self.history_key(metric), ROLLUP_FILE))
+            except OSError as e:
+                print(f"Error saving rollup {self.id}/{metric}: {e}")
+
+    def info(self):
+        return {'id': self.id, 'first_seen': self.first_seen, 'last_seen': self.last_seen}
+
+
+def migrate_legacy_history(history):
+    """Move history/<metric> folders of the single-device layout to history/<DEFAULT_DEVICE>/<metric>"""
+    for name in sorted(os.listdir(history.root)):
+        # Folder metric lama berisi segment langsung, folder device hanya berisi folder metric
+        if not history.segments(name):
+            continue
+        if history.rename(name, f"{DEFAULT_DEVICE}/{name}"):
+            print(f"Moved history {name} to {DEFAULT_DEVICE}/{name}")
+        else:
+            print(f"History {name} not moved, {DEFAULT_DEVICE}/{name} already exists")
+
+
+class DeviceRegistry:
+    """device id -> Device, devices are created on their first message"""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._devices = {}
+        self._lock = threading.Lock()
+        self._generation = time.time_ns()
+
+    def __contains__(self, device_id):
+        return device_id in self._devices
+
+    def __len__(self):
+        return len(self._devices)
+
+    def get(self, device_id):
+        return self._devices.get(device_id)
+
+    def get_or_create(self, device_id):
+        device = self._devices.get(device_id)
+        if device is None:
+            with self._lock:
+                device = self._devices.get(device_id)
+                if device is None:
+                    device = self._devices[device_id] = self._factory(device_id)
+        return device
+
+    def ids(self):
+        return sorted(self._devices)
+
+    @property
+    def generation(self):
+        """Stamp of the process holding the buffers, changes whenever versions may start over"""
+        return self._generation
+
+    def info(self):
+        return [self._devices[device_id].info() for device_id in self.ids()]
+
+    def load(self, history):
+        """Register every device found in the history folder and warm its buffers"""
+        if not os.path.isdir(history.root):
+            return
+        migrate_legacy_history(history)
+        for name in sorted(os.listdir(history.root)):
+            if valid_device_id(name) and os.path.isdir(os.path.join(history.root, name)):
+                self.get_or_create(name).load(history)
+
+    def save_rollups(self, history):
+        """Snapshot the rollups of every device"""
+        for device_id in self.ids():
+            self._devices[device_id].save_rollups(history)
@@ -0,0 +1,67 @@
+# Downsampling data trend (MinMax + LTTB) supaya biaya render tetap terbatas
+import numpy as np
+
+# Jumlah kandidat per bucket output yang dipilih MinMax sebelum LTTB
+MINMAX_RATIO = 4
+
+
+def minmax_indices(y, n_buckets):
+    """Indices of the min and max sample of each of n_buckets equal buckets (vectorized)"""
+    n = len(y)
+    # Sampel pertama di luar bucket, jadi hanya n - 1 sampel yang dibagi
+    size = (n - 1) // n_buckets
+    if size < 2:
+        return np.arange(n)
+    # Sampel pertama dan sisa di ujung tetap dipertahankan
+    body = np.asarray(y[1:1 + size * n_buckets]).reshape(n_buckets, size)
+    offsets = 1 + np.arange(n_buckets) * size
+    lows = offsets + np.argmin(body, axis=1)
+    highs = offsets + np.argmax(body, axis=1)
+    tail = np.arange(1 + size * n_buckets, n)
+    return np.unique(np.concatenate(([0], lows, highs, tail)))
+
+
+def lttb_indices(x, y, n_out):
+    """Largest-triangle-three-buckets: indices of n_out points that keep the visual shape"""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    xs = np.asarray(x, dtype=np.float64).tolist()
+    ys = np.asarray(y, dtype=np.float64).tolist()
+
+    # Batas bucket, titik pertama dan terakhir selalu dipilih
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int).tolist()
+    selected = [0]
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # Titik rata-rata bucket berikutnya
+        next_start = end
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        if next_end <= next_start:
+            next_end = next_start + 1
+        cx = sum(xs[next_start:next_end]) / (next_end - next_start)
+        cy = sum(ys[next_start:next_end]) / (next_end - next_start)
+
+        ax, ay = xs[a], ys[a]
+        best, best_area = start, -1.0
+        for j in range(start, max(end, start + 1)):
+            area = abs((ax - cx) * (ys[j] - ay) - (ax - xs[j]) * (cy - ay))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    selected.append(n - 1)
+    return np.asarray(selected)
+
+
+def downsample_indices(x, y, n_out):
+    """MinMax pre-selection followed by LTTB, returns sorted indices into x/y"""
+    n = len(x)
+    if n <= n_out:
+        return np.arange(n)
+    candidates = np.arange(n)
+    if n > n_out * MINMAX_RATIO:
+        candidates = minmax_indices(y, n_out * MINMAX_RATIO // 2)
+    picked = lttb_indices(np.asarray(x)[candidates], np.asarray(y)[candidates], n_out)
+    return candidates[picked]
@@ -0,0 +1,177 @@
+# Feed lokal (Unix domain socket) dari proses ingest ke worker web: event data baru dan statistik
+import json
+import os
+import socket
+import socketserver
+import threading
+from core.mqtt import backoff_delay
+
+
+class FeedServer:
+    """Unix domain socket served by the ingest process, the samples themselves are in the shared store"""
+
+    # Request client (satu baris): "subscribe" -> baris JSON {"devices": [...]} tiap ada data baru,
+    # digabung per koneksi supaya worker lambat melewatkan update; "stats" -> satu baris JSON lalu ditutup
+
+    def __init__(self, path, stats=None):
+        self.path = path
+        self.stats = stats
+        self._cond = threading.Condition()
+        self._pending = {}  # koneksi -> device id yang belum dikirim
+        self._events = 0
+        self._closed = False
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        """Listen on the socket path in a background thread"""
+        if self._server is None:
+            if os.path.exists(self.path):
+                os.unlink(self.path)  # socket sisa proses ingest sebelumnya
+            feed = self
+
+            class Handler(socketserver.StreamRequestHandler):
+                def handle(self):
+                    feed._handle(self.rfile, self.wfile)
+
+            self._server = socketserver.ThreadingUnixStreamServer(self.path, Handler)
+            self._server.daemon_threads = True
+            self._thread = threading.Thread(target=self._server.serve_forever, name='ingest-feed', daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        """Stop serving, end subscriptions and remove the socket"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+    def publish(self, device_ids):
+        """Queue an update of device_ids for every subscriber (BatchWriter notify)"""
+        with self._cond:
+            for pending in self._pending.values():
+                pending.update(device_ids)
+            self._events += 1
+            self._cond.notify_all()
+
+    def _handle(self, rfile, wfile):
+        request = rfile.readline().strip()
+        if request == b'stats':
+            stats = self.stats() if self.stats is not None else {}
+            wfile.write(json.dumps(stats, default=str).encode() + b'\n')
+            return
+        if request != b'subscribe':
+            return
+        key = object()
+        with self._cond:
+            self._pending[key] = set()
+        try:
+            while True:
+                with self._cond:
+                    self._cond.wait_for(lambda: self._pending[key] or self._closed)
+                    if self._closed:
+                        return
+                    device_ids, self._pending[key] = self._pending[key], set()
+                wfile.write(json.dumps({'devices': sorted(device_ids)}).encode() + b'\n')
+        except OSError:
+            pass  # worker web berhenti
+        finally:
+            with self._cond:
+                del self._pending[key]
+
+    def snapshot(self):
+        """Connected subscribers and published update count"""
+        with self._cond:
+            return {'subscribers': len(self._pending), 'events': self._events, 'socket': self.path}
+
+
+class FeedClient:
+    """Subscription of a web worker to the ingest process' FeedServer, calls notify(device_ids) per update"""
+
+    # Selama proses ingest mati worker tetap melayani isi shared store dan menyambung ulang dengan backoff_delay
+
+    def __init__(self, path, notify, min_delay=0.5, max_delay=10.0):
+        self.path = path
+        self.notify = notify
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.connected = False
+        self.stats = {'connects': 0, 'events': 0, 'last_error': None}
+        self._stopped = threading.Event()
+        self._sock = None
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='ingest-feed-client', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        self._stopped.set()
+        sock = self._sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _connect(self, timeout=None):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(self.path)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def _run(self):
+        attempt = 0
+        while not self._stopped.is_set():
+            try:
+                with self._connect() as sock:
+                    self._sock = sock
+                    sock.sendall(b'subscribe\n')
+                    self.connected = True
+                    self.stats['connects'] += 1
+                    attempt = 0
+                    with sock.makefile('rb') as lines:
+                        for line in lines:
+                            event = json.loads(line)
+                            self.stats['events'] += 1
+                            self.notify(event['devices'])
+            except (OSError, ValueError, KeyError) as e:
+                self.stats['last_error'] = str(e)
+            finally:
+                self._sock = None
+                self.connected = False
+            if self._stopped.is_set():
+                break
+            delay = max(self.min_delay, backoff_delay(attempt, self.min_delay, self.max_delay))
+            attempt += 1
+            self._stopped.wait(delay)
+
+    def request_stats(self, timeout=1.0):
+        """Statistics of the ingest process, None when it cannot be reached"""
+        try:
+            with self._connect(timeout) as sock:
+                sock.sendall(b'stats\n')
+                with sock.makefile('rb') as lines:
+                    return json.loads(lines.readline())
+        except (OSError, ValueError):
+            return None
+
+    def snapshot(self):
+        return dict(self.stats, connected=self.connected, socket=self.path)
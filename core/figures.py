@@ -0,0 +1,136 @@
+# Grafik trend sensor: layout statis dikirim sekali bersama halaman, tiap tick hanya Patch data
+from functools import lru_cache
+import numpy as np
+import plotly.io as pio
+from dash import Patch
+
+# Judul, sumbu Y, warna garis dan tinggi tiap grafik trend (id dcc.Graph)
+TREND_GRAPHS = {
+    'temp-graph': dict(title="Temperature Trend", y_title="Temperature (°C)", y_range=[0, 40], color='#FF4B4B', height=150),
+    'humidity-graph': dict(title="Humidity Trend", y_title="Humidity (%)", y_range=[40, 100], color='#4B86FF', height=150),
+    'temp-graph-out': dict(title="Temperature Trend", y_title="Temperature (°C)", y_range=[0, 40], color='#FF4B4B', height=150),
+    'humidity-graph-out': dict(title="Humidity Trend", y_title="Humidity (%)", y_range=[40, 100], color='#4B86FF', height=150),
+    'windspeed-graph': dict(title="Windspeed Trend", y_title="Windspeed (m/s)", y_range=[0, 70], color='#4B86FF', height=300),
+    'rainfall-graph': dict(title="Rainfall Trend", y_title="Rainfall (mm)", y_range=[0, 100], color='#4B86FF', height=300),
+    'co2-graph': dict(title="CO2 Trend", y_title="CO2 (PPM)", y_range=[0, 1000], color='#4B86FF', height=300),
+    'par-graph': dict(title="PAR Trend", y_title="PAR (μmol/m²/s)", y_range=[0, 400], color='#4B86FF', height=300),
+}
+
+
+@lru_cache(maxsize=None)
+def default_template():
+    """Plotly's default template as plain JSON, what go.Figure() puts in layout.template"""
+    return pio.templates[pio.templates.default].to_plotly_json()
+
+
+# Figure dibangun sebagai dict biasa (tanpa validasi properti go.Figure), bentuknya sama persis
+# dengan go.Figure(...).to_dict(); lihat benchmarks/figure_bench.py
+def trend_figure(graph_id, x=None, y=None, tickvals=None, ticktext=None, title=None):
+    """Area trend figure spec (layout + one trace), empty unless x/y are given"""
+    spec = TREND_GRAPHS[graph_id]
+    return {
+        'data': [{
+            'type': 'scatter',
+            'x': [] if x is None else x,
+            'y': [] if y is None else y,
+            'mode': 'lines',
+            'line': {'color': spec['color'], 'width': 3, 'shape': 'spline', 'smoothing': 1.3},
+            'fill': 'tozeroy',
+            'fillcolor': 'rgba(75, 134, 255, 0.2)',
+            'showlegend': False,
+        }],
+        'layout': {
+            'template': default_template(),
+            'title': {'text': title or spec['title']},
+            'xaxis': {
+                'title': {'text': "Time"},
+                'tickmode': 'array',
+                'tickvals': [] if tickvals is None else tickvals,
+                'ticktext': [] if ticktext is None else ticktext,
+                'tickangle': 0,
+            },
+            'yaxis': {'title': {'text': spec['y_title']}, 'range': list(spec['y_range'])},
+            'margin': {'l': 40, 'r': 20, 't': 40, 'b': 30},
+            'height': spec['height'],
+            'plot_bgcolor': 'rgba(250, 250, 250, 0.9)',
+            'showlegend': False,
+        },
+    }
+
+
+def map_figure(lat, lon, locations, zoom=15, height=500):
+    """Mapbox figure spec: current device marker plus reference locations, centered on the device"""
+    lat, lon = float(lat), float(lon)
+    return {
+        'data': [
+            {
+                'type': 'scattermapbox',
+                'lat': [lat],
+                'lon': [lon],
+                'mode': 'markers',
+                'marker': {'size': 15, 'color': 'red'},
+                'text': ["Current Device Location"],
+                'name': "Device",
+            },
+            {
+                'type': 'scattermapbox',
+                'lat': [loc["lat"] for loc in locations],
+                'lon': [loc["lon"] for loc in locations],
+                'mode': 'markers',
+                'marker': {'size': 10, 'color': 'blue'},
+                'text': [loc["name"] for loc in locations],
+                'name': "Reference Points",
+            },
+        ],
+        'layout': {
+            'template': default_template(),
+            'mapbox': {
+                'style': "open-street-map",
+                'center': {'lat': lat, 'lon': lon},
+                'zoom': zoom,
+                # Zoom pengguna dipertahankan selama posisi tidak berubah
+                'uirevision': f"{lat}_{lon}",
+            },
+            'margin': {'l': 0, 'r': 0, 't': 0, 'b': 0},
+            'height': height,
+            'legend': {'yanchor': "top", 'y': 0.99, 'xanchor': "left", 'x': 0.01,
+                       'bgcolor': "rgba(255,255,255,0.8)"},
+            'paper_bgcolor': 'rgba(0,0,0,0)',
+            'plot_bgcolor': 'rgba(0,0,0,0)',
+        },
+    }
+
+
+def trend_patch(graph_id, x, y, tickvals, ticktext, title=None):
+    """Patch replacing only the trace x/y, tick labels and title of a trend figure"""
+    patch = Patch()
+    patch['data'][0]['x'] = x
+    patch['data'][0]['y'] = y
+    patch['layout']['xaxis']['tickvals'] = tickvals
+    patch['layout']['xaxis']['ticktext'] = ticktext
+    patch['layout']['title']['text'] = title or TREND_GRAPHS[graph_id]['title']
+    return patch
+
+
+def empty_patch(graph_id):
+    """Patch for a metric with no samples yet"""
+    return trend_patch(graph_id, [], [], [], [])
+
+
+def insufficient_patch(graph_id):
+    """Patch for a metric with too few samples to draw a trend"""
+    return trend_patch(graph_id, [0, 1], [0, 0], [], [],
+                       title=f"{TREND_GRAPHS[graph_id]['title']} - Insufficient Data")
+
+
+def ticks_patch(tickvals, ticktext):
+    """Patch replacing only the x tick values/labels (used next to extendData)"""
+    patch = Patch()
+    patch['layout']['xaxis']['tickvals'] = tickvals
+    patch['layout']['xaxis']['ticktext'] = ticktext
+    return patch
+
+
+def extend_data(x, y, max_points):
+    """dcc.Graph extendData appending x/y to the first trace, keeping at most max_points"""
+    return [dict(x=[np.asarray(x).tolist()], y=[np.asarray(y).tolist()]), [0], max_points]
@@ -0,0 +1,59 @@
+# Frame multi-metric: satu pesan MQTT per tick device berisi semua metric
+import json
+import math
+import struct
+
+# Topik frame: mcs/<device id>/frame (atau mcs/frame untuk node lama)
+FRAME_METRIC = 'frame'
+
+# Frame biner: versi (uint8), timestamp device epoch ms (int64, 0 = pakai waktu terima),
+# lalu satu float64 per metric sesuai urutan FRAME_METRICS (NaN = tidak ada data)
+FRAME_VERSION = 1
+
+# Timestamp di bawah ini dianggap bukan jam dunia nyata (misal millis() sejak boot)
+MIN_DEVICE_TS_MS = 1_000_000_000_000
+
+# Jam device yang lebih cepat dari ini dibanding waktu terima tidak dipercaya (frame berikutnya akan ditolak)
+MAX_DEVICE_AHEAD_NS = 5 * 1_000_000_000
+
+
+def frame_struct(metrics):
+    """struct.Struct of a binary frame carrying `metrics` in order"""
+    return struct.Struct(f'<Bq{len(metrics)}d')
+
+
+def _timestamp_ns(device_ts_ms, receive_ts):
+    if device_ts_ms is None or device_ts_ms < MIN_DEVICE_TS_MS:
+        return receive_ts
+    timestamp = int(device_ts_ms) * 1_000_000
+    if timestamp > receive_ts + MAX_DEVICE_AHEAD_NS:
+        return receive_ts
+    return timestamp
+
+
+def decode_frame(payload, metrics, receive_ts, binary_struct=None):
+    """(timestamp_ns, [(metric, value), ...]) of a JSON or packed binary frame, only the metrics present"""
+    # Frame JSON: {"ts": <epoch ms>, "kodeDataSuhuIn": 25.1, ...}
+    if payload[:1] == b'{':
+        frame = json.loads(payload)
+        timestamp = _timestamp_ns(frame.get('ts'), receive_ts)
+        items = [(metric, float(frame[metric])) for metric in metrics
+                 if frame.get(metric) is not None]
+        return timestamp, items
+
+    binary_struct = binary_struct or frame_struct(metrics)
+    if len(payload) != binary_struct.size:
+        raise ValueError(f"Binary frame must be {binary_struct.size} bytes, got {len(payload)}")
+    version, device_ts_ms, *values = binary_struct.unpack(payload)
+    if version != FRAME_VERSION:
+        raise ValueError(f"Unsupported frame version {version}")
+    timestamp = _timestamp_ns(device_ts_ms, receive_ts)
+    items = [(metric, value) for metric, value in zip(metrics, values) if not math.isnan(value)]
+    return timestamp, items
+
+
+def encode_frame(values, metrics, device_ts_ms=0, binary_struct=None):
+    """Pack a binary frame (used by publishers and benchmarks)"""
+    binary_struct = binary_struct or frame_struct(metrics)
+    return binary_struct.pack(FRAME_VERSION, device_ts_ms,
+                              *[values.get(metric, math.nan) for metric in metrics])
@@ -0,0 +1,226 @@
+# Penyimpanan histori sensor di disk (append-only segment files)
+import mmap
+import os
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+
+# Satu segment per metric per hari (UTC): <root>/<metric>/<day>.ts (int64 epoch ns) dan .val (float64)
+SEGMENT_NS = 86400 * 1_000_000_000
+
+# Segment yang tetap di-map (LRU), setiap mmap memegang dua file descriptor (kolom ts dan val)
+MAX_MAPPED_SEGMENTS = 64
+
+TS_DTYPE = np.dtype('<i8')
+VALUE_DTYPE = np.dtype('<f8')
+
+
+class HistoryStore:
+    """Append-only on-disk time series store, read through mmap views"""
+
+    def __init__(self, root, flush_interval=0.5, batch_size=2000, fsync=False, max_maps=MAX_MAPPED_SEGMENTS):
+        self.root = root
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.fsync = fsync
+        self._pending = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._aligned = set()  # (metric, segment) yang kolomnya sudah dicek sejak proses ini start
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self.max_maps = max_maps
+        self._maps = OrderedDict()  # (metric, segment) -> (size, timestamps view, values view)
+        self._maps_lock = threading.Lock()
+
+    def start(self):
+        """Create the history folder and start the background writer thread"""
+        if self._thread is None:
+            os.makedirs(self.root, exist_ok=True)
+            self._thread = threading.Thread(target=self._run, name='history-writer', daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        """Stop the writer thread and flush what is still pending"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def append(self, metric, timestamp, value):
+        """Queue one sample, cheap enough for the MQTT network thread"""
+        with self._lock:
+            self._pending.append((metric, timestamp, value))
+            pending = len(self._pending)
+        if pending >= self.batch_size:
+            self._wakeup.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error writing history: {e}")
+
+    def flush(self):
+        """Write all pending samples, one append per (metric, segment) column"""
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return 0
+
+        groups = {}
+        for metric, timestamp, value in batch:
+            key = (metric, timestamp // SEGMENT_NS)
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = ([], [])
+            group[0].append(timestamp)
+            group[1].append(value)
+
+        with self._write_lock:
+            for key, (timestamps, values) in groups.items():
+                ts_path, val_path = self._segment_paths(*key, create=True)
+                if key not in self._aligned:
+                    self._align_columns(ts_path, val_path)
+                    self._aligned.add(key)
+                try:
+                    # Kolom nilai ditulis dulu, pembaca memakai panjang minimum kedua kolom
+                    self._write_column(val_path, np.asarray(values, dtype=VALUE_DTYPE))
+                    self._write_column(ts_path, np.asarray(timestamps, dtype=TS_DTYPE))
+                except OSError:
+                    # Penulisan gagal di tengah: kolom dicek ulang sebelum append berikutnya
+                    self._aligned.discard(key)
+                    raise
+        return len(batch)
+
+    @staticmethod
+    def _align_columns(ts_path, val_path):
+        """Cut both columns of a segment to the same whole number of samples (after a torn flush)"""
+        sizes = [os.path.getsize(path) if os.path.exists(path) else 0 for path in (ts_path, val_path)]
+        size = min(sizes) - min(sizes) % TS_DTYPE.itemsize
+        for path, current in zip((ts_path, val_path), sizes):
+            if current != size:
+                os.truncate(path, size)
+
+    def _write_column(self, path, array):
+        with open(path, 'ab') as f:
+            f.write(array.tobytes())
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _segment_paths(self, metric, segment, create=False):
+        directory = os.path.join(self.root, metric)
+        if create:
+            os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, str(segment))
+        return base + '.ts', base + '.val'
+
+    def segments(self, metric):
+        """Sorted segment numbers stored for a metric"""
+        directory = os.path.join(self.root, metric)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(int(name[:-3]) for name in os.listdir(directory) if name.endswith('.ts'))
+
+    def rename(self, metric, new_metric):
+        """Move all segments of a metric to another key, False when the new key already has data"""
+        target = os.path.join(self.root, new_metric)
+        if os.path.exists(target):
+            return False
+        with self._write_lock:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.rename(os.path.join(self.root, metric), target)
+        with self._maps_lock:
+            for key in [key for key in self._maps if key[0] == metric]:
+                del self._maps[key]
+        return True
+
+    def state_path(self, metric, name):
+        """Path of a file stored next to the segments of a metric (e.g. a rollup snapshot)"""
+        return os.path.join(self.root, metric, name)
+
+    @staticmethod
+    def _map_column(path, dtype):
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        size -= size % dtype.itemsize
+        if size == 0:
+            return np.empty(0, dtype=dtype)
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ)
+        # View read-only langsung ke page cache; mmap tetap hidup selama view dipakai
+        return np.frombuffer(mm, dtype=dtype)
+
+    def _read_segment(self, metric, segment):
+        """Zero-copy (timestamps, values) views of one segment"""
+        ts_path, val_path = self._segment_paths(metric, segment)
+        size = os.path.getsize(ts_path) if os.path.exists(ts_path) else 0
+        key = (metric, segment)
+        with self._maps_lock:
+            cached = self._maps.get(key)
+            if cached is not None and cached[0] == size:
+                self._maps.move_to_end(key)
+                return cached[1], cached[2]
+        # Segment baru atau segment aktif yang sudah bertambah: map ulang
+        timestamps = self._map_column(ts_path, TS_DTYPE)
+        values = self._map_column(val_path, VALUE_DTYPE)
+        # Segment yang terpotong (crash saat menulis) dipotong ke panjang yang sama
+        n = min(len(timestamps), len(values))
+        timestamps, values = timestamps[:n], values[:n]
+        with self._maps_lock:
+            self._maps[key] = (size, timestamps, values)
+            self._maps.move_to_end(key)
+            # Segment terlama dilepas; mmap dan file descriptor-nya ditutup begitu tidak ada view yang dipakai lagi
+            while len(self._maps) > self.max_maps:
+                self._maps.popitem(last=False)
+        return timestamps, values
+
+    def query_views(self, metric, start_ns, end_ns=None):
+        """List of zero-copy (timestamps, values) views, one per segment in the range"""
+        if end_ns is None:
+            end_ns = time.time_ns() + 1
+        parts = []
+        for segment in self.segments(metric):
+            if segment < start_ns // SEGMENT_NS or segment > end_ns // SEGMENT_NS:
+                continue
+            timestamps, values = self._read_segment(metric, segment)
+            lo = np.searchsorted(timestamps, start_ns, side='left')
+            hi = np.searchsorted(timestamps, end_ns, side='left')
+            if hi > lo:
+                parts.append((timestamps[lo:hi], values[lo:hi]))
+        return parts
+
+    def query(self, metric, start_ns, end_ns=None):
+        """Return (timestamps, values) of samples with start_ns <= ts < end_ns"""
+        # Range dalam satu segment berupa view file yang di-map, range lebih panjang digabung (satu copy per kolom)
+        parts = self.query_views(metric, start_ns, end_ns)
+        if not parts:
+            return np.empty(0, dtype=TS_DTYPE), np.empty(0, dtype=VALUE_DTYPE)
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+    def tail(self, metric, n):
+        """Return the latest n persisted samples of a metric, oldest first"""
+        if n <= 0:
+            return np.empty(0, dtype=TS_DTYPE), np.empty(0, dtype=VALUE_DTYPE)
+        parts_ts, parts_values = [], []
+        count = 0
+        for segment in reversed(self.segments(metric)):
+            timestamps, values = self._read_segment(metric, segment)
+            parts_ts.insert(0, timestamps)
+            parts_values.insert(0, values)
+            count += len(timestamps)
+            if count >= n:
+                break
+        if not parts_ts:
+            return np.empty(0, dtype=TS_DTYPE), np.empty(0, dtype=VALUE_DTYPE)
+        return np.concatenate(parts_ts)[-n:], np.concatenate(parts_values)[-n:]
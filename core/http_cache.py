@@ -0,0 +1,160 @@
+# Kompresi (gzip/brotli) dan header cache HTTP untuk response Flask/Dash
+import gzip
+import hashlib
+import os
+import re
+from flask import request
+from core.render_cache import RenderCache
+
+try:
+    import brotli
+except ImportError:  # brotli opsional, tanpa brotli hanya gzip
+    brotli = None
+
+# Tipe konten yang dikompres (gambar/font biner sudah terkompresi)
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'application/x-javascript',
+                      'image/svg+xml')
+
+ONE_YEAR = 365 * 24 * 3600
+
+# Nama file dengan hash konten (varian gambar core/images.py), isinya tidak pernah berubah
+HASHED_NAME = re.compile(r'\.[0-9a-f]{10}\.[a-z0-9]+$')
+
+
+class HttpCache:
+    """Response compression plus ETag / Cache-Control handling for the Flask server"""
+
+    # - Response teks >= min_size dikompresi brotli atau gzip; aset statis dan bundle Dash dikompresi sekali (LRU)
+    # - /static dengan ?v=<hash>, bundle Dash ber-fingerprint dan nama file ber-hash: immutable 1 tahun,
+    #   sisanya no-cache + ETag (revalidasi cukup 304)
+    # - Response streaming (SSE /push/stream) tidak diubah
+
+    def __init__(self, static_folder, static_url_path='/static', component_prefix='/dash/_dash-component-suites/',
+                 min_size=1024, gzip_level=6, brotli_quality=5, static_brotli_quality=11,
+                 cache_bytes=32 * 1024 * 1024):
+        self.static_folder = static_folder
+        self.static_url_path = static_url_path
+        self.component_prefix = component_prefix
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.static_brotli_quality = static_brotli_quality
+        # Hasil kompresi aset statis: (path, etag, encoding) -> bytes
+        self.compressed = RenderCache(max_entries=512, max_bytes=cache_bytes)
+        self._hashes = {}
+
+    def init_app(self, server):
+        server.after_request(self.after_request)
+
+        # url_for('static', filename=...) di template ikut mendapat ?v=<hash>
+        @server.url_defaults
+        def static_version(endpoint, values):
+            if endpoint == 'static' and 'filename' in values and 'v' not in values:
+                version = self.file_hash(values['filename'])
+                if version:
+                    values['v'] = version
+        return self
+
+    def file_hash(self, filename):
+        """Short content hash of a static file (cached per mtime), None if it does not exist"""
+        path = os.path.join(self.static_folder, filename)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        cached = self._hashes.get(filename)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        with open(path, 'rb') as f:
+            digest = hashlib.sha1(f.read()).hexdigest()[:12]
+        self._hashes[filename] = (mtime, digest)
+        return digest
+
+    def static_url(self, filename):
+        """Versioned URL of a static file, cacheable as immutable"""
+        version = self.file_hash(filename)
+        url = f"{self.static_url_path}/{filename}"
+        return f"{url}?v={version}" if version else url
+
+    def _is_asset(self, path):
+        return path.startswith(self.static_url_path + '/') or path.startswith(self.component_prefix)
+
+    def _cache_headers(self, response, path):
+        if path.startswith(self.static_url_path + '/'):
+            filename = path[len(self.static_url_path) + 1:]
+            version = request.args.get('v')
+            if HASHED_NAME.search(filename) or (version and version == self.file_hash(filename)):
+                response.cache_control.public = True
+                response.cache_control.max_age = ONE_YEAR
+                response.cache_control.immutable = True
+                response.cache_control.no_cache = None
+            else:
+                # URL tanpa versi: boleh disimpan, tapi selalu divalidasi ulang (304)
+                response.cache_control.no_cache = True
+                response.cache_control.max_age = None
+        elif response.cache_control.max_age:
+            # Bundle Dash dengan fingerprint di URL (Dash sudah memberi max-age 1 tahun)
+            response.cache_control.public = True
+            response.cache_control.immutable = True
+
+    def _encoding(self):
+        accepted = request.accept_encodings
+        if brotli is not None and accepted['br']:
+            return 'br'
+        if accepted['gzip']:
+            return 'gzip'
+        return None
+
+    def _compress(self, data, encoding, quality):
+        if encoding == 'br':
+            return brotli.compress(data, quality=quality)
+        return gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+
+    def after_request(self, response):
+        if response.is_streamed and not response.direct_passthrough:
+            return response  # SSE dan generator lain
+        path = request.path
+        asset = self._is_asset(path)
+        if asset:
+            self._cache_headers(response, path)
+        if response.status_code != 200 or 'Content-Encoding' in response.headers:
+            return response
+
+        mimetype = response.mimetype or ''
+        if not mimetype.startswith(COMPRESSIBLE_TYPES):
+            return response
+        response.vary.add('Accept-Encoding')
+        length = response.calculate_content_length()
+        encoding = self._encoding()
+        if encoding is None or (length is not None and length < self.min_size):
+            return response
+
+        # File statis (send_file) dibaca dulu dari wrapper file
+        response.direct_passthrough = False
+        data = response.get_data()
+        if len(data) < self.min_size:
+            return response
+
+        if asset:
+            if not response.get_etag()[0]:
+                response.set_etag(hashlib.md5(data).hexdigest())
+            etag, _ = response.get_etag()
+            quality = self.static_brotli_quality
+            body = self.compressed.get_or_compute((path, etag, encoding),
+                                                  lambda: self._compress(data, encoding, quality))
+            # ETag berbeda per encoding, tetap cocok untuk If-None-Match dari browser
+            response.set_etag(f"{etag}-{encoding}")
+            if request.if_none_match.contains(f"{etag}-{encoding}"):
+                return self._not_modified(response)
+        else:
+            body = self._compress(data, encoding, self.brotli_quality)
+
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def _not_modified(self, response):
+        response.status_code = 304
+        response.set_data(b'')
+        response.headers.pop('Content-Length', None)
+        return response
@@ -0,0 +1,130 @@
+# Varian gambar responsif (AVIF/WebP per lebar) untuk static/img, dibuat saat build
+# Build (Pillow dari requirements-build.txt, bukan dependency runtime), dijalankan dari root repo setelah gambar berubah:
+#   pip install -r requirements-build.txt && python -m core.images
+# Tanpa manifest responsive_img kembali ke html.Img biasa
+import hashlib
+import io
+import json
+import os
+import sys
+from dash import html
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static')
+IMG_DIR = os.path.join(STATIC_DIR, 'img')
+BUILD_DIR = os.path.join(IMG_DIR, 'build')
+MANIFEST_PATH = os.path.join(BUILD_DIR, 'manifest.json')
+STATIC_URL = '/static'
+
+# Lebar varian (px): tile setengah layar di tablet, layar 1280px, dan layar lebar / DPR 2
+WIDTHS = (400, 800, 1320)
+
+# Gambar berada di kolom width=6 dalam container bootstrap (maks 1320px)
+DEFAULT_SIZES = '(min-width: 1400px) 660px, 50vw'
+
+# Format modern lebih dulu, browser memilih <source> pertama yang didukung
+FORMATS = (
+    ('avif', 'image/avif', dict(quality=50)),
+    ('webp', 'image/webp', dict(quality=75, method=6)),
+)
+FALLBACK = {
+    'JPEG': ('jpg', 'image/jpeg', dict(quality=80, optimize=True, progressive=True)),
+    'PNG': ('png', 'image/png', dict(optimize=True)),
+}
+
+# Hanya gambar yang dipakai halaman lewat responsive_img
+IMAGES = ('gh.jpg', 'pictogram_mcs_2.png')
+
+
+def _url(path):
+    return STATIC_URL + '/' + os.path.relpath(path, STATIC_DIR).replace(os.sep, '/')
+
+
+def _save_variant(image, stem, width, extension, fmt, options, out_dir):
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt, **options)
+    data = buffer.getvalue()
+    digest = hashlib.sha1(data).hexdigest()[:10]
+    path = os.path.join(out_dir, f"{stem}-{width}w.{digest}.{extension}")
+    if not os.path.exists(path):
+        with open(path, 'wb') as f:
+            f.write(data)
+    return path
+
+
+def build(src_dir=IMG_DIR, out_dir=BUILD_DIR, widths=WIDTHS, images=IMAGES):
+    """Write resized, content-hashed variants of the given images in src_dir and the manifest"""
+    from PIL import Image, ImageOps
+
+    os.makedirs(out_dir, exist_ok=True)
+    manifest, written = {}, set()
+    for name in images:
+        src_path = os.path.join(src_dir, name)
+        stem = os.path.splitext(name)[0]
+        with Image.open(src_path) as original:
+            original = ImageOps.exif_transpose(original)
+            has_alpha = original.mode in ('RGBA', 'LA', 'P')
+            fallback = FALLBACK['PNG' if has_alpha else 'JPEG']
+            original = original.convert('RGBA' if has_alpha else 'RGB')
+            # Tidak memperbesar gambar, lebar asli dipakai bila lebih kecil dari breakpoint
+            sizes = sorted({min(width, original.width) for width in widths})
+            # Urutan <source>: format modern dulu, format asli terakhir (juga srcset <img>)
+            sources = {mime: [] for _, mime, _ in FORMATS + (fallback,)}
+            for width in sizes:
+                height = round(original.height * width / original.width)
+                resized = original.resize((width, height), Image.LANCZOS)
+                for extension, mime, options in FORMATS + (fallback,):
+                    fmt = 'JPEG' if extension == 'jpg' else extension.upper()
+                    path = _save_variant(resized, stem, width, extension, fmt, options, out_dir)
+                    written.add(os.path.basename(path))
+                    sources[mime].append([_url(path), width])
+        manifest[_url(src_path)] = {
+            'width': original.width,
+            'height': original.height,
+            'fallback': sources[fallback[1]][-1][0],
+            'sources': [[mime, candidates] for mime, candidates in sources.items()],
+        }
+
+    # Varian lama (hash berbeda) tidak dipakai lagi
+    for name in os.listdir(out_dir):
+        if name not in written and name != os.path.basename(MANIFEST_PATH):
+            os.remove(os.path.join(out_dir, name))
+    with open(os.path.join(out_dir, os.path.basename(MANIFEST_PATH)), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(path=MANIFEST_PATH):
+    """Manifest written by build(), empty when the variants have not been built"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+# Dibaca sekali saat import, layout halaman dibuat saat import juga
+MANIFEST = load_manifest()
+
+
+def srcset(candidates):
+    return ', '.join(f"{url} {width}w" for url, width in candidates)
+
+
+def responsive_img(src, sizes=DEFAULT_SIZES, **img_props):
+    """<picture> with AVIF/WebP/original srcsets for src, or a plain html.Img if it has no variants"""
+    entry = MANIFEST.get(src)
+    if entry is None:
+        return html.Img(src=src, **img_props)
+    *modern, (_, fallback) = entry['sources']
+    return html.Picture([
+        *[html.Source(type=mime, srcSet=srcset(candidates), sizes=sizes) for mime, candidates in modern],
+        html.Img(src=entry['fallback'], srcSet=srcset(fallback), sizes=sizes, **img_props),
+    ], className='responsive-picture')
+
+
+if __name__ == '__main__':
+    result = build()
+    for src, entry in result.items():
+        variants = sum(len(candidates) for _, candidates in entry['sources'])
+        print(f"{src}: {variants} variants")
+    sys.exit(0)
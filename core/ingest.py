@@ -0,0 +1,173 @@
+# Antrian ingest: thread MQTT hanya memasukkan pesan mentah, thread writer yang memproses
+import queue
+import threading
+from core.devices import DEFAULT_DEVICE, valid_device_id
+from core.frames import FRAME_METRIC, decode_frame, frame_struct
+
+# Bila antrian penuh: buang pesan baru, buang pesan terlama, atau tunggu block_timeout lalu buang pesan baru
+OVERFLOW_POLICIES = ('drop_newest', 'drop_oldest', 'block')
+
+
+class IngestPipeline:
+    """Bounded queue of raw (topic, payload, receive_ts) tuples drained in batches by a writer thread"""
+
+    def __init__(self, handler, maxsize=10000, batch_size=500, overflow='drop_oldest', block_timeout=0.1):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.handler = handler
+        self.batch_size = batch_size
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.queue = queue.Queue(maxsize)
+        self._stopped = threading.Event()
+        self._thread = None
+        self.stats = {
+            'received': 0,
+            'processed': 0,
+            'dropped': 0,
+            'errors': 0,
+            'batches': 0,
+            'last_batch_size': 0,
+            'max_batch_size': 0,
+            'max_queue_depth': 0,
+        }
+
+    def start(self):
+        """Start the writer thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='ingest-writer', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        """Stop the writer thread after draining what is already queued"""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def submit(self, topic, payload, receive_ts):
+        """Enqueue one raw message, applying the overflow policy when full"""
+        self.stats['received'] += 1
+        item = (topic, payload, receive_ts)
+        try:
+            if self.overflow == 'block':
+                self.queue.put(item, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(item)
+        except queue.Full:
+            if self.overflow == 'drop_oldest':
+                try:
+                    self.queue.get_nowait()
+                except queue.Empty:
+                    pass
+                self.stats['dropped'] += 1
+                try:
+                    self.queue.put_nowait(item)
+                except queue.Full:
+                    self.stats['dropped'] += 1
+            else:
+                self.stats['dropped'] += 1
+        depth = self.queue.qsize()
+        if depth > self.stats['max_queue_depth']:
+            self.stats['max_queue_depth'] = depth
+
+    def _next_batch(self):
+        try:
+            batch = [self.queue.get(timeout=0.2)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not (self._stopped.is_set() and self.queue.empty()):
+            batch = self._next_batch()
+            if not batch:
+                continue
+            try:
+                errors = self.handler(batch) or 0
+            except Exception as e:
+                print(f"Error in ingest batch: {e}")
+                errors = len(batch)
+            stats = self.stats
+            stats['processed'] += len(batch) - errors
+            stats['errors'] += errors
+            stats['batches'] += 1
+            stats['last_batch_size'] = len(batch)
+            if len(batch) > stats['max_batch_size']:
+                stats['max_batch_size'] = len(batch)
+
+    def snapshot(self):
+        """Counters (also the handler's, e.g. BatchWriter out_of_order) plus the current queue depth"""
+        snapshot = dict(getattr(self.handler, 'stats', None) or {}, **self.stats)
+        snapshot['queue_depth'] = self.queue.qsize()
+        snapshot['queue_size'] = self.queue.maxsize
+        snapshot['overflow'] = self.overflow
+        return snapshot
+
+
+class BatchWriter:
+    """IngestPipeline handler: parses raw MQTT messages and writes them to the device stores and history"""
+
+    def __init__(self, devices, history, metrics, frame_metrics=None, notify=None):
+        self.devices = devices
+        self.history = history
+        self.metrics = set(metrics)
+        self.frame_metrics = list(frame_metrics or metrics)
+        self.frame_struct = frame_struct(self.frame_metrics)
+        # notify(device_ids) sekali per batch dengan device yang mendapat sampel baru
+        self.notify = notify
+        self.stats = {'out_of_order': 0}
+
+    def __call__(self, batch):
+        errors = 0
+        out_of_order = 0
+        updated = set()
+        for topic, payload, timestamp in batch:
+            try:
+                # mcs/<metric> (node lama) atau mcs/<device id>/<metric>
+                parts = topic.split('/')
+                metric = parts[-1]
+                device_id = parts[1] if len(parts) > 2 else DEFAULT_DEVICE
+                if not valid_device_id(device_id):
+                    continue
+
+                # Satu frame berisi semua metric, didecode sekali dan ditulis sekaligus
+                if metric == FRAME_METRIC:
+                    frame_ts, items = decode_frame(payload, self.frame_metrics, timestamp, self.frame_struct)
+                    device = self.devices.get_or_create(device_id)
+                    last_seen = device.last_seen
+                    if last_seen is not None and frame_ts < last_seen:
+                        # Frame terlambat (antrian broker, jam device mundur): buffer dan histori harus urut waktu
+                        out_of_order += 1
+                        continue
+                    device.append_frame(frame_ts, items)
+                    for name, value in items:
+                        self.history.append(device.history_key(name), frame_ts, value)
+                    updated.add(device_id)
+                    continue
+
+                if metric not in self.metrics:
+                    continue
+                value = float(payload.decode())
+
+                # Append ke ring buffer device, O(1) tanpa copy list, lalu antrekan ke histori disk
+                device = self.devices.get_or_create(device_id)
+                device.append(metric, timestamp, value)
+                self.history.append(device.history_key(metric), timestamp, value)
+                updated.add(device_id)
+
+            except Exception as e:
+                errors += 1
+                print(f"Error processing MQTT message: {e}")
+        if out_of_order:
+            self.stats['out_of_order'] += out_of_order
+            print(f"Dropped {out_of_order} out-of-order frames")
+        if updated and self.notify is not None:
+            self.notify(updated)
+        return errors
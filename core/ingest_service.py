@@ -0,0 +1,136 @@
+# Layanan ingest: koneksi MQTT, parsing/validasi dan penyimpanan data sensor, tanpa Dash
+import atexit
+import signal
+import ssl
+import sys
+import threading
+import time
+import paho.mqtt.client as mqtt
+from core.config import (METRICS, BUFFER_CAPACITY, ROLLUP_METRICS, FRAME_METRICS, HISTORY_DIR, SHARED_STORE,
+                         ROLLUP_SAVE_INTERVAL, INGEST_SOCKET, INGEST_QUEUE_SIZE, INGEST_BATCH_SIZE, INGEST_OVERFLOW,
+                         BROKER, PORT, USERNAME, PASSWORD, TOPIC_SUHU, TOPIC_KELEMBABAN, TOPIC_SUHU_OUT,
+                         TOPIC_KELEMBABAN_OUT, TOPIC_CO2, TOPIC_WINDSPEED, TOPIC_RAINFALL, TOPIC_PAR,
+                         TOPIC_LAT, TOPIC_LON, TOPIC_DEVICES, TOPIC_FRAME)
+from core.devices import Device
+from core.feed import FeedServer
+from core.history import HistoryStore
+from core.ingest import IngestPipeline, BatchWriter
+from core.mqtt import MqttConnector
+from core.ring_buffer import DEFAULT_CAPACITY
+from core.shared_store import SharedDevice, SharedDeviceRegistry, SharedSensorStore, block_name
+
+# Setiap device punya ring buffer dan agregasi sendiri
+def create_device(device_id):
+    return Device(device_id, METRICS, ROLLUP_METRICS, capacity=DEFAULT_CAPACITY, capacities=BUFFER_CAPACITY)
+
+
+def create_shared_device(device_id, history, writer=False):
+    """Device in the MCS_SHARED_STORE shared memory, written by the ingest daemon"""
+    store = SharedSensorStore(block_name(SHARED_STORE, device_id), METRICS, capacity=DEFAULT_CAPACITY,
+                              capacities=BUFFER_CAPACITY, writer=writer)
+    return SharedDevice(device_id, store, ROLLUP_METRICS, history)
+
+
+# MQTT Callback
+def on_connect(client, userdata, flags, rc):
+    if rc == 0:
+        print("Connected to HiveMQ Broker")
+        client.subscribe([(TOPIC_SUHU, 0), (TOPIC_KELEMBABAN, 0),
+                          (TOPIC_SUHU_OUT, 0), (TOPIC_KELEMBABAN_OUT, 0),
+                          (TOPIC_CO2, 0), (TOPIC_WINDSPEED, 0),
+                          (TOPIC_RAINFALL, 0), (TOPIC_PAR, 0),
+                          (TOPIC_LAT, 0), (TOPIC_LON, 0),
+                          (TOPIC_DEVICES, 0), (TOPIC_FRAME, 0)])  # Subscribe ke topik suhu & kelembaban
+    else:
+        print(f"Failed to connect, return code {rc}")
+
+
+# MQTT Client
+def create_mqtt_client(on_message):
+    # Create SSL/TLS context (memuat sertifikat CA, dibuat saat koneksi, tidak saat import)
+    ssl_context = ssl.create_default_context()
+    ssl_context.check_hostname = False
+    ssl_context.verify_mode = ssl.CERT_NONE
+
+    client = mqtt.Client()
+    client.username_pw_set(USERNAME, PASSWORD)
+    client.tls_set_context(ssl_context)
+    client.on_connect = on_connect
+    client.on_message = on_message
+    return client
+
+
+class IngestService:
+    """MQTT connection, ingest queue and storage of the process that receives the data"""
+
+    def __init__(self, devices, history, notify=None):
+        self.devices = devices
+        self.history = history
+        # Parsing dan penyimpanan pesan MQTT, dijalankan di thread writer
+        # notify(device_ids) setelah tiap batch: PushHub di proses web, FeedServer di daemon
+        self.write_batch = BatchWriter(devices, history, METRICS, FRAME_METRICS, notify=notify)
+        # Antrian ingest antara thread MQTT dan thread writer
+        self.pipeline = IngestPipeline(self.write_batch, maxsize=INGEST_QUEUE_SIZE, batch_size=INGEST_BATCH_SIZE,
+                                       overflow=INGEST_OVERFLOW)
+        self.connector = None
+        self._save_lock = threading.Lock()
+
+    def on_message(self, client, userdata, msg):
+        # Hanya antrekan pesan mentah, parsing dan penyimpanan di thread writer
+        self.pipeline.submit(msg.topic, msg.payload, time.time_ns())
+
+    def start(self, start_mqtt=True):
+        """Start the history writer and ingest thread, then connect to the broker in the background"""
+        self.history.start()
+        atexit.register(self.history.close)
+        # Isi ulang ring buffer dan agregasi semua device dari histori terakhir
+        self.devices.load(self.history)
+        # Snapshot terakhir disimpan setelah pipeline berhenti (atexit berjalan terbalik)
+        atexit.register(self.save_rollups)
+        self.pipeline.start()
+        atexit.register(self.pipeline.stop)
+        threading.Thread(target=self._save_rollups_periodically, name='rollup-snapshot', daemon=True).start()
+        if start_mqtt:
+            self.connector = MqttConnector(create_mqtt_client(self.on_message), BROKER, PORT, keepalive=60).start()
+            atexit.register(self.connector.stop)
+        return self
+
+    def save_rollups(self):
+        """Snapshot the rollups of every device next to their history"""
+        with self._save_lock:
+            self.devices.save_rollups(self.history)
+
+    def _save_rollups_periodically(self):
+        while True:
+            time.sleep(ROLLUP_SAVE_INTERVAL)
+            self.save_rollups()
+
+    def snapshot(self):
+        """Ingest queue statistics plus the MQTT connection state"""
+        return dict(self.pipeline.snapshot(), mqtt=self.connector.snapshot() if self.connector else None)
+
+
+def main():
+    if not SHARED_STORE:
+        sys.exit("MCS_SHARED_STORE is not set, without it app.py runs the ingest itself")
+    history = HistoryStore(HISTORY_DIR)
+    devices = SharedDeviceRegistry(SHARED_STORE, lambda device_id: create_shared_device(device_id, history, True),
+                                   writer=True)
+    feed = FeedServer(INGEST_SOCKET)
+    service = IngestService(devices, history, notify=feed.publish)
+    feed.stats = lambda: dict(service.snapshot(), feed=feed.snapshot())
+    service.start()
+    feed.start()
+    atexit.register(feed.close)
+    # SIGTERM (systemd/supervisor) dan Ctrl+C keluar normal, atexit mem-flush histori
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopped.set())
+    print(f"Ingest writing to shared store {SHARED_STORE}, feed on {INGEST_SOCKET}")
+    try:
+        stopped.wait()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+# Koneksi MQTT di thread sendiri: start tidak menunggu broker, reconnect dengan exponential backoff + jitter
+import random
+import ssl
+import threading
+import paho.mqtt.client as mqtt
+
+
+def backoff_delay(attempt, base=1.0, cap=120.0, rng=random):
+    """Exponential backoff with full jitter: uniform in [0, min(cap, base * 2**attempt)]"""
+    return rng.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class MqttConnector:
+    """Runs a paho client's connection and network loop in a background thread, start() returns immediately"""
+
+    def __init__(self, client, host, port, keepalive=60, min_delay=1.0, max_delay=120.0):
+        self.client = client
+        self.host = host
+        self.port = port
+        self.keepalive = keepalive
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self._stop = threading.Event()
+        self._thread = None
+        self.connected = False
+        self.stats = {'attempts': 0, 'connects': 0, 'disconnects': 0, 'last_error': None}
+
+        # Status koneksi dicatat tanpa mengganti callback milik aplikasi
+        self._on_connect = client.on_connect
+        client.on_connect = self._handle_connect
+
+    def _handle_connect(self, client, userdata, flags, rc, *args):
+        self.connected = rc == 0
+        if self.connected:
+            self.stats['connects'] += 1
+        else:
+            self.stats['last_error'] = f"connect refused, rc={rc}"
+        if self._on_connect is not None:
+            self._on_connect(client, userdata, flags, rc, *args)
+
+    def start(self):
+        """Start connecting in the background, returns at once"""
+        if self._thread is None:
+            self.client.connect_async(self.host, self.port, self.keepalive)
+            self._thread = threading.Thread(target=self._run, name='mqtt-connector', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        """Disconnect and stop the network thread"""
+        self._stop.set()
+        try:
+            self.client.disconnect()
+        except Exception:
+            pass
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        attempt = 0
+        while not self._stop.is_set():
+            self.stats['attempts'] += 1
+            try:
+                self.client.reconnect()
+                rc = mqtt.MQTT_ERR_SUCCESS
+                # Loop jaringan sampai koneksi putus (atau stop)
+                while rc == mqtt.MQTT_ERR_SUCCESS and not self._stop.is_set():
+                    rc = self.client.loop(timeout=1.0)
+                    if self.connected:
+                        attempt = 0
+                if rc != mqtt.MQTT_ERR_SUCCESS:
+                    self.stats['last_error'] = mqtt.error_string(rc)
+            except (OSError, ssl.SSLError, mqtt.WebsocketConnectionError) as e:
+                self.stats['last_error'] = str(e)
+                print(f"MQTT connection to {self.host}:{self.port} failed: {e}")
+            if self.connected:
+                self.stats['disconnects'] += 1
+                self.connected = False
+            if self._stop.is_set():
+                break
+            delay = max(self.min_delay, backoff_delay(attempt, self.min_delay, self.max_delay))
+            attempt += 1
+            self._stop.wait(delay)
+
+    def snapshot(self):
+        """Connection state and retry counters"""
+        return dict(self.stats, connected=self.connected, broker=f"{self.host}:{self.port}")
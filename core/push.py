@@ -0,0 +1,75 @@
+# Push data baru ke browser lewat Server-Sent Events, menggantikan polling dcc.Interval
+import json
+import threading
+import time
+
+
+class PushHub:
+    """Fan-out of "device has new samples" events to SSE clients"""
+
+    # Client tidak punya antrian sendiri: semua menunggu satu Condition dan membaca versi terakhir
+    # per device, client lambat melewatkan event di antaranya
+
+    def __init__(self, min_interval=1.2, keepalive=15, max_age=300):
+        # Jeda minimum antar event per client, burst ingest digabung jadi satu event
+        self.min_interval = min_interval
+        self.keepalive = keepalive
+        # Stream berakhir setelah max_age detik lalu EventSource menyambung ulang, thread server tidak tertahan
+        self.max_age = max_age
+        self._cond = threading.Condition()
+        self._versions = {}
+        self._seq = 0
+        self._closed = False
+        self.clients = 0
+
+    def publish(self, device_ids):
+        """Mark devices as updated and wake every waiting client"""
+        with self._cond:
+            for device_id in device_ids:
+                self._versions[device_id] = self._versions.get(device_id, 0) + 1
+            self._seq += 1
+            self._cond.notify_all()
+
+    def close(self):
+        """End all streams (server shutdown)"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _wait(self, seq, timeout):
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq != seq or self._closed, timeout)
+            return self._seq, dict(self._versions)
+
+    def stream(self):
+        """SSE event stream: `data: {device id: version}` with only the devices that changed"""
+        with self._cond:
+            self.clients += 1
+        try:
+            # Browser menyambung ulang sendiri setelah 3 detik bila koneksi putus (juga setelah max_age)
+            yield "retry: 3000\n\n"
+            seq, sent = None, {}
+            deadline = time.monotonic() + self.max_age
+            while not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                seq, versions = self._wait(seq, min(self.keepalive, remaining))
+                changed = {device_id: version for device_id, version in versions.items()
+                           if sent.get(device_id) != version}
+                if changed:
+                    sent.update(changed)
+                    yield f"data: {json.dumps(changed)}\n\n"
+                    # Tunggu min_interval (atau sampai close) sebelum event berikutnya
+                    with self._cond:
+                        self._cond.wait_for(lambda: self._closed, self.min_interval)
+                else:
+                    yield ": keepalive\n\n"
+        finally:
+            with self._cond:
+                self.clients -= 1
+
+    def snapshot(self):
+        """Connected clients and published event count"""
+        with self._cond:
+            return {'clients': self.clients, 'events': self._seq, 'devices': len(self._versions)}
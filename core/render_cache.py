@@ -0,0 +1,89 @@
+# Cache hasil render bersama untuk semua client: dihitung sekali per perubahan data
+import sys
+import threading
+from collections import OrderedDict
+import numpy as np
+
+
+def estimate_size(obj, _depth=0):
+    """Rough size in bytes of a render result (NumPy arrays, figure dicts, lists, strings)"""
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, (str, bytes)):
+        return len(obj)
+    if _depth > 6:
+        return sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        return sum(estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return sum(estimate_size(item, _depth + 1) for item in obj) + 8 * len(obj)
+    return sys.getsizeof(obj)
+
+
+class RenderCache:
+    """Thread-safe LRU cache of render results, bounded by entry count and estimated bytes"""
+
+    # Key memuat versi data, jadi sampel baru membuat key baru dan entri lama tergeser sendiri
+
+    def __init__(self, max_entries=512, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._pending = {}  # key -> threading.Event, perhitungan yang sedang berjalan
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.stats = {'hits': 0, 'misses': 0, 'waits': 0, 'evictions': 0}
+
+    def get_or_compute(self, key, compute):
+        """Cached value of key, or compute() once and share it with concurrent callers"""
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return entry[0]
+                event = self._pending.get(key)
+                if event is None:
+                    event = self._pending[key] = threading.Event()
+                    break
+                self.stats['waits'] += 1
+            # Client lain sedang menghitung key yang sama, tunggu hasilnya
+            event.wait()
+
+        try:
+            value = compute()
+        except BaseException:
+            with self._lock:
+                self._pending.pop(key).set()
+            raise
+
+        size = estimate_size(value)
+        with self._lock:
+            self.stats['misses'] += 1
+            if size <= self.max_bytes:
+                self._entries[key] = (value, size)
+                self.bytes += size
+                self._evict()
+            self._pending.pop(key).set()
+        return value
+
+    def _evict(self):
+        while self._entries and (len(self._entries) > self.max_entries or self.bytes > self.max_bytes):
+            _, (_, size) = self._entries.popitem(last=False)
+            self.bytes -= size
+            self.stats['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def snapshot(self):
+        """Hit/miss counters plus current size"""
+        with self._lock:
+            return dict(self.stats, entries=len(self._entries), bytes=self.bytes,
+                        max_entries=self.max_entries, max_bytes=self.max_bytes)
@@ -0,0 +1,108 @@
+# Penyimpanan data sensor di memori (ring buffer NumPy)
+import threading
+import numpy as np
+
+# Kapasitas default per metric: ~3 jam data pada 1 sampel/detik
+DEFAULT_CAPACITY = 10800
+
+
+class RingBuffer:
+    """Preallocated ring buffer for one metric (float64 values + int64 epoch timestamps)"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = int(capacity)
+        # Setiap sampel ditulis dua kali (posisi i dan i + capacity) sehingga
+        # jendela data terbaru selalu bersambung di memori dan bisa dibaca tanpa copy
+        self._values = np.zeros(2 * self.capacity, dtype=np.float64)
+        self._timestamps = np.zeros(2 * self.capacity, dtype=np.int64)
+        self._head = 0  # posisi tulis berikutnya
+        self._count = 0
+        # Bertambah setiap ada sampel baru, dipakai callback untuk melewati tick tanpa data baru
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._count
+
+    def append(self, timestamp, value):
+        """Append one sample in O(1), overwriting the oldest one when full"""
+        with self._lock:
+            i = self._head
+            self._values[i] = value
+            self._values[i + self.capacity] = value
+            self._timestamps[i] = timestamp
+            self._timestamps[i + self.capacity] = timestamp
+            self._head = (i + 1) % self.capacity
+            if self._count < self.capacity:
+                self._count += 1
+            self.version += 1
+
+    def extend(self, timestamps, values):
+        """Append many samples at once (e.g. when loading history at startup)"""
+        timestamps = np.asarray(timestamps, dtype=np.int64)[-self.capacity:]
+        values = np.asarray(values, dtype=np.float64)[-self.capacity:]
+        n = len(timestamps)
+        if n == 0:
+            return
+        with self._lock:
+            positions = (self._head + np.arange(n)) % self.capacity
+            self._values[positions] = values
+            self._values[positions + self.capacity] = values
+            self._timestamps[positions] = timestamps
+            self._timestamps[positions + self.capacity] = timestamps
+            self._head = (self._head + n) % self.capacity
+            self._count = min(self.capacity, self._count + n)
+            self.version += n
+
+    def view(self, n=None):
+        """Return read-only (timestamps, values) views of the latest n samples, oldest first"""
+        # View berbagi memori dengan buffer: view seluruh buffer berubah pada append berikutnya,
+        # jadi baca (atau copy, lihat Device.snapshot) selama memegang lock writer
+        with self._lock:
+            count = self._count if n is None else max(0, min(n, self._count))
+            end = self._head + self.capacity
+        timestamps = self._timestamps[end - count:end]
+        values = self._values[end - count:end]
+        timestamps.flags.writeable = False
+        values.flags.writeable = False
+        return timestamps, values
+
+    def latest(self):
+        """Return the latest (timestamp, value) or None if the buffer is empty"""
+        with self._lock:
+            if self._count == 0:
+                return None
+            i = self._head - 1 + self.capacity
+            return int(self._timestamps[i]), float(self._values[i])
+
+
+class SensorStore:
+    """Ring buffer per metric, kapasitas bisa diatur per metric"""
+
+    def __init__(self, metrics, capacity=DEFAULT_CAPACITY, capacities=None):
+        capacities = capacities or {}
+        self.buffers = {metric: RingBuffer(capacities.get(metric, capacity)) for metric in metrics}
+
+    def __contains__(self, metric):
+        return metric in self.buffers
+
+    def __getitem__(self, metric):
+        return self.buffers[metric]
+
+    def append(self, metric, timestamp, value):
+        self.buffers[metric].append(timestamp, value)
+
+    def extend(self, metric, timestamps, values):
+        self.buffers[metric].extend(timestamps, values)
+
+    def view(self, metric, n=None):
+        return self.buffers[metric].view(n)
+
+    def version(self, metric):
+        """Monotonic counter of samples ever appended to a metric"""
+        return self.buffers[metric].version
+
+    def latest(self, metric, default=0):
+        """Latest value of a metric, or `default` when there is no data yet"""
+        sample = self.buffers[metric].latest()
+        return sample[1] if sample else default
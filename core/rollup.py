@@ -0,0 +1,239 @@
+# Agregasi multi-resolusi (1 s / 1 min / 1 h / 1 day) yang di-update saat ingest
+import os
+import threading
+import zipfile
+import numpy as np
+
+NS_PER_SECOND = 1_000_000_000
+
+# (nama, lebar bucket dalam detik, jumlah bucket yang disimpan)
+TIERS = [
+    ('1s', 1, 3 * 3600),        # 3 jam
+    ('1m', 60, 30 * 1440),      # 30 hari
+    ('1h', 3600, 366 * 24),     # 1 tahun
+    ('1d', 86400, 10 * 366),    # 10 tahun
+]
+
+BUCKET_DTYPE = np.dtype([
+    ('start', '<i8'),
+    ('min', '<f8'),
+    ('max', '<f8'),
+    ('sum', '<f8'),
+    ('count', '<i8'),
+    ('last', '<f8'),
+])
+
+
+class RollupTier:
+    """Fixed-width buckets (min/max/sum/count/last) of one resolution"""
+
+    def __init__(self, name, width_seconds, capacity):
+        self.name = name
+        self.width = width_seconds * NS_PER_SECOND
+        self.capacity = capacity
+        # Bucket tertutup: ring yang tumbuh sampai capacity, device yang jarang kirim tetap kecil
+        self._buckets = np.zeros(min(capacity, 1024), dtype=BUCKET_DTYPE)
+        self._head = 0
+        self._count = 0
+        self._open = None  # [start, min, max, sum, count, last]
+
+    @property
+    def retention(self):
+        """Time span (ns) covered by this tier when full"""
+        return self.width * self.capacity
+
+    def _push(self, records):
+        records = records[-self.capacity:]
+        n = len(records)
+        size = len(self._buckets)
+        if self._count + n > size and size < self.capacity:
+            # Ring penuh dibuka dulu: urutan tertua -> terbaru mulai dari head
+            grown = np.zeros(min(self.capacity, max(self._count + n, 2 * size)), dtype=BUCKET_DTYPE)
+            if self._count == size:
+                grown[:size] = np.concatenate((self._buckets[self._head:], self._buckets[:self._head]))
+            else:
+                grown[:self._count] = self._buckets[:self._count]
+            self._buckets = grown
+            self._head = self._count
+            size = len(grown)
+        positions = (self._head + np.arange(n)) % size
+        self._buckets[positions] = records
+        self._head = (self._head + n) % size
+        self._count = min(size, self._count + n)
+
+    def _close_open(self):
+        if self._open is not None:
+            self._push(np.array([tuple(self._open)], dtype=BUCKET_DTYPE))
+            self._open = None
+
+    def update(self, timestamp, value):
+        start = timestamp - timestamp % self.width
+        bucket = self._open
+        if bucket is not None and bucket[0] == start:
+            if value < bucket[1]:
+                bucket[1] = value
+            if value > bucket[2]:
+                bucket[2] = value
+            bucket[3] += value
+            bucket[4] += 1
+            bucket[5] = value
+        elif bucket is None or start > bucket[0]:
+            self._close_open()
+            self._open = [start, value, value, value, 1, value]
+        # Sampel yang lebih tua dari bucket aktif diabaikan
+
+    def extend(self, timestamps, values):
+        """Aggregate a sorted batch of samples in bulk (used when loading history)"""
+        if len(timestamps) == 0:
+            return
+        if self._open is not None:
+            keep = timestamps >= self._open[0]
+            timestamps, values = timestamps[keep], values[keep]
+            if len(timestamps) == 0:
+                return
+        starts = timestamps - timestamps % self.width
+        idx = np.concatenate(([0], np.flatnonzero(np.diff(starts)) + 1))
+        records = np.empty(len(idx), dtype=BUCKET_DTYPE)
+        records['start'] = starts[idx]
+        records['min'] = np.minimum.reduceat(values, idx)
+        records['max'] = np.maximum.reduceat(values, idx)
+        records['sum'] = np.add.reduceat(values, idx)
+        records['count'] = np.diff(np.concatenate((idx, [len(values)])))
+        records['last'] = values[np.concatenate((idx[1:], [len(values)])) - 1]
+
+        first = records[0]
+        if self._open is not None and self._open[0] == first['start']:
+            # Gabungkan bucket pertama dengan bucket yang sedang terbuka
+            bucket = self._open
+            first['min'] = min(bucket[1], first['min'])
+            first['max'] = max(bucket[2], first['max'])
+            first['sum'] += bucket[3]
+            first['count'] += bucket[4]
+            self._open = None
+        self._close_open()
+        if len(records) > 1:
+            self._push(records[:-1])
+        self._open = [int(v) if i in (0, 4) else float(v) for i, v in enumerate(records[-1].tolist())]
+
+    def buckets(self, start_ns, end_ns):
+        """Buckets with start_ns <= start < end_ns, oldest first, as a record array copy"""
+        if self._count < len(self._buckets):
+            parts = [self._buckets[:self._count]]
+        else:
+            # Ring penuh: bagian tertua mulai dari head
+            parts = [self._buckets[self._head:], self._buckets[:self._head]]
+        selected = []
+        for part in parts:
+            lo = np.searchsorted(part['start'], start_ns, side='left')
+            hi = np.searchsorted(part['start'], end_ns, side='left')
+            selected.append(part[lo:hi])
+        if self._open is not None and start_ns <= self._open[0] < end_ns:
+            selected.append(np.array([tuple(self._open)], dtype=BUCKET_DTYPE))
+        return np.concatenate(selected)
+
+    def records(self):
+        """All buckets oldest first, the open bucket (if any) last"""
+        buckets = self.buckets(np.iinfo(np.int64).min, np.iinfo(np.int64).max)
+        return buckets, self._open is not None
+
+    def restore(self, records, has_open):
+        """Replace the buckets with `records()` output"""
+        self._buckets = np.zeros(min(self.capacity, 1024), dtype=BUCKET_DTYPE)
+        self._head = 0
+        self._count = 0
+        self._open = None
+        closed = records[:-1] if has_open else records
+        if len(closed):
+            self._push(closed)
+        if has_open and len(records):
+            self._open = [int(v) if i in (0, 4) else float(v) for i, v in enumerate(records[-1].tolist())]
+
+
+class MetricRollup:
+    """All resolution tiers of one metric"""
+
+    def __init__(self, tiers=TIERS):
+        self.tiers = [RollupTier(name, width, capacity) for name, width, capacity in tiers]
+        # Timestamp sampel terbaru yang sudah diagregasi: snapshot + histori setelahnya = agregasi ulang semua histori
+        self.synced = None
+        self._lock = threading.Lock()
+
+    def update(self, timestamp, value):
+        with self._lock:
+            for tier in self.tiers:
+                tier.update(timestamp, value)
+            if self.synced is None or timestamp > self.synced:
+                self.synced = timestamp
+
+    def extend(self, timestamps, values, now_ns=None):
+        with self._lock:
+            for tier in self.tiers:
+                if now_ns is not None and len(timestamps):
+                    # Data yang lebih tua dari retensi tier tidak perlu diproses
+                    lo = np.searchsorted(timestamps, now_ns - tier.retention, side='left')
+                    tier.extend(timestamps[lo:], values[lo:])
+                else:
+                    tier.extend(timestamps, values)
+            if len(timestamps) and (self.synced is None or timestamps[-1] > self.synced):
+                self.synced = int(timestamps[-1])
+
+    def save(self, path):
+        """Write all tiers to `path` (.npz), atomically replacing an older snapshot"""
+        with self._lock:
+            if self.synced is None:
+                return False
+            arrays = {'synced': np.int64(self.synced)}
+            for tier in self.tiers:
+                records, has_open = tier.records()
+                arrays[tier.name] = records
+                arrays[tier.name + '_open'] = np.bool_(has_open)
+                arrays[tier.name + '_width'] = np.int64(tier.width)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, path)
+        return True
+
+    def restore(self, path):
+        """Load a snapshot written by `save`, False when there is none (or it does not fit the tiers)"""
+        try:
+            with np.load(path) as data:
+                arrays = {name: data[name] for name in data.files}
+        except (OSError, ValueError, EOFError, KeyError, zipfile.BadZipFile):
+            return False
+        # Snapshot dari konfigurasi tier lain tidak dipakai, agregasi dibangun ulang dari histori
+        for tier in self.tiers:
+            if tier.name not in arrays or int(arrays.get(tier.name + '_width', -1)) != tier.width:
+                return False
+            if arrays[tier.name].dtype != BUCKET_DTYPE:
+                return False
+        with self._lock:
+            for tier in self.tiers:
+                tier.restore(arrays[tier.name], bool(arrays[tier.name + '_open']))
+            self.synced = int(arrays['synced'])
+        return True
+
+    def select_tier(self, start_ns, end_ns, points):
+        """Coarsest tier that still gives at least `points` buckets over the range, None for raw samples"""
+        span = end_ns - start_ns
+        covering = [tier for tier in self.tiers if tier.retention >= span]
+        if not covering:
+            return self.tiers[-1]
+        for tier in reversed(covering):
+            if span // tier.width >= points:
+                return tier
+        return None
+
+    def query(self, start_ns, end_ns, points):
+        """Return (tier name, buckets) for the range, or (None, None) for raw data"""
+        tier = self.select_tier(start_ns, end_ns, points)
+        if tier is None:
+            return None, None
+        with self._lock:
+            # Tier dipilih dari rentang saja; bila data baru mengisi sebagian rentang, pakai tier yang lebih halus
+            for candidate in reversed(self.tiers[:self.tiers.index(tier) + 1]):
+                buckets = candidate.buckets(start_ns, end_ns)
+                if len(buckets) >= points:
+                    return candidate.name, buckets
+        return None, None
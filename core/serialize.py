@@ -0,0 +1,77 @@
+# Serialisasi JSON cepat untuk response callback Dash (orjson, array NumPy tanpa konversi ke list)
+import base64
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # orjson opsional, tanpa orjson dipakai encoder JSON Plotly
+    orjson = None
+
+# Karakter yang di-escape seperti plotly.io.json, aman disisipkan di <script> halaman index Dash
+_UNSAFE = (("<", "\\u003c"), (">", "\\u003e"), ("/", "\\u002f"),
+           ("\u2028", "\\u2028"), ("\u2029", "\\u2029"))
+
+# dtype NumPy -> dtype typed array plotly.js
+_TYPED_DTYPES = {'float64': 'f8', 'float32': 'f4', 'int32': 'i4', 'int16': 'i2', 'int8': 'i1',
+                 'uint32': 'u4', 'uint16': 'u2', 'uint8': 'u1'}
+
+
+def typed_array(values):
+    """Plotly typed-array spec ({'dtype', 'bdata'}) of a numeric array, decoded by plotly.js"""
+    # plotly.js menyimpan objek spec di figure, jangan dipakai untuk trace yang diperpanjang dengan extendData
+    values = np.ascontiguousarray(values)
+    if values.dtype == np.int64:
+        # plotly.js tidak punya int64
+        values = values.astype(np.int32) if len(values) and np.abs(values).max() < 2 ** 31 else values.astype(np.float64)
+    dtype = _TYPED_DTYPES.get(str(values.dtype))
+    if dtype is None or not values.size:
+        return values
+    return {'dtype': dtype, 'bdata': base64.b64encode(values).decode('ascii')}
+
+
+def _default(obj):
+    # Komponen Dash, Patch dan figure Plotly
+    to_plotly_json = getattr(obj, 'to_plotly_json', None)
+    if to_plotly_json is not None:
+        return to_plotly_json()
+    if isinstance(obj, np.ndarray):
+        # Array non-contiguous / dtype yang tidak didukung orjson langsung
+        if obj.dtype.kind in 'biuf':
+            return np.ascontiguousarray(obj)
+        if obj.dtype.kind == 'M':
+            return np.datetime_as_string(obj).tolist()
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def _safe(text):
+    for unsafe, escaped in _UNSAFE:
+        if unsafe in text:
+            text = text.replace(unsafe, escaped)
+    return text
+
+
+def dumps(obj):
+    """JSON string of a Dash response/layout: NumPy arrays written natively, Plotly-safe escaping"""
+    if orjson is None:
+        from plotly.io.json import to_json_plotly
+        return to_json_plotly(obj, engine='json')
+    option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    return _safe(orjson.dumps(obj, default=_default, option=option).decode('utf8'))
+
+
+def install_json():
+    """Make Dash serialize callback responses and layouts with dumps()"""
+    # Dash mengimpor to_json per nama ke modul pengirim response, jadi diganti di sana
+    import dash._callback
+    import dash._utils
+    import dash.dash
+    dash._utils.to_json = dumps
+    dash._callback.to_json = dumps
+    dash.dash.to_json = dumps
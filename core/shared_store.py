@@ -0,0 +1,382 @@
+# Ring buffer sensor di shared memory: satu proses ingest menulis, banyak worker web membaca
+# Blok untuk store "mcs": mcs-devices (daftar id device) dan mcs-<device id> (header + ring buffer semua metric).
+# Tiap blok diawali sequence counter (seqlock): ganjil selama writer menulis, reader mengulang bacaan bila berubah
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+from core.devices import ROLLUP_FILE, Device, DeviceRegistry
+from core.ring_buffer import DEFAULT_CAPACITY, RingBuffer, SensorStore
+from core.rollup import MetricRollup
+
+# Header device: seq, first_seen, last_seen, jumlah metric, lalu per metric (capacity, head, count, version)
+DEVICE_HEADER = 4
+METRIC_HEADER = 4
+
+# Daftar device: seq, jumlah device, generasi (waktu start proses ingest), lalu slot id (maksimal 64 karakter)
+DIRECTORY_HEADER = 3
+MAX_DEVICES = 256
+ID_BYTES = 64
+
+
+def block_name(prefix, device_id=None):
+    """Shared memory name of the device list (no device_id) or of one device"""
+    return f"{prefix}-devices" if device_id is None else f"{prefix}-{device_id}"
+
+
+def _open(name, size, create):
+    """Create (or attach to) a block that outlives this process, remove it with `unlink()`"""
+    # Sebelum Python 3.13 resource tracker meng-unlink blok saat proses keluar, jadi blok tidak diregistrasi
+    try:
+        shm = shared_memory.SharedMemory(name=name, create=create, size=size if create else 0)
+    except FileExistsError:
+        shm = shared_memory.SharedMemory(name=name)
+    resource_tracker.unregister(shm._name, 'shared_memory')
+    if shm.size < size:
+        raise ValueError(f"shared memory block {name} is {shm.size} bytes, expected {size}")
+    return shm
+
+
+def unlink(prefix):
+    """Remove all blocks of a store (after stopping the ingest process)"""
+    try:
+        directory = DeviceDirectory(prefix)
+    except FileNotFoundError:
+        return
+    for name in [block_name(prefix, device_id) for device_id in directory.ids()] + [block_name(prefix)]:
+        try:
+            shm = shared_memory.SharedMemory(name=name)
+        except FileNotFoundError:
+            continue
+        resource_tracker.register(shm._name, 'shared_memory')
+        shm.close()
+        shm.unlink()
+
+
+class SeqLock:
+    """Sequence counter in shared memory guarding one writer process against many readers"""
+
+    # Di writer berupa reentrant lock (juga lock Device), di reader konsisten lewat read(fn)
+    def __init__(self, counter, writer=False, timeout=0.5):
+        self._counter = counter
+        self.writer = writer
+        self.timeout = timeout
+        self._lock = threading.RLock()
+        self._depth = 0
+
+    @property
+    def sequence(self):
+        return int(self._counter[0])
+
+    def __enter__(self):
+        if self.writer:
+            self._lock.acquire()
+            self._depth += 1
+            if self._depth == 1:
+                self._counter[0] += 1  # ganjil: sedang menulis
+        return self
+
+    def __exit__(self, *exc):
+        if self.writer:
+            if self._depth == 1:
+                self._counter[0] += 1
+            self._depth -= 1
+            self._lock.release()
+
+    def read(self, fn):
+        """Result of fn() computed while the writer did not touch the block"""
+        if self.writer:
+            with self._lock:
+                return fn()
+        deadline = None
+        while True:
+            start = int(self._counter[0])
+            if not start & 1:
+                result = fn()
+                if int(self._counter[0]) == start:
+                    return result
+            if deadline is None:
+                deadline = time.monotonic() + self.timeout
+            elif time.monotonic() > deadline:
+                # Proses ingest mati di tengah penulisan (counter tetap ganjil), baca apa adanya
+                return fn()
+            time.sleep(0)
+
+
+class SharedRingBuffer(RingBuffer):
+    """RingBuffer whose arrays and head/count/version live in a shared memory block"""
+
+    def __init__(self, header, timestamps, values, lock):
+        self._header = header  # [capacity, head, count, version]
+        self.capacity = int(header[0])
+        self._timestamps = timestamps
+        self._values = values
+        self._lock = lock
+
+    @property
+    def _head(self):
+        return int(self._header[1])
+
+    @_head.setter
+    def _head(self, value):
+        self._header[1] = value
+
+    @property
+    def _count(self):
+        return int(self._header[2])
+
+    @_count.setter
+    def _count(self, value):
+        self._header[2] = value
+
+    @property
+    def version(self):
+        return int(self._header[3])
+
+    @version.setter
+    def version(self, value):
+        self._header[3] = value
+
+    def __len__(self):
+        return self._lock.read(lambda: self._count)
+
+    def view(self, n=None):
+        return self._lock.read(lambda: RingBuffer.view(self, n))
+
+    def latest(self):
+        return self._lock.read(lambda: RingBuffer.latest(self))
+
+
+class SharedSensorStore(SensorStore):
+    """SensorStore in one shared memory block, same metrics and capacities in every process"""
+
+    def __init__(self, name, metrics, capacity=DEFAULT_CAPACITY, capacities=None, writer=False):
+        capacities = capacities or {}
+        metrics = list(metrics)
+        sizes = [int(capacities.get(metric, capacity)) for metric in metrics]
+        header_len = DEVICE_HEADER + METRIC_HEADER * len(metrics)
+        nbytes = 8 * header_len + sum(2 * 2 * 8 * size for size in sizes)
+        self.name = name
+        self.writer = writer
+        self._shm = _open(name, nbytes, create=writer)
+        self._header = np.ndarray(header_len, dtype=np.int64, buffer=self._shm.buf)
+        self.lock = SeqLock(self._header[0:1], writer=writer)
+
+        if writer:
+            if self._header[0] & 1:
+                self._header[0] += 1  # ditinggal proses ingest yang mati saat menulis
+            with self.lock:
+                if self._header[3] != len(metrics) or list(self._header[DEVICE_HEADER::METRIC_HEADER]) != sizes:
+                    self._header[1:] = 0
+                    self._header[3] = len(metrics)
+                    self._header[DEVICE_HEADER::METRIC_HEADER] = sizes
+                # Proses ingest baru: buffer dikosongkan lagi (diisi dari histori), versi tetap naik
+                self._header[DEVICE_HEADER + 1::METRIC_HEADER] = 0
+                self._header[DEVICE_HEADER + 2::METRIC_HEADER] = 0
+                self._header[1:3] = 0
+        elif self._header[3] != len(metrics) or list(self._header[DEVICE_HEADER::METRIC_HEADER]) != sizes:
+            raise ValueError(f"shared store {name} was created with other metrics or capacities")
+
+        self.buffers = {}
+        offset = 8 * header_len
+        for i, (metric, size) in enumerate(zip(metrics, sizes)):
+            timestamps = np.ndarray(2 * size, dtype=np.int64, buffer=self._shm.buf, offset=offset)
+            values = np.ndarray(2 * size, dtype=np.float64, buffer=self._shm.buf, offset=offset + 16 * size)
+            offset += 32 * size
+            metric_header = self._header[DEVICE_HEADER + METRIC_HEADER * i:DEVICE_HEADER + METRIC_HEADER * (i + 1)]
+            self.buffers[metric] = SharedRingBuffer(metric_header, timestamps, values, self.lock)
+
+    def get_seen(self):
+        """(first_seen, last_seen) of the device, None when unknown"""
+        first, last = (int(v) for v in self._header[1:3])
+        return first or None, last or None
+
+    def set_seen(self, first_seen, last_seen):
+        self._header[1] = first_seen or 0
+        self._header[2] = last_seen or 0
+
+
+class SharedDevice(Device):
+    """Device backed by a SharedSensorStore, with FollowerRollups in web workers"""
+
+    def __init__(self, device_id, store, rollup_metrics, history=None):
+        self.id = device_id
+        self.store = store
+        self.lock = store.lock
+        if store.writer:
+            self.rollups = {metric: MetricRollup() for metric in rollup_metrics}
+        else:
+            self.rollups = {metric: FollowerRollup(self, metric, history) for metric in rollup_metrics}
+
+    @property
+    def first_seen(self):
+        return self.store.get_seen()[0]
+
+    @first_seen.setter
+    def first_seen(self, value):
+        self.store.set_seen(value, self.last_seen)
+
+    @property
+    def last_seen(self):
+        return self.store.get_seen()[1]
+
+    @last_seen.setter
+    def last_seen(self, value):
+        self.store.set_seen(self.first_seen, value)
+
+    def latest(self, metrics, default=0):
+        return self.lock.read(lambda: Device.latest(self, metrics, default))
+
+    def versions(self, metrics):
+        return self.lock.read(lambda: Device.versions(self, metrics))
+
+    def snapshot(self, metrics, since=None):
+        return self.lock.read(lambda: Device.snapshot(self, metrics, since))
+
+    def info(self):
+        return self.lock.read(lambda: Device.info(self))
+
+
+class FollowerRollup(MetricRollup):
+    """Rollups of one metric in a web worker, caught up from the shared ring buffer before each query"""
+
+    def __init__(self, device, metric, history):
+        super().__init__()
+        self.device = device
+        self.metric = metric
+        self.history = history
+        self._loaded = False
+        self._sync_lock = threading.Lock()
+
+    def sync(self):
+        with self._sync_lock:
+            now = time.time_ns()
+            first = not self._loaded
+            if first:
+                # Query pertama memuat snapshot rollup proses ingest (tanpa snapshot: agregasi histori)
+                self.restore(self.history.state_path(self.device.history_key(self.metric), ROLLUP_FILE))
+                self._loaded = True
+            if self.synced is None:
+                start = now - max(tier.retention for tier in self.tiers)
+            else:
+                start = self.synced + 1
+            timestamps, values = self.device.snapshot([self.metric], since=start)[self.metric]
+            ring_start = int(timestamps[0]) if len(timestamps) else None
+            if first or (ring_start is not None and ring_start > start):
+                # Bagian yang tidak ada (lagi) di ring buffer dibaca dari histori
+                end = ring_start if ring_start is not None else now + 1
+                for part_ts, part_values in self.history.query_views(self.device.history_key(self.metric), start, end):
+                    self.extend(part_ts, part_values, now)
+            if len(timestamps):
+                self.extend(timestamps, values, now)
+
+    def query(self, start_ns, end_ns, points):
+        self.sync()
+        return super().query(start_ns, end_ns, points)
+
+
+class DeviceDirectory:
+    """Ids of the devices in a shared store, appended by the ingest process"""
+
+    def __init__(self, prefix, writer=False):
+        header_bytes = 8 * DIRECTORY_HEADER
+        self._shm = _open(block_name(prefix), header_bytes + MAX_DEVICES * ID_BYTES, create=writer)
+        self._header = np.ndarray(DIRECTORY_HEADER, dtype=np.int64, buffer=self._shm.buf)
+        self._slots = np.ndarray((MAX_DEVICES, ID_BYTES), dtype=np.uint8, buffer=self._shm.buf, offset=header_bytes)
+        self.lock = SeqLock(self._header[0:1], writer=writer)
+        if writer:
+            if self._header[0] & 1:
+                self._header[0] += 1  # ditinggal proses ingest yang mati saat menulis
+            # Generasi: waktu start proses ingest, sama di semua worker sampai ingest restart
+            with self.lock:
+                self._header[2] = time.time_ns()
+
+    @property
+    def generation(self):
+        return int(self._header[2])
+
+    def __len__(self):
+        return int(self._header[1])
+
+    def add(self, device_id):
+        encoded = device_id.encode('ascii')
+        with self.lock:
+            count = int(self._header[1])
+            if device_id in self._decode(count):
+                return
+            if count >= MAX_DEVICES:
+                raise ValueError(f"shared store is full ({MAX_DEVICES} devices)")
+            self._slots[count] = 0
+            self._slots[count, :len(encoded)] = np.frombuffer(encoded, dtype=np.uint8)
+            self._header[1] = count + 1
+
+    def _decode(self, count):
+        return [bytes(self._slots[i]).rstrip(b'\0').decode('ascii') for i in range(count)]
+
+    def ids(self):
+        return self.lock.read(lambda: self._decode(int(self._header[1])))
+
+
+class SharedDeviceRegistry(DeviceRegistry):
+    """DeviceRegistry over a shared store, readers attach to devices the ingest process created"""
+
+    def __init__(self, prefix, factory, writer=False, placeholder=None):
+        super().__init__(factory)
+        self.prefix = prefix
+        self.writer = writer
+        # Id yang belum dibuat proses ingest mendapat device placeholder kosong
+        self.placeholder = placeholder
+        self._placeholders = {}  # device id -> device kosong, dipakai ulang setiap tick
+        self.directory = DeviceDirectory(prefix, writer=True) if writer else None
+
+    def _refresh(self):
+        if self.writer:
+            return
+        if self.directory is None:
+            try:
+                self.directory = DeviceDirectory(self.prefix)
+            except FileNotFoundError:
+                return  # proses ingest belum pernah berjalan
+        if len(self.directory) != len(self._devices):
+            for device_id in self.directory.ids():
+                if device_id not in self._devices:
+                    super().get_or_create(device_id)
+                    self._placeholders.pop(device_id, None)
+
+    def __contains__(self, device_id):
+        self._refresh()
+        return super().__contains__(device_id)
+
+    def __len__(self):
+        self._refresh()
+        return super().__len__()
+
+    def get(self, device_id):
+        self._refresh()
+        return super().get(device_id)
+
+    def get_or_create(self, device_id):
+        if self.writer:
+            device = self._devices.get(device_id)
+            if device is None:
+                device = super().get_or_create(device_id)
+                self.directory.add(device_id)
+            return device
+        device = self.get(device_id)
+        if device is None:
+            device = self._placeholders.get(device_id)
+            if device is None:
+                if len(self._placeholders) >= MAX_DEVICES:
+                    self._placeholders.clear()
+                device = self._placeholders[device_id] = self.placeholder(device_id)
+        return device
+
+    def ids(self):
+        self._refresh()
+        return super().ids()
+
+    @property
+    def generation(self):
+        """Start stamp of the ingest process, the same in every worker (None before it ever ran)"""
+        self._refresh()
+        return self.directory.generation if self.directory is not None else None
@@ -0,0 +1,34 @@
+# Format timestamp sensor (epoch ns) menjadi label waktu, hanya saat render
+from datetime import datetime
+from functools import lru_cache
+import pytz
+
+# Zona waktu dibuat sekali, bukan di setiap pesan MQTT
+TIMEZONE = pytz.timezone('Asia/Jakarta')
+
+NS_PER_SECOND = 1_000_000_000
+
+
+@lru_cache(maxsize=8192)
+def _format_second(second, fmt):
+    return datetime.fromtimestamp(second, tz=TIMEZONE).strftime(fmt)
+
+
+def format_time(ts_ns, fmt='%H:%M:%S'):
+    """Format one epoch-ns timestamp in local time, cached per second"""
+    return _format_second(int(ts_ns) // NS_PER_SECOND, fmt)
+
+
+def format_times(timestamps, fmt='%H:%M:%S'):
+    """Format an array of epoch-ns timestamps"""
+    return [format_time(ts, fmt) for ts in timestamps]
+
+
+def to_seconds(timestamps):
+    """Epoch-ns timestamps to float epoch seconds, used as numeric x values"""
+    return timestamps / NS_PER_SECOND
+
+
+def time_format(span_ns):
+    """Tick label format for a chart covering span_ns nanoseconds"""
+    return '%H:%M:%S' if span_ns < 86400 * NS_PER_SECOND else '%d/%m %H:%M'
@@ -77,6 +77,7 @@ engineer_gps_layout = html.Div([
             dcc.Location(id="logout-redirect", refresh=True)  # Handles redirection
         ], className="d-flex flex-wrap justify-content-end mb-4")
     ], className="container"),
-    
-    dcc.Interval(id='interval_gps', interval=1200, n_intervals=0)
+
+    # Versi data GPS yang sudah tampil, tick tanpa data baru dilewati
+    dcc.Store(id='gps-version')
 ], className="dashboard-container")
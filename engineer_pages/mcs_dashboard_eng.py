@@ -2,6 +2,7 @@
 
 from dash import dcc, html, dash_table
 import dash_bootstrap_components as dbc
+from core.images import responsive_img
 
 # IP WebServer
 ESP_IP = "http://192.168.0.240"
@@ -86,7 +87,7 @@ engineer_dashboard_layout = html.Div([
     # TAMPILAN BOTTOM GRID
     html.Div([
         dbc.Row([
-            dbc.Col(html.Img(src="/static/img/pictogram_mcs_2.png", className="greenhouse-img"), width=6),
+            dbc.Col(responsive_img("/static/img/pictogram_mcs_2.png", className="greenhouse-img"), width=6),
             dbc.Col([
                 # Table Section
                 html.Div([
@@ -120,5 +121,6 @@ engineer_dashboard_layout = html.Div([
         ], className="g-2")
     ], className="container mb-5"),
 
-    dcc.Interval(id='interval_mcs', interval=1200, n_intervals=0)
+    # Versi data yang sudah tampil di halaman ini, tick tanpa data baru dilewati
+    dcc.Store(id={'type': 'data-version', 'id': 'sensors'}, data={})
 ])
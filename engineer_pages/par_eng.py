@@ -1,5 +1,7 @@
 from dash import dcc, html, dash_table
 import dash_bootstrap_components as dbc
+from core.figures import trend_figure
+from core.images import responsive_img
 
 engineer_par_layout = html.Div([
     # NAVBAR
@@ -28,7 +30,7 @@ engineer_par_layout = html.Div([
                 
                 # Greenhouse Image
                 html.Div([
-                    html.Img(src="/static/img/gh.jpg", className="img-fluid w-100 border border-primary p-1", 
+                    responsive_img("/static/img/gh.jpg", className="img-fluid w-100 border border-primary p-1", 
                             style={"height": "300px", "object-fit": "cover"})
                 ], className="greenhouse-container")
             ], width=6, className="pe-3"),
@@ -42,11 +44,30 @@ engineer_par_layout = html.Div([
                         # Windspeed Graph - Using a simple div wrapper
                         html.Div([
                             dcc.Graph(
-                                id='par-graph',
+                                id={'type': 'trend-graph', 'id': 'par-graph'},
+                                className='trend-graph par-graph',
+                                figure=trend_figure('par-graph'),
                                 config={"displayModeBar": False},
                                 style={'height': '300px'}
                             )
                         ]), 
+
+                        # Range selector, rentang panjang dibaca dari histori disk
+                        dcc.RadioItems(
+                            id={'type': 'trend-range', 'id': 'par-graph'},
+                            options=[
+                                {'label': 'LIVE', 'value': 'live'},
+                                {'label': '1H', 'value': '1h'},
+                                {'label': '24H', 'value': '24h'},
+                                {'label': '7D', 'value': '7d'},
+                                {'label': '30D', 'value': '30d'},
+                            ],
+                            value='live',
+                            inline=True,
+                            className="text-center",
+                            inputClassName="me-1",
+                            labelClassName="me-3"
+                        ),
                     ], className="mb-3 p-2 border rounded bg-light"),
                 
                 # Historical Data Table
@@ -93,6 +114,9 @@ engineer_par_layout = html.Div([
         ])
     ], className="container"),
     
-    # Keep the interval component for data updates
-    dcc.Interval(id='interval_par', interval=1200, n_intervals=0)
+    # Data grafik yang sudah ada di browser, hanya sampel lebih baru yang dikirim
+    dcc.Store(id={'type': 'trend-cursor', 'id': 'page'}, data={}),
+    
+    # Versi data yang sudah tampil di halaman ini, tick tanpa data baru dilewati
+    dcc.Store(id={'type': 'data-version', 'id': 'sensors'}, data={})
 ], className="dashboard-container")
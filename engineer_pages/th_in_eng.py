@@ -1,6 +1,7 @@
 from dash import dcc, html, dash_table
 import dash_bootstrap_components as dbc
-import plotly.graph_objects as go
+from core.figures import trend_figure
+from core.images import responsive_img
 
 engineer_th_in_layout = html.Div([
     # NAVBAR
@@ -38,7 +39,7 @@ engineer_th_in_layout = html.Div([
                 
                 # Greenhouse Image
                 html.Div([
-                    html.Img(src="/static/img/gh.jpg", className="img-fluid w-100 border border-primary p-1", 
+                    responsive_img("/static/img/gh.jpg", className="img-fluid w-100 border border-primary p-1", 
                             style={"height": "300px", "object-fit": "cover"})
                 ], className="greenhouse-container")
             ], width=6, className="pe-3"),
@@ -52,7 +53,9 @@ engineer_th_in_layout = html.Div([
                         # Temperature Graph - Using a simple div wrapper
                         html.Div([
                             dcc.Graph(
-                                id='temp-graph',
+                                id={'type': 'trend-graph', 'id': 'temp-graph'},
+                                className='trend-graph temp-graph',
+                                figure=trend_figure('temp-graph'),
                                 config={"displayModeBar": False},
                                 style={'height': '150px'}
                             )
@@ -61,7 +64,9 @@ engineer_th_in_layout = html.Div([
                         # Humidity Graph - Using a simple div wrapper
                         html.Div([
                             dcc.Graph(
-                                id='humidity-graph',
+                                id={'type': 'trend-graph', 'id': 'humidity-graph'},
+                                className='trend-graph humidity-graph',
+                                figure=trend_figure('humidity-graph'),
                                 config={"displayModeBar": False},
                                 style={'height': '150px'}
                             )
@@ -113,6 +118,10 @@ engineer_th_in_layout = html.Div([
         ])
     ], className="container"),
     
-    # Keep the interval component for data updates
-    dcc.Interval(id='interval_thin', interval=1200, n_intervals=0)
+    # Data grafik yang sudah ada di browser, hanya sampel lebih baru yang dikirim
+    dcc.Store(id={'type': 'trend-cursor', 'id': 'page'}, data={}),
+    
+    # Versi data yang sudah tampil di halaman ini, tick tanpa data baru dilewati
+    dcc.Store(id={'type': 'data-version', 'id': 'sensors'}, data={}),
+    dcc.Store(id='table-version')
 ], className="dashboard-container")
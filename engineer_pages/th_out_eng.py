@@ -1,5 +1,7 @@
 from dash import dcc, html, dash_table
 import dash_bootstrap_components as dbc
+from core.figures import trend_figure
+from core.images import responsive_img
 
 engineer_th_out_layout = html.Div([
     # NAVBAR
@@ -37,7 +39,7 @@ engineer_th_out_layout = html.Div([
                 
                 # Greenhouse Image
                 html.Div([
-                    html.Img(src="/static/img/gh.jpg", className="img-fluid w-100 border border-primary p-1", 
+                    responsive_img("/static/img/gh.jpg", className="img-fluid w-100 border border-primary p-1", 
                             style={"height": "300px", "object-fit": "cover"})
                 ], className="greenhouse-container")
             ], width=6, className="pe-3"),
@@ -51,7 +53,9 @@ engineer_th_out_layout = html.Div([
                         # Temperature Graph - Using a simple div wrapper
                         html.Div([
                             dcc.Graph(
-                                id='temp-graph-out',
+                                id={'type': 'trend-graph', 'id': 'temp-graph-out'},
+                                className='trend-graph temp-graph-out',
+                                figure=trend_figure('temp-graph-out'),
                                 config={"displayModeBar": False},
                                 style={'height': '150px'}
                             )
@@ -60,7 +64,9 @@ engineer_th_out_layout = html.Div([
                         # Humidity Graph - Using a simple div wrapper
                         html.Div([
                             dcc.Graph(
-                                id='humidity-graph-out',
+                                id={'type': 'trend-graph', 'id': 'humidity-graph-out'},
+                                className='trend-graph humidity-graph-out',
+                                figure=trend_figure('humidity-graph-out'),
                                 config={"displayModeBar": False},
                                 style={'height': '150px'}
                             )
@@ -112,6 +118,9 @@ engineer_th_out_layout = html.Div([
         ])
     ], className="container"),
     
-    # Keep the interval component for data updates
-    dcc.Interval(id='interval_thout', interval=1200, n_intervals=0)
+    # Data grafik yang sudah ada di browser, hanya sampel lebih baru yang dikirim
+    dcc.Store(id={'type': 'trend-cursor', 'id': 'page'}, data={}),
+    
+    # Versi data yang sudah tampil di halaman ini, tick tanpa data baru dilewati
+    dcc.Store(id={'type': 'data-version', 'id': 'sensors'}, data={})
 ], className="dashboard-container")
@@ -1,5 +1,7 @@
 from dash import dcc, html, dash_table
 import dash_bootstrap_components as dbc
+from core.figures import trend_figure
+from core.images import responsive_img
 
 engineer_windspeed_layout = html.Div([
     # NAVBAR
@@ -28,7 +30,7 @@ engineer_windspeed_layout = html.Div([
                 
                 # Greenhouse Image
                 html.Div([
-                    html.Img(src="/static/img/gh.jpg", className="img-fluid w-100 border border-primary p-1", 
+                    responsive_img("/static/img/gh.jpg", className="img-fluid w-100 border border-primary p-1", 
                             style={"height": "300px", "object-fit": "cover"})
                 ], className="greenhouse-container")
             ], width=6, className="pe-3"),
@@ -42,7 +44,9 @@ engineer_windspeed_layout = html.Div([
                         # Windspeed Graph - Using a simple div wrapper
                         html.Div([
                             dcc.Graph(
-                                id='windspeed-graph',
+                                id={'type': 'trend-graph', 'id': 'windspeed-graph'},
+                                className='trend-graph windspeed-graph',
+                                figure=trend_figure('windspeed-graph'),
                                 config={"displayModeBar": False},
                                 style={'height': '300px'}
                             )
@@ -93,6 +97,9 @@ engineer_windspeed_layout = html.Div([
         ])
     ], className="container"),
     
-    # Keep the interval component for data updates
-    dcc.Interval(id='interval_windspeed', interval=1200, n_intervals=0)
+    # Data grafik yang sudah ada di browser, hanya sampel lebih baru yang dikirim
+    dcc.Store(id={'type': 'trend-cursor', 'id': 'page'}, data={}),
+    
+    # Versi data yang sudah tampil di halaman ini, tick tanpa data baru dilewati
+    dcc.Store(id={'type': 'data-version', 'id': 'sensors'}, data={})
 ], className="dashboard-container")
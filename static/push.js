@@ -0,0 +1,42 @@
+// Push data sensor lewat Server-Sent Events (/push/stream).
+// Selama SSE tersambung interval_sensors dimatikan, bila putus interval dipakai lagi sebagai cadangan.
+(function () {
+    var STREAM_URL = '/push/stream';
+
+    function ready() {
+        return window.dash_clientside && window.dash_clientside.set_props &&
+            document.getElementById('page-content');
+    }
+
+    function setFallback(enabled) {
+        window.dash_clientside.set_props('interval_sensors', {disabled: !enabled});
+    }
+
+    function connect() {
+        if (!window.EventSource) {
+            return;  // Browser lama: tetap polling dengan dcc.Interval
+        }
+        if (!ready()) {
+            setTimeout(connect, 200);
+            return;
+        }
+        var source = new EventSource(STREAM_URL);
+        source.onopen = function () {
+            setFallback(false);
+        };
+        source.onmessage = function (event) {
+            // {device id: versi}, diteruskan ke callback clientside yang menyaring device aktif
+            window.dash_clientside.set_props('push-event', {data: JSON.parse(event.data)});
+        };
+        source.onerror = function () {
+            // EventSource menyambung ulang sendiri, sementara itu polling lagi
+            setFallback(true);
+        };
+    }
+
+    if (document.readyState === 'loading') {
+        document.addEventListener('DOMContentLoaded', connect);
+    } else {
+        connect();
+    }
+})();
@@ -0,0 +1,34 @@
+// Format nilai sensor di browser: server hanya mengirim angka terakhir per tampilan (sensor-latest),
+// satuan, N/A dan warna di luar rentang normal dikerjakan di sini.
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    sensors: {
+        WARNING_COLOR: '#FF4B4B',
+
+        formatValue: function (value, unit) {
+            if (value === null || value === undefined || !isFinite(value)) {
+                return 'N/A';
+            }
+            // Sama dengan str(float) di Python: 25 -> "25.0"
+            var text = Number.isInteger(value) ? value.toFixed(1) : String(value);
+            return text + (unit || '');
+        },
+
+        format: function (latest, formats) {
+            var ns = window.dash_clientside.sensors;
+            var outputs = window.dash_clientside.callback_context.outputs_list[0];
+            var children = [], styles = [];
+            latest = latest || {};
+            formats = formats || {};
+            outputs.forEach(function (output) {
+                var id = output.id.id;
+                var spec = formats[id] || {};
+                var value = latest[id];
+                children.push(ns.formatValue(value, spec.unit));
+                var outside = typeof value === 'number' &&
+                    ((spec.low !== undefined && value < spec.low) || (spec.high !== undefined && value > spec.high));
+                styles.push(outside ? {color: ns.WARNING_COLOR} : {});
+            });
+            return [children, styles];
+        }
+    }
+});
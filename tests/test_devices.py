@@ -0,0 +1,21 @@
+import os
+from core.devices import DEFAULT_DEVICE, Device, DeviceRegistry
+from core.history import HistoryStore
+
+METRICS = ['kodeDataSuhuIn', 'kodeDataCo2']
+
+
+def test_legacy_metric_folders_move_under_default_device(tmp_path):
+    history = HistoryStore(str(tmp_path))
+    # Layout lama: history/<metric>/<day>.ts
+    history.append('kodeDataSuhuIn', 1_000, 25.0)
+    history.append('gh-1/kodeDataCo2', 2_000, 400.0)
+    history.flush()
+
+    devices = DeviceRegistry(lambda device_id: Device(device_id, METRICS, [], capacity=16))
+    devices.load(history)
+
+    assert devices.ids() == [DEFAULT_DEVICE, 'gh-1']
+    assert not os.path.exists(tmp_path / 'kodeDataSuhuIn')
+    assert devices.get(DEFAULT_DEVICE).store.latest('kodeDataSuhuIn') == 25.0
+    assert devices.get('gh-1').store.latest('kodeDataCo2') == 400.0
@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+from core.downsample import downsample_indices, minmax_indices
+
+
+@pytest.mark.parametrize('n', [1919, 1920, 1921, 2560, 6400, 6401])
+def test_minmax_handles_exact_multiples(n):
+    y = np.sin(np.arange(n) / 10.0)
+    indices = minmax_indices(y, 640)
+    assert indices[0] == 0 and indices[-1] == n - 1
+    assert np.all(np.diff(indices) > 0)
+
+
+@pytest.mark.parametrize('n', [1280, 1281, 1920, 2560, 6400, 100000])
+def test_downsample_boundary_sizes(n):
+    # 320 titik: grafik setengah lebar pada layar 1280px
+    x = np.arange(n, dtype=np.int64)
+    y = np.random.default_rng(n).normal(size=n)
+    indices = downsample_indices(x, y, 320)
+    assert len(indices) == 320
+    assert indices[0] == 0 and indices[-1] == n - 1
+    assert np.all(np.diff(indices) > 0)
@@ -0,0 +1,91 @@
+import io
+import json
+import threading
+import time
+import pytest
+from core.feed import FeedClient, FeedServer
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return str(tmp_path / 'ingest.sock')
+
+
+def test_subscriber_gets_published_devices(socket_path):
+    server = FeedServer(socket_path, stats=lambda: {'processed': 7}).start()
+    received = []
+    client = FeedClient(socket_path, received.append).start()
+    try:
+        assert wait_until(lambda: server.snapshot()['subscribers'] == 1)
+        server.publish({'gh-2', 'gh-1'})
+        assert wait_until(lambda: received)
+        assert received[0] == ['gh-1', 'gh-2']
+        assert client.request_stats() == {'processed': 7}
+    finally:
+        client.stop()
+        server.close()
+
+
+def test_client_reconnects_after_server_restart(socket_path):
+    received = []
+    client = FeedClient(socket_path, received.append, min_delay=0.05, max_delay=0.1).start()
+    try:
+        # Server belum ada: client terus mencoba tanpa error
+        time.sleep(0.1)
+        assert not client.connected
+        assert client.request_stats() is None
+        server = FeedServer(socket_path).start()
+        assert wait_until(lambda: client.connected)
+        server.close()
+        assert wait_until(lambda: not client.connected)
+        server = FeedServer(socket_path).start()
+        assert wait_until(lambda: server.snapshot()['subscribers'] == 1)
+        server.publish(['gh-1'])
+        assert wait_until(lambda: received == [['gh-1']])
+        assert client.stats['connects'] >= 2
+        server.close()
+    finally:
+        client.stop()
+
+
+class BlockingWriter:
+    """wfile whose first write blocks until released, like a full socket buffer"""
+
+    def __init__(self):
+        self.lines = []
+        self.release = threading.Event()
+
+    def write(self, data):
+        if not self.lines:
+            self.lines.append(data)
+            self.release.wait(2)
+        else:
+            self.lines.append(data)
+
+
+def test_slow_subscriber_gets_coalesced_updates(socket_path):
+    server = FeedServer(socket_path)
+    wfile = BlockingWriter()
+    handler = threading.Thread(target=server._handle, args=(io.BytesIO(b'subscribe\n'), wfile))
+    handler.start()
+    assert wait_until(lambda: server.snapshot()['subscribers'] == 1)
+    server.publish(['gh-1'])
+    assert wait_until(lambda: wfile.lines)
+    # Subscriber masih menulis event pertama: publish berikutnya digabung jadi satu event
+    for device_id in ('gh-2', 'gh-3', 'gh-2'):
+        server.publish([device_id])
+    wfile.release.set()
+    assert wait_until(lambda: len(wfile.lines) == 2)
+    server.close()
+    handler.join(1)
+    assert [json.loads(line) for line in wfile.lines] == [{'devices': ['gh-1']}, {'devices': ['gh-2', 'gh-3']}]
+    assert server.snapshot()['subscribers'] == 0
@@ -0,0 +1,40 @@
+import math
+import struct
+import pytest
+from core.frames import FRAME_VERSION, decode_frame, encode_frame, frame_struct
+
+METRICS = ['kodeDataSuhuIn', 'kodeDataKelembabanIn', 'kodeDataCo2']
+RECEIVE_NS = 1_800_000_000_000 * 1_000_000
+
+
+def test_binary_frame_round_trip():
+    payload = encode_frame({'kodeDataSuhuIn': 25.5, 'kodeDataCo2': 410.0}, METRICS, 1_800_000_000_500)
+    assert len(payload) == 1 + 8 + 8 * len(METRICS)
+    timestamp, items = decode_frame(payload, METRICS, RECEIVE_NS)
+    assert timestamp == 1_800_000_000_500 * 1_000_000
+    # NaN = metric tidak ada di frame
+    assert items == [('kodeDataSuhuIn', 25.5), ('kodeDataCo2', 410.0)]
+
+
+def test_binary_frame_without_device_clock_uses_receive_time():
+    timestamp, _ = decode_frame(encode_frame({'kodeDataCo2': 1.0}, METRICS), METRICS, RECEIVE_NS)
+    assert timestamp == RECEIVE_NS
+    # millis() sejak boot, bukan jam dunia nyata
+    timestamp, _ = decode_frame(encode_frame({'kodeDataCo2': 1.0}, METRICS, 123_456), METRICS, RECEIVE_NS)
+    assert timestamp == RECEIVE_NS
+
+
+def test_json_and_binary_frames_decode_alike():
+    values = {'kodeDataSuhuIn': 25.5, 'kodeDataKelembabanIn': 60.0}
+    json_frame = b'{"ts": 1800000000000, "kodeDataSuhuIn": 25.5, "kodeDataKelembabanIn": 60}'
+    binary = encode_frame(values, METRICS, 1_800_000_000_000)
+    assert decode_frame(json_frame, METRICS, RECEIVE_NS) == decode_frame(binary, METRICS, RECEIVE_NS)
+
+
+def test_malformed_binary_frames_are_rejected():
+    with pytest.raises(ValueError):
+        decode_frame(b'\x01\x00', METRICS, RECEIVE_NS)
+    other_version = frame_struct(METRICS).pack(FRAME_VERSION + 1, 0, *([math.nan] * len(METRICS)))
+    with pytest.raises(ValueError):
+        decode_frame(other_version, METRICS, RECEIVE_NS)
+    assert frame_struct(METRICS).size == struct.calcsize('<Bq3d')
@@ -0,0 +1,45 @@
+import gc
+import os
+import numpy as np
+from core.history import HistoryStore, SEGMENT_NS
+
+
+def open_fds():
+    return len(os.listdir('/proc/self/fd'))
+
+
+def test_mapped_segments_are_bounded(tmp_path):
+    history = HistoryStore(str(tmp_path), max_maps=8)
+    for segment in range(50):
+        for metric in ('a', 'b', 'c'):
+            for i in range(3):
+                history.append(metric, segment * SEGMENT_NS + i, float(i))
+    history.flush()
+    before = open_fds()
+    for metric in ('a', 'b', 'c'):
+        timestamps, values = history.query(metric, 0, 50 * SEGMENT_NS)
+        assert len(timestamps) == len(values) == 150
+    del timestamps, values
+    gc.collect()
+    assert len(history._maps) == 8
+    assert open_fds() - before <= 2 * 8
+
+
+def test_torn_flush_is_repaired_before_the_next_append(tmp_path):
+    history = HistoryStore(str(tmp_path))
+    for i in range(3):
+        history.append('a', i, float(i))
+    history.flush()
+    # Crash di tengah flush: kolom nilai sudah bertambah 1,5 sampel, kolom timestamp belum
+    ts_path, val_path = history._segment_paths('a', 0)
+    with open(val_path, 'ab') as f:
+        f.write(np.float64(99.0).tobytes() + b'\0' * 4)
+
+    history = HistoryStore(str(tmp_path))
+    for i in range(3, 6):
+        history.append('a', i, float(i))
+    history.flush()
+    timestamps, values = history.query('a', 0, 10)
+    assert timestamps.tolist() == [0, 1, 2, 3, 4, 5]
+    assert values.tolist() == [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+    assert os.path.getsize(ts_path) == os.path.getsize(val_path)
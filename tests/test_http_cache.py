@@ -0,0 +1,59 @@
+import gzip
+import pytest
+from flask import Flask, Response
+from core.http_cache import HttpCache
+
+CSS = 'body { color: #333; }\n' * 200
+
+
+@pytest.fixture
+def app(tmp_path):
+    (tmp_path / 'style.css').write_text(CSS)
+    server = Flask(__name__, static_folder=str(tmp_path), static_url_path='/static')
+    cache = HttpCache(str(tmp_path)).init_app(server)
+
+    @server.route('/api')
+    def api():
+        return Response('{"x": 1}' * 500, mimetype='application/json')
+
+    @server.route('/stream')
+    def stream():
+        return Response((chunk for chunk in ['data: 1\n\n']), mimetype='text/event-stream')
+
+    server.http_cache = cache
+    return server
+
+
+def test_versioned_static_url_is_immutable(app):
+    client = app.test_client()
+    url = app.http_cache.static_url('style.css')
+    assert '?v=' in url
+    response = client.get(url)
+    assert response.cache_control.immutable
+    assert response.cache_control.max_age == 365 * 24 * 3600
+
+
+def test_unversioned_static_revalidates_with_304(app):
+    client = app.test_client()
+    response = client.get('/static/style.css', headers={'Accept-Encoding': 'gzip'})
+    assert response.cache_control.no_cache
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.data).decode() == CSS
+    etag = response.headers['ETag']
+    again = client.get('/static/style.css', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.data == b''
+
+
+def test_small_or_unaccepted_responses_are_not_compressed(app):
+    client = app.test_client()
+    assert 'Content-Encoding' not in client.get('/api').headers
+    response = client.get('/api', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+
+
+def test_streaming_responses_are_left_alone(app):
+    response = app.test_client().get('/stream', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in response.headers
+    assert response.data == b'data: 1\n\n'
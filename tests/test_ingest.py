@@ -0,0 +1,57 @@
+import json
+from core.devices import Device, DeviceRegistry
+from core.history import HistoryStore
+from core.ingest import BatchWriter, IngestPipeline
+
+METRICS = ['kodeDataSuhuIn', 'kodeDataCo2']
+NOW_NS = 1_800_000_000_000 * 1_000_000
+
+
+def frame(ts_ms, **values):
+    return json.dumps(dict(values, ts=ts_ms)).encode()
+
+
+def make_writer(tmp_path):
+    devices = DeviceRegistry(lambda device_id: Device(device_id, METRICS, METRICS, capacity=16))
+    return devices, BatchWriter(devices, HistoryStore(str(tmp_path)), METRICS)
+
+
+def test_frames_older_than_last_sample_are_dropped(tmp_path):
+    devices, write_batch = make_writer(tmp_path)
+    write_batch([
+        ('mcs/gh-1/frame', frame(1_800_000_000_000, kodeDataSuhuIn=25.0), NOW_NS),
+        ('mcs/gh-1/frame', frame(1_799_999_999_000, kodeDataSuhuIn=24.0), NOW_NS),
+        ('mcs/gh-1/frame', frame(1_800_000_001_000, kodeDataSuhuIn=26.0), NOW_NS + 10**9),
+    ])
+    timestamps, values = devices.get('gh-1').store.view('kodeDataSuhuIn')
+    assert values.tolist() == [25.0, 26.0]
+    assert (timestamps[1:] >= timestamps[:-1]).all()
+    assert write_batch.stats['out_of_order'] == 1
+
+
+def test_device_clock_ahead_falls_back_to_receive_time(tmp_path):
+    devices, write_batch = make_writer(tmp_path)
+    write_batch([('mcs/gh-1/frame', frame(1_900_000_000_000, kodeDataCo2=400.0), NOW_NS)])
+    timestamps, _ = devices.get('gh-1').store.view('kodeDataCo2')
+    assert timestamps.tolist() == [NOW_NS]
+
+
+def test_frame_at_the_last_sample_time_is_kept(tmp_path):
+    devices, write_batch = make_writer(tmp_path)
+    write_batch([
+        ('mcs/gh-1/frame', frame(1_800_000_000_000, kodeDataSuhuIn=25.0), NOW_NS),
+        ('mcs/gh-1/frame', frame(1_800_000_000_000, kodeDataCo2=400.0), NOW_NS),
+    ])
+    device = devices.get('gh-1')
+    assert device.latest(METRICS) == [25.0, 400.0]
+    assert write_batch.stats['out_of_order'] == 0
+
+
+def test_out_of_order_count_is_in_pipeline_snapshot(tmp_path):
+    devices, write_batch = make_writer(tmp_path)
+    pipeline = IngestPipeline(write_batch)
+    write_batch([
+        ('mcs/gh-1/frame', frame(1_800_000_000_000, kodeDataSuhuIn=25.0), NOW_NS),
+        ('mcs/gh-1/frame', frame(1_799_000_000_000, kodeDataSuhuIn=24.0), NOW_NS),
+    ])
+    assert pipeline.snapshot()['out_of_order'] == 1
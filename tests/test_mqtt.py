@@ -0,0 +1,20 @@
+import random
+from core.mqtt import backoff_delay
+
+
+def test_backoff_delay_stays_within_bounds():
+    rng = random.Random(1)
+    for attempt in range(20):
+        delays = [backoff_delay(attempt, base=1.0, cap=120.0, rng=rng) for _ in range(200)]
+        assert min(delays) >= 0
+        assert max(delays) <= min(120.0, 2 ** attempt)
+
+
+def test_backoff_delay_grows_then_caps():
+    rng = random.Random(2)
+    early = [backoff_delay(0, rng=rng) for _ in range(500)]
+    late = [backoff_delay(30, rng=rng) for _ in range(500)]
+    assert max(early) <= 1.0
+    # Full jitter: tersebar di seluruh rentang sampai cap
+    assert 100 < max(late) <= 120.0
+    assert min(late) < 20
@@ -0,0 +1,43 @@
+import threading
+import time
+from core.push import PushHub
+
+KEEPALIVE = ': keepalive\n\n'
+
+
+def test_events_are_coalesced_per_client():
+    hub = PushHub(min_interval=0.05, keepalive=5, max_age=5)
+    stream = hub.stream()
+    assert next(stream) == 'retry: 3000\n\n'
+    hub.publish(['a'])
+    hub.publish(['a', 'b'])
+    assert next(stream) == 'data: {"a": 2, "b": 1}\n\n'
+    # Tiga publish selama jeda min_interval jadi satu event, hanya device yang berubah
+    for _ in range(3):
+        hub.publish(['b'])
+    assert next(stream) == 'data: {"b": 4}\n\n'
+    assert hub.clients == 1
+    stream.close()
+    assert hub.clients == 0
+
+
+def test_idle_stream_sends_keepalives_and_ends_after_max_age():
+    hub = PushHub(keepalive=0.05, max_age=0.3)
+    start = time.monotonic()
+    events = list(hub.stream())
+    assert 0.3 <= time.monotonic() - start < 2
+    assert events[0] == 'retry: 3000\n\n'
+    assert len(events) > 2 and set(events[1:]) == {KEEPALIVE}
+    assert hub.clients == 0
+
+
+def test_close_ends_open_streams():
+    hub = PushHub(keepalive=5, max_age=60)
+    events = []
+    reader = threading.Thread(target=lambda: events.extend(hub.stream()))
+    reader.start()
+    time.sleep(0.1)
+    hub.close()
+    reader.join(2)
+    assert not reader.is_alive()
+    assert hub.snapshot()['clients'] == 0
@@ -0,0 +1,72 @@
+import threading
+import time
+import numpy as np
+from core.render_cache import RenderCache, estimate_size
+
+
+def test_hit_after_first_compute():
+    cache = RenderCache()
+    calls = []
+    compute = lambda: calls.append(1) or 'figure'
+    assert cache.get_or_compute(('trend', 'v1', 'guest'), compute) == 'figure'
+    assert cache.get_or_compute(('trend', 'v1', 'guest'), compute) == 'figure'
+    # Versi data atau role lain adalah key lain
+    cache.get_or_compute(('trend', 'v2', 'guest'), compute)
+    cache.get_or_compute(('trend', 'v1', 'engineer'), compute)
+    assert len(calls) == 3
+    assert cache.snapshot()['hits'] == 1
+
+
+def test_least_recently_used_entry_is_evicted_first():
+    cache = RenderCache(max_entries=2)
+    cache.get_or_compute('a', lambda: 1)
+    cache.get_or_compute('b', lambda: 2)
+    cache.get_or_compute('a', lambda: 1)
+    cache.get_or_compute('c', lambda: 3)
+    assert len(cache) == 2
+    assert cache.get_or_compute('a', lambda: 'recomputed') == 1
+    assert cache.get_or_compute('b', lambda: 'recomputed') == 'recomputed'
+    assert cache.snapshot()['evictions'] >= 1
+
+
+def test_evicts_by_bytes_and_skips_oversized_values():
+    cache = RenderCache(max_bytes=1000)
+    cache.get_or_compute('a', lambda: np.zeros(100))
+    cache.get_or_compute('b', lambda: np.zeros(100))
+    assert len(cache) == 1 and cache.bytes == 800
+    cache.get_or_compute('huge', lambda: np.zeros(1000))
+    assert len(cache) == 1 and cache.bytes <= 1000
+    assert estimate_size({'x': np.zeros(10), 'y': 'abc'}) == 1 + 80 + 1 + 3
+
+
+def test_concurrent_callers_share_one_computation():
+    cache = RenderCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return 'figure'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute('k', compute)))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ['figure'] * 8
+    assert len(calls) == 1
+
+
+def test_failed_compute_is_not_cached():
+    cache = RenderCache()
+
+    def fail():
+        raise ValueError('no data')
+
+    try:
+        cache.get_or_compute('k', fail)
+    except ValueError:
+        pass
+    assert cache.get_or_compute('k', lambda: 'ok') == 'ok'
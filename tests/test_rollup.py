@@ -0,0 +1,72 @@
+import numpy as np
+from core.rollup import MetricRollup, RollupTier, NS_PER_SECOND
+
+
+def test_tier_keeps_order_when_ring_grows():
+    # Kapasitas awal 1024 bucket, 1030 update 1 detik memaksa ring tumbuh saat sudah penuh
+    tier = RollupTier('1s', 1, 3 * 3600)
+    for second in range(1030):
+        tier.update(second * NS_PER_SECOND, float(second))
+    starts = tier.buckets(0, 2000 * NS_PER_SECOND)['start'] // NS_PER_SECOND
+    assert starts.tolist() == list(range(1030))
+
+
+def test_tier_grows_in_batches_after_wrap():
+    tier = RollupTier('1s', 1, 3000)
+    timestamps = np.arange(2500, dtype=np.int64) * NS_PER_SECOND
+    for lo in range(0, 2500, 700):
+        tier.extend(timestamps[lo:lo + 700], np.ones(len(timestamps[lo:lo + 700])))
+    buckets = tier.buckets(0, 3000 * NS_PER_SECOND)
+    assert np.all(np.diff(buckets['start']) > 0)
+    assert buckets['count'].min() == 1
+    assert len(buckets) == 2500
+
+
+def test_snapshot_plus_later_history_matches_full_aggregation(tmp_path):
+    now = 10 * 86400 * NS_PER_SECOND
+    timestamps = now - np.arange(5000, 0, -1, dtype=np.int64) * 7 * NS_PER_SECOND
+    values = np.sin(np.arange(5000, dtype=np.float64))
+    full = MetricRollup()
+    full.extend(timestamps, values, now)
+
+    saved = MetricRollup()
+    saved.extend(timestamps[:3000], values[:3000], now)
+    path = str(tmp_path / 'rollup.npz')
+    assert saved.save(path)
+
+    restored = MetricRollup()
+    assert restored.restore(path)
+    assert restored.synced == timestamps[2999]
+    lo = np.searchsorted(timestamps, restored.synced + 1)
+    restored.extend(timestamps[lo:], values[lo:], now)
+    for expected, tier in zip(full.tiers, restored.tiers):
+        got, want = tier.buckets(0, now + 1), expected.buckets(0, now + 1)
+        for field in ('start', 'min', 'max', 'count', 'last'):
+            assert got[field].tolist() == want[field].tolist()
+        # Urutan penjumlahan berbeda, jadi sum hanya sama sampai pembulatan
+        assert np.allclose(got['sum'], want['sum'])
+
+
+def test_restore_without_snapshot(tmp_path):
+    rollup = MetricRollup()
+    assert not rollup.restore(str(tmp_path / 'missing.npz'))
+    assert rollup.synced is None
+
+
+def test_query_uses_finer_tier_when_data_covers_part_of_the_range():
+    # 3 jam data 1 Hz, rentang 7 hari: tier 1m hanya punya 180 bucket, tier 1s punya 10800
+    now = 100 * 86400 * NS_PER_SECOND
+    timestamps = now - np.arange(3 * 3600, 0, -1, dtype=np.int64) * NS_PER_SECOND
+    rollup = MetricRollup()
+    rollup.extend(timestamps, np.ones(len(timestamps)), now)
+    name, buckets = rollup.query(now - 7 * 86400 * NS_PER_SECOND, now, 720)
+    assert name == '1s'
+    assert len(buckets) >= 720
+
+
+def test_query_falls_back_to_raw_when_no_tier_has_enough_buckets():
+    now = 100 * 86400 * NS_PER_SECOND
+    timestamps = now - np.arange(120, 0, -1, dtype=np.int64) * 60 * NS_PER_SECOND
+    rollup = MetricRollup()
+    rollup.extend(timestamps, np.ones(len(timestamps)), now)
+    assert rollup.query(now - 7 * 86400 * NS_PER_SECOND, now, 720) == (None, None)
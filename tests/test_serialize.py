@@ -0,0 +1,43 @@
+import base64
+import datetime
+import json
+import numpy as np
+import plotly.graph_objects as go
+from dash import html
+from plotly.io.json import to_json_plotly
+from core.serialize import dumps, install_json, typed_array
+
+
+def stock(obj):
+    return to_json_plotly(obj, engine='json')
+
+
+def test_output_matches_the_plotly_encoder():
+    figure = go.Figure(go.Scatter(x=np.arange(5), y=np.linspace(0, 1, 5), name='</script>'))
+    payload = {
+        'figure': figure,
+        'children': html.Div('  <b>', id='x'),
+        'values': np.array([1.5, 2.5])[::-1],
+        'count': np.int64(3),
+        'day': datetime.date(2025, 1, 2),
+    }
+    assert json.loads(dumps(payload)) == json.loads(stock(payload))
+    # Escaping sama persis, aman di dalam <script>
+    assert dumps({'a': '</script> '}) == stock({'a': '</script> '})
+
+
+def test_typed_array_round_trip():
+    spec = typed_array(np.array([1.5, -2.0]))
+    assert spec['dtype'] == 'f8'
+    assert np.frombuffer(base64.b64decode(spec['bdata']), dtype='<f8').tolist() == [1.5, -2.0]
+    # int64 (tidak ada di plotly.js) jadi int32 bila muat
+    assert typed_array(np.array([1, 2], dtype=np.int64))['dtype'] == 'i4'
+    assert typed_array(np.array([2 ** 40], dtype=np.int64))['dtype'] == 'f8'
+
+
+def test_install_json_replaces_dash_encoders():
+    import dash._callback
+    import dash._utils
+    install_json()
+    assert dash._utils.to_json is dumps
+    assert dash._callback.to_json is dumps
@@ -0,0 +1,111 @@
+import os
+import threading
+import time
+from multiprocessing import shared_memory
+import numpy as np
+import pytest
+from core.devices import Device
+from core.shared_store import SeqLock, SharedDevice, SharedDeviceRegistry, SharedSensorStore, block_name, unlink
+
+METRICS = ['kodeDataSuhuIn', 'kodeDataCo2']
+
+
+@pytest.fixture
+def prefix():
+    name = f"mcs-test-{os.getpid()}"
+    yield name
+    unlink(name)
+    # Block device yang dibuat tanpa daftar device
+    try:
+        shm = shared_memory.SharedMemory(name=block_name(name, 'gh-1'))
+    except FileNotFoundError:
+        return
+    shm.close()
+    shm.unlink()
+
+
+def shared_device(prefix, device_id, writer):
+    store = SharedSensorStore(block_name(prefix, device_id), METRICS, capacity=16, writer=writer)
+    return SharedDevice(device_id, store, [])
+
+
+def test_writer_registers_each_device_once(prefix):
+    writer = SharedDeviceRegistry(prefix, lambda device_id: shared_device(prefix, device_id, True), writer=True)
+    device = writer.get_or_create('gh-1')
+    sequence = writer.directory.lock.sequence
+    assert writer.get_or_create('gh-1') is device
+    assert writer.directory.lock.sequence == sequence
+    assert writer.directory.ids() == ['gh-1']
+
+
+def test_reader_reuses_placeholder_until_device_exists(prefix):
+    writer = SharedDeviceRegistry(prefix, lambda device_id: shared_device(prefix, device_id, True), writer=True)
+    reader = SharedDeviceRegistry(prefix, lambda device_id: shared_device(prefix, device_id, False),
+                                  placeholder=lambda device_id: Device(device_id, METRICS, [], capacity=16))
+    placeholder = reader.get_or_create('gh-1')
+    assert reader.get_or_create('gh-1') is placeholder
+    assert 'gh-1' not in reader
+
+    writer.get_or_create('gh-1').append('kodeDataCo2', 1, 400.0)
+    device = reader.get_or_create('gh-1')
+    assert device is not placeholder
+    assert device.latest(['kodeDataCo2']) == [400.0]
+
+
+def test_seqlock_reader_waits_for_the_writer():
+    counter = np.zeros(1, dtype=np.int64)
+    writer, reader = SeqLock(counter, writer=True), SeqLock(counter)
+    data = {'value': 1}
+    results = []
+    with writer:
+        data['value'] = 2
+        thread = threading.Thread(target=lambda: results.append(reader.read(lambda: data['value'])))
+        thread.start()
+        time.sleep(0.05)
+        assert not results  # counter ganjil: pembaca menunggu
+        data['value'] = 3
+    thread.join(1)
+    assert results == [3]
+    assert counter[0] == 2
+
+
+def test_seqlock_retries_a_torn_read():
+    counter = np.zeros(1, dtype=np.int64)
+    reader = SeqLock(counter)
+    calls = []
+
+    def read():
+        calls.append(1)
+        if len(calls) == 1:
+            counter[0] += 2  # writer selesai menulis di tengah pembacaan
+            return 'torn'
+        return 'consistent'
+
+    assert reader.read(read) == 'consistent'
+    assert len(calls) == 2
+
+
+def test_seqlock_gives_up_on_a_dead_writer():
+    counter = np.ones(1, dtype=np.int64)
+    reader = SeqLock(counter, timeout=0.05)
+    assert reader.read(lambda: 'as is') == 'as is'
+
+
+def test_reader_sees_writer_samples(prefix):
+    writer = shared_device(prefix, 'gh-1', True)
+    reader = shared_device(prefix, 'gh-1', False)
+    for i in range(20):
+        writer.append_frame(1000 + i, [('kodeDataSuhuIn', float(i)), ('kodeDataCo2', 400.0 + i)])
+    assert reader.latest(METRICS) == [19.0, 419.0]
+    assert reader.versions(METRICS) == writer.versions(METRICS) == {metric: 20 for metric in METRICS}
+    assert reader.info() == {'id': 'gh-1', 'first_seen': 1000, 'last_seen': 1019}
+    timestamps, values = reader.snapshot(['kodeDataCo2'], since=1010)['kodeDataCo2']
+    assert timestamps.tolist() == list(range(1010, 1020))
+    # Kapasitas 16: sampel tertua sudah ditimpa
+    assert len(reader.store['kodeDataSuhuIn']) == 16
+
+
+def test_reader_rejects_other_layout(prefix):
+    shared_device(prefix, 'gh-1', True)
+    with pytest.raises(ValueError):
+        SharedSensorStore(block_name(prefix, 'gh-1'), METRICS[:1], capacity=16)